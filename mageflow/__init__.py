@@ -1,7 +1,10 @@
-from mageflow.callbacks import register_task, handle_task_callback
+import importlib
+from typing import TYPE_CHECKING
+
+# Signature creation doesn't depend on hatchet, it is cheap to import eagerly
 from mageflow.chain.creator import chain
-from mageflow.client import Mageflow
-from mageflow.init import init_mageflow_hatchet_tasks
+from mageflow.connection import RedisConnectionConfig, redis_pool_stats
+from mageflow.pool.creator import concurrency_pool
 from mageflow.signature.creator import (
     sign,
     load_signature,
@@ -10,9 +13,49 @@ from mageflow.signature.creator import (
     resume,
     pause,
 )
+from mageflow.signature.hash_tag import workflow_scope
 from mageflow.signature.status import TaskStatus
+from mageflow.signature.status_index import signatures_by_status
 from mageflow.swarm.creator import swarm
 
+if TYPE_CHECKING:
+    from mageflow.callbacks import register_task, handle_task_callback
+    from mageflow.client import Mageflow
+    from mageflow.init import init_mageflow_hatchet_tasks
+    from mageflow.producer import MageflowProducer
+
+# Worker api is loaded lazily, so processes that only create signatures don't import hatchet (grpc, protobuf)
+_LAZY_ATTRIBUTES = {
+    "register_task": "mageflow.callbacks",
+    "handle_task_callback": "mageflow.callbacks",
+    "Mageflow": "mageflow.client",
+    "init_mageflow_hatchet_tasks": "mageflow.init",
+    "MageflowProducer": "mageflow.producer",
+}
+HATCHET_EXTRA_MODULES = {"hatchet_sdk", "grpc", "google"}
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    try:
+        module = importlib.import_module(module_name)
+    except ModuleNotFoundError as e:
+        if e.name and e.name.split(".")[0] in HATCHET_EXTRA_MODULES:
+            raise ModuleNotFoundError(
+                f"mageflow.{name} requires the hatchet extra, install it with `pip install mageflow[hatchet]`",
+                name=e.name,
+            ) from e
+        raise
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals().keys()) + list(_LAZY_ATTRIBUTES.keys()))
+
 
 __all__ = [
     "load_signature",
@@ -25,6 +68,12 @@ __all__ = [
     "register_task",
     "handle_task_callback",
     "Mageflow",
+    "MageflowProducer",
     "chain",
     "swarm",
+    "RedisConnectionConfig",
+    "redis_pool_stats",
+    "workflow_scope",
+    "concurrency_pool",
+    "signatures_by_status",
 ]
@@ -9,6 +9,7 @@ from hatchet_sdk.runnables.types import EmptyModel
 from hatchet_sdk.runnables.workflow import Standalone
 from pydantic import BaseModel
 
+from mageflow.errors import TaskRescheduledError
 from mageflow.invokers.hatchet import HatchetInvoker
 from mageflow.task.model import HatchetTaskModel
 from mageflow.utils.pythonic import flexible_call
@@ -43,12 +44,19 @@ def handle_task_callback(
                 signature = await invoker.start_task()
                 if send_signature:
                     kwargs["signature"] = signature
-                if expected_params == AcceptParams.JUST_MESSAGE:
-                    result = await flexible_call(func, message)
-                elif expected_params == AcceptParams.NO_CTX:
-                    result = await flexible_call(func, message, *args, **kwargs)
-                else:
-                    result = await flexible_call(func, message, ctx, *args, **kwargs)
+                async with invoker.keep_swarm_item_lease():
+                    if expected_params == AcceptParams.JUST_MESSAGE:
+                        result = await flexible_call(func, message)
+                    elif expected_params == AcceptParams.NO_CTX:
+                        result = await flexible_call(func, message, *args, **kwargs)
+                    else:
+                        result = await flexible_call(
+                            func, message, ctx, *args, **kwargs
+                        )
+            except TaskRescheduledError as e:
+                ctx.log(f"Task rescheduled to run in {e.delay}")
+                await invoker.reschedule(e.delay)
+                return None
             except (Exception, asyncio.CancelledError) as e:
                 if not task_model.should_retry(ctx.attempt_number, e):
                     await invoker.run_error()
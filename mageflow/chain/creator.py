@@ -1,12 +1,15 @@
 import asyncio
+from datetime import timedelta
 
 from mageflow.chain.consts import ON_CHAIN_END, ON_CHAIN_ERROR
 from mageflow.chain.messages import ChainSuccessTaskCommandMessage
 from mageflow.chain.model import ChainTaskSignature
 from mageflow.signature.creator import (
     TaskSignatureConvertible,
-    resolve_signature_key,
+    resolve_workflow_task,
+    workflow_hash_tag,
 )
+from mageflow.signature.hash_tag import workflow_scope
 from mageflow.signature.model import (
     TaskIdentifierType,
     TaskSignature,
@@ -19,8 +22,21 @@ async def chain(
     name: str = None,
     error: TaskInputType = None,
     success: TaskInputType = None,
+    ttl: timedelta = None,
 ) -> ChainTaskSignature:
-    tasks = [await resolve_signature_key(task) for task in tasks]
+    # All the chain signatures are stored in the same cluster slot
+    with workflow_scope(workflow_hash_tag(tasks)):
+        return await _create_chain(tasks, name, error, success, ttl)
+
+
+async def _create_chain(
+    tasks: list[TaskSignatureConvertible],
+    name: str = None,
+    error: TaskInputType = None,
+    success: TaskInputType = None,
+    ttl: timedelta = None,
+) -> ChainTaskSignature:
+    tasks = [await resolve_workflow_task(task) for task in tasks]
 
     # Create a chain task that will be deleted only at the end of the chain
     first_task = tasks[0]
@@ -29,6 +45,7 @@ async def chain(
         success_callbacks=[success] if success else [],
         error_callbacks=[error] if error else [],
         tasks=tasks,
+        ttl=ttl,
     )
     await chain_task_signature.save()
 
@@ -37,11 +54,13 @@ async def chain(
         task_name=ON_CHAIN_ERROR,
         task_identifiers=callback_kwargs,
         model_validators=ChainSuccessTaskCommandMessage,
+        ttl=ttl,
     )
     on_chain_success = TaskSignature(
         task_name=ON_CHAIN_END,
         task_identifiers=callback_kwargs,
         model_validators=ChainSuccessTaskCommandMessage,
+        ttl=ttl,
     )
     await _chain_task_to_previous_success(tasks, on_chain_error, on_chain_success)
     return chain_task_signature
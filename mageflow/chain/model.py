@@ -4,6 +4,9 @@ import rapyer
 from pydantic import field_validator, Field
 
 from mageflow.errors import MissingSignatureError
+from mageflow.models.trigger import WorkflowTriggerParams
+from mageflow.signature.bulk import bulk_change_status, bulk_resume, StatusChangeCounts
+from mageflow.signature.deletion import remove_signatures
 from mageflow.signature.model import TaskSignature, TaskIdentifierType
 from mageflow.signature.status import SignatureStatus
 
@@ -16,22 +19,18 @@ class ChainTaskSignature(TaskSignature):
     def validate_tasks(cls, v: list[TaskSignature]):
         return [cls.validate_task_key(item) for item in v]
 
-    async def workflow(self, **task_additional_params):
+    async def trigger_params(
+        self, use_return_field: bool = True, **task_additional_params
+    ) -> WorkflowTriggerParams:
         first_task = await TaskSignature.get_safe(self.tasks[0])
         if first_task is None:
             raise MissingSignatureError(f"First task from chain {self.key} not found")
-        return await first_task.workflow(**task_additional_params)
+        return await first_task.trigger_params(
+            use_return_field, **task_additional_params
+        )
 
     async def delete_chain_tasks(self, with_errors=True, with_success=True):
-        signatures = await asyncio.gather(
-            *[TaskSignature.get_safe(signature_id) for signature_id in self.tasks],
-            return_exceptions=True,
-        )
-        signatures = [sign for sign in signatures if isinstance(sign, TaskSignature)]
-        delete_tasks = [
-            signature.remove(with_errors, with_success) for signature in signatures
-        ]
-        await asyncio.gather(*delete_tasks)
+        await remove_signatures(self.tasks, with_errors, with_success)
 
     async def aupdate_real_task_kwargs(self, **kwargs):
         first_task = await rapyer.aget(self.tasks[0])
@@ -39,19 +38,16 @@ class ChainTaskSignature(TaskSignature):
             raise RuntimeError(f"First task from chain {self.key} must be a signature")
         return await first_task.aupdate_real_task_kwargs(**kwargs)
 
-    async def change_status(self, status: SignatureStatus):
-        pause_chain_tasks = [
-            TaskSignature.safe_change_status(task, status) for task in self.tasks
-        ]
-        pause_chain = super().change_status(status)
-        await asyncio.gather(pause_chain, *pause_chain_tasks, return_exceptions=True)
+    async def change_status(self, status: SignatureStatus) -> StatusChangeCounts:
+        counts = await bulk_change_status(self.tasks, status)
+        # A version conflict of the chain itself is raised, so optimistic updates retry it
+        await super().change_status(status)
+        return counts
 
-    async def suspend(self):
-        await asyncio.gather(
-            *[TaskSignature.suspend_from_key(task_id) for task_id in self.tasks],
-            return_exceptions=True,
-        )
+    async def suspend(self) -> StatusChangeCounts:
+        counts = await bulk_change_status(self.tasks, SignatureStatus.SUSPENDED)
         await super().change_status(SignatureStatus.SUSPENDED)
+        return counts
 
     async def interrupt(self):
         await asyncio.gather(
@@ -60,9 +56,7 @@ class ChainTaskSignature(TaskSignature):
         )
         await super().change_status(SignatureStatus.INTERRUPTED)
 
-    async def resume(self):
-        await asyncio.gather(
-            *[TaskSignature.resume_from_key(task_key) for task_key in self.tasks],
-            return_exceptions=True,
-        )
+    async def resume(self) -> StatusChangeCounts:
+        counts = await bulk_resume(self.tasks)
         await super().change_status(self.task_status.last_status)
+        return counts
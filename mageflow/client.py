@@ -1,12 +1,11 @@
 import asyncio
 import functools
 import inspect
-import os
 import random
+import uuid
 from datetime import timedelta
 from typing import TypeVar, Any, overload, Unpack, Callable
 
-import redis
 from hatchet_sdk import Hatchet, Worker, Context
 from hatchet_sdk.runnables.workflow import BaseWorkflow
 from hatchet_sdk.worker.worker import LifespanFn
@@ -15,9 +14,13 @@ from typing_extensions import override
 
 from mageflow.callbacks import AcceptParams, register_task, handle_task_callback
 from mageflow.chain.creator import chain
+from mageflow.connection import RedisConnectionConfig, resolve_redis_client
+from mageflow.errors import TaskRescheduledError
 from mageflow.init import init_mageflow_hatchet_tasks
+from mageflow.pool.model import ConcurrencyPool
 from mageflow.signature.creator import sign, TaskSignatureConvertible
 from mageflow.signature.model import TaskSignature, TaskInputType
+from mageflow.signature.ttl import TTLPolicy
 from mageflow.signature.types import HatchetTaskType
 from mageflow.startup import (
     lifespan_initialize,
@@ -104,8 +107,9 @@ class HatchetMageflow(Hatchet):
         name: str = None,
         error: TaskInputType = None,
         success: TaskInputType = None,
+        ttl: timedelta = None,
     ):
-        return await chain(tasks, name, error, success)
+        return await chain(tasks, name, error, success, ttl)
 
     async def swarm(
         self,
@@ -123,8 +127,17 @@ class HatchetMageflow(Hatchet):
         func.__send_signature__ = True
         return func
 
-    def stagger_execution(self, wait_delta: timedelta):
+    def stagger_execution(self, wait_delta: timedelta, deferred: bool = False):
+        """
+        deferred - spread the task runs when they are triggered, scheduling each run up to wait_delta later,
+        instead of sleeping in the worker. Applies to runs triggered through signatures.
+        """
+
         def decorator(func):
+            if deferred:
+                func.__stagger_delta__ = wait_delta
+                return func
+
             @self.with_ctx
             @functools.wraps(func)
             async def stagger_wrapper(message, ctx: Context, *args, **kwargs):
@@ -143,6 +156,33 @@ class HatchetMageflow(Hatchet):
 
         return decorator
 
+    def with_concurrency_pool(
+        self,
+        pool_name: str,
+        weight: float = 1,
+        poll_interval: timedelta = timedelta(seconds=1),
+    ):
+        def decorator(func):
+            @self.with_ctx
+            @functools.wraps(func)
+            async def pool_wrapper(message, ctx: Context, *args, **kwargs):
+                pool = await ConcurrencyPool.from_name(pool_name)
+                lease_id = uuid.uuid4().hex
+                if not await pool.acquire(func.__name__, lease_id, weight):
+                    # The worker slot is not held while waiting, the task runs again later
+                    ctx.log(f"Concurrency pool {pool_name} is full - rescheduling")
+                    raise TaskRescheduledError(poll_interval)
+                async with pool.keep_lease(func.__name__, lease_id):
+                    if does_task_wants_ctx(func):
+                        return await func(message, ctx, *args, **kwargs)
+                    else:
+                        return await func(message, *args, **kwargs)
+
+            pool_wrapper.__signature__ = inspect.signature(func)
+            return pool_wrapper
+
+        return decorator
+
 
 def task_decorator(
     func: Callable,
@@ -154,9 +194,11 @@ def task_decorator(
         AcceptParams.ALL if does_task_wants_ctx(func) else mage_client.param_config
     )
     send_signature = getattr(func, "__send_signature__", False)
+    stagger_delta = getattr(func, "__stagger_delta__", None)
     handler_dec = handle_task_callback(param_config, send_signature=send_signature)
     func = handler_dec(func)
     wf = hatchet_task(func)
+    wf.__stagger_delta__ = stagger_delta
 
     task_name = hatchet_task_name or func.__name__
     register = register_task(task_name)
@@ -168,7 +210,12 @@ T = TypeVar("T")
 
 @overload
 def Mageflow(
-    hatchet_client: Hatchet, redis_client: Redis | str = None
+    hatchet_client: Hatchet,
+    redis_client: Redis | str = None,
+    redis_config: RedisConnectionConfig = None,
+    swarm_batch_window: timedelta = None,
+    optimistic_concurrency: bool = False,
+    ttl_policies: dict[type, TTLPolicy] = None,
 ) -> HatchetMageflow: ...
 
 
@@ -176,6 +223,10 @@ def Mageflow(
     hatchet_client: T = None,
     redis_client: Redis | str = None,
     param_config: AcceptParams = AcceptParams.NO_CTX,
+    redis_config: RedisConnectionConfig = None,
+    swarm_batch_window: timedelta = None,
+    optimistic_concurrency: bool = False,
+    ttl_policies: dict[type, TTLPolicy] = None,
 ) -> T:
     if hatchet_client is None:
         hatchet_client = Hatchet()
@@ -186,10 +237,9 @@ def Mageflow(
     hatchet_caller = Hatchet(config=config, debug=hatchet_client._client.debug)
     mageflow_config.hatchet_client = hatchet_caller
 
-    if redis_client is None:
-        redis_url = os.getenv("REDIS_URL")
-        redis_client = redis.asyncio.from_url(redis_url, decode_responses=True)
-    if isinstance(redis_client, str):
-        redis_client = redis.asyncio.from_url(redis_client, decode_responses=True)
+    redis_client = resolve_redis_client(redis_client, redis_config)
     mageflow_config.redis_client = redis_client
+    mageflow_config.swarm_batch_window = swarm_batch_window
+    mageflow_config.optimistic_concurrency = optimistic_concurrency
+    mageflow_config.ttl_policies = ttl_policies or {}
     return HatchetMageflow(hatchet_client, redis_client, param_config)
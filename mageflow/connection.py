@@ -0,0 +1,136 @@
+import os
+from typing import Optional
+
+from pydantic import BaseModel, Field
+from redis.asyncio import Redis, BlockingConnectionPool
+from redis.asyncio.cluster import RedisCluster
+from redis.asyncio.retry import Retry
+from redis.asyncio.sentinel import Sentinel
+from redis.backoff import ExponentialBackoff
+
+from mageflow.startup import mageflow_config
+
+
+class RedisConnectionConfig(BaseModel):
+    url: Optional[str] = Field(default_factory=lambda: os.getenv("REDIS_URL"))
+    # Every lock, status change and list append takes a connection from the pool
+    max_connections: int = 128
+    # Seconds to wait for a free connection before failing, None waits forever
+    pool_timeout: Optional[float] = 20
+    # Seconds to wait for a reply, None waits forever - a timeout shorter than blocking reads
+    # (swarm events watch blocks on XREAD) fails them, dead connections are found by the keepalive and health checks
+    socket_timeout: Optional[float] = None
+    socket_connect_timeout: Optional[float] = 5
+    socket_keepalive: bool = True
+    health_check_interval: int = 30
+    # Retries for connection and timeout errors, with exponential backoff (seconds)
+    retries: int = 3
+    retry_backoff_base: float = 0.05
+    retry_backoff_cap: float = 1
+    sentinels: list[tuple[str, int]] = Field(default_factory=list)
+    sentinel_master: Optional[str] = None
+    cluster: bool = False
+
+    def connection_kwargs(self) -> dict:
+        return dict(
+            decode_responses=True,  # Mandatory for rapyer
+            socket_timeout=self.socket_timeout,
+            socket_connect_timeout=self.socket_connect_timeout,
+            socket_keepalive=self.socket_keepalive,
+            health_check_interval=self.health_check_interval,
+            retry=Retry(
+                ExponentialBackoff(self.retry_backoff_cap, self.retry_backoff_base),
+                self.retries,
+            ),
+        )
+
+
+class RedisPoolStats(BaseModel):
+    max_connections: int
+    # None when the redis client doesn't expose its pool connections
+    created: Optional[int] = None
+    in_use: Optional[int] = None
+    available: Optional[int] = None
+
+    @property
+    def utilization(self) -> Optional[float]:
+        if self.in_use is None:
+            return None
+        return self.in_use / self.max_connections if self.max_connections else 0.0
+
+
+def create_redis_client(config: RedisConnectionConfig) -> Redis | RedisCluster:
+    connection_kwargs = config.connection_kwargs()
+    if config.cluster:
+        return RedisCluster.from_url(
+            config.url, max_connections=config.max_connections, **connection_kwargs
+        )
+    if config.sentinels:
+        if config.sentinel_master is None:
+            raise ValueError("sentinel_master is required when sentinels are set")
+        sentinel = Sentinel(config.sentinels, **connection_kwargs)
+        return sentinel.master_for(
+            config.sentinel_master, max_connections=config.max_connections
+        )
+
+    pool = BlockingConnectionPool.from_url(
+        config.url,
+        max_connections=config.max_connections,
+        timeout=config.pool_timeout,
+        **connection_kwargs,
+    )
+    return Redis.from_pool(pool)
+
+
+def resolve_redis_client(
+    redis_client: Redis | RedisCluster | str | None,
+    redis_config: RedisConnectionConfig | None = None,
+) -> Redis | RedisCluster:
+    if redis_client is not None and not isinstance(redis_client, str):
+        return redis_client
+    redis_config = redis_config or RedisConnectionConfig()
+    if isinstance(redis_client, str):
+        redis_config = redis_config.model_copy(update={"url": redis_client})
+    return create_redis_client(redis_config)
+
+
+def _connections_count(pool, attribute: str) -> Optional[int]:
+    # redis-py has no public api for the pool connections, its internals may change between versions
+    connections = getattr(pool, attribute, None)
+    try:
+        return len(connections)
+    except TypeError:
+        return None
+
+
+def _sum_counts(counts: list[Optional[int]]) -> Optional[int]:
+    return None if None in counts else sum(counts)
+
+
+def redis_pool_stats(redis_client: Redis | RedisCluster = None) -> RedisPoolStats:
+    """
+    Connection pool utilization of the client, by default the client mageflow uses.
+    For cluster clients, the pools of all nodes are summed.
+    """
+    redis_client = redis_client or mageflow_config.redis_client
+    if isinstance(redis_client, RedisCluster):
+        nodes = redis_client.get_nodes()
+        created = _sum_counts(
+            [_connections_count(node, "_connections") for node in nodes]
+        )
+        available = _sum_counts([_connections_count(node, "_free") for node in nodes])
+        in_use = created - available if None not in (created, available) else None
+        max_connections = sum(node.max_connections for node in nodes)
+    else:
+        pool = redis_client.connection_pool
+        in_use = _connections_count(pool, "_in_use_connections")
+        available = _connections_count(pool, "_available_connections")
+        created = _sum_counts([in_use, available])
+        max_connections = pool.max_connections
+
+    return RedisPoolStats(
+        max_connections=max_connections,
+        created=created,
+        in_use=in_use,
+        available=available,
+    )
@@ -1,3 +1,6 @@
+from datetime import timedelta
+
+
 class MageflowError(Exception):
     pass
 
@@ -10,6 +13,14 @@ class MissingSwarmItemError(MissingSignatureError):
     pass
 
 
+class MissingSwarmShardError(MissingSwarmItemError):
+    pass
+
+
+class SignatureVersionConflictError(MageflowError):
+    pass
+
+
 class SwarmError(MageflowError):
     pass
 
@@ -20,3 +31,21 @@ class TooManyTasksError(SwarmError, RuntimeError):
 
 class SwarmIsCanceledError(SwarmError, RuntimeError):
     pass
+
+
+class MissingConcurrencyPoolError(MageflowError):
+    pass
+
+
+class MissingPayloadError(MageflowError):
+    pass
+
+
+class TaskRescheduledError(MageflowError):
+    """
+    Ends the task run without its callbacks, the task is run again after the delay
+    """
+
+    def __init__(self, delay: timedelta):
+        super().__init__(f"Task was rescheduled to run in {delay}")
+        self.delay = delay
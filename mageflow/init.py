@@ -6,12 +6,22 @@ from mageflow.callbacks import register_task
 from mageflow.chain.consts import ON_CHAIN_END, ON_CHAIN_ERROR
 from mageflow.chain.messages import ChainSuccessTaskCommandMessage
 from mageflow.chain.workflows import chain_end_task, chain_error_task
-from mageflow.swarm.consts import ON_SWARM_ERROR, ON_SWARM_END, ON_SWARM_START
+from mageflow.signature.consts import ON_SIGNATURES_GC
+from mageflow.signature.workflows import signatures_garbage_collector
+from mageflow.swarm.consts import (
+    ON_SWARM_ERROR,
+    ON_SWARM_END,
+    ON_SWARM_START,
+    ON_SWARM_FILL,
+    ON_SWARM_SLOTS_REAPER,
+)
 from mageflow.swarm.messages import SwarmResultsMessage
 from mageflow.swarm.workflows import (
     swarm_item_failed,
     swarm_item_done,
     swarm_start_tasks,
+    swarm_fill_tasks,
+    swarm_slots_reaper,
 )
 
 
@@ -46,15 +56,39 @@ def init_mageflow_hatchet_tasks(hatchet: Hatchet):
     swarm_error = hatchet.task(
         name=ON_SWARM_ERROR, retries=3, execution_timeout=timedelta(minutes=5)
     )
+    swarm_fill = hatchet.task(
+        name=ON_SWARM_FILL, retries=3, execution_timeout=timedelta(minutes=5)
+    )
+    swarm_reaper = hatchet.task(
+        name=ON_SWARM_SLOTS_REAPER,
+        on_crons=["* * * * *"],
+        execution_timeout=timedelta(minutes=5),
+    )
     swarm_start = swarm_start(swarm_start_tasks)
+    swarm_fill = swarm_fill(swarm_fill_tasks)
+    swarm_reaper = swarm_reaper(swarm_slots_reaper)
     swarm_done = swarm_done(swarm_item_done)
     swarm_error = swarm_error(swarm_item_failed)
     register_swarm_start = register_task(ON_SWARM_START)
     register_swarm_done = register_task(ON_SWARM_END)
     register_swarm_error = register_task(ON_SWARM_ERROR)
+    register_swarm_fill = register_task(ON_SWARM_FILL)
+    register_swarm_reaper = register_task(ON_SWARM_SLOTS_REAPER)
     swarm_start = register_swarm_start(swarm_start)
     swarm_done = register_swarm_done(swarm_done)
     swarm_error = register_swarm_error(swarm_error)
+    swarm_fill = register_swarm_fill(swarm_fill)
+    swarm_reaper = register_swarm_reaper(swarm_reaper)
+
+    # Signatures tasks
+    signatures_gc = hatchet.task(
+        name=ON_SIGNATURES_GC,
+        on_crons=["*/10 * * * *"],
+        execution_timeout=timedelta(minutes=10),
+    )
+    signatures_gc = signatures_gc(signatures_garbage_collector)
+    register_signatures_gc = register_task(ON_SIGNATURES_GC)
+    signatures_gc = register_signatures_gc(signatures_gc)
 
     return [
         on_chain_error_task,
@@ -62,4 +96,7 @@ def init_mageflow_hatchet_tasks(hatchet: Hatchet):
         swarm_start,
         swarm_done,
         swarm_error,
+        swarm_fill,
+        swarm_reaper,
+        signatures_gc,
     ]
@@ -1,20 +1,44 @@
 import asyncio
+import contextlib
+import functools
+from datetime import datetime, timedelta
 from typing import Any
 
 from hatchet_sdk import Context
+from hatchet_sdk.clients.admin import ScheduleTriggerWorkflowOptions
 from hatchet_sdk.runnables.contextvars import ctx_additional_metadata
 from pydantic import BaseModel
 
 from mageflow.invokers.base import BaseInvoker
 from mageflow.signature.consts import TASK_ID_PARAM_NAME
+from mageflow.signature.identity_map import signatures_identity_map
 from mageflow.signature.model import TaskSignature
 from mageflow.signature.status import SignatureStatus
-from mageflow.workflows import TASK_DATA_PARAM_NAME
+from mageflow.startup import mageflow_config
+from mageflow.swarm.consts import (
+    SWARM_ITEM_TASK_ID_PARAM_NAME,
+    SWARM_ITEM_LEASE_TTL_PARAM_NAME,
+    SWARM_ITEM_POOL_PARAM_NAME,
+    SWARM_ITEM_POOL_HOLDER_PARAM_NAME,
+)
+from mageflow.workflows import TASK_DATA_PARAM_NAME, MageflowWorkflow, client_workflow
+
+
+def in_identity_map(func):
+    @functools.wraps(func)
+    async def wrapper(self: "HatchetInvoker", *args, **kwargs):
+        with signatures_identity_map(self.signatures):
+            return await func(self, *args, **kwargs)
+
+    return wrapper
 
 
 class HatchetInvoker(BaseInvoker):
     def __init__(self, message: BaseModel, ctx: Context):
         self.message = message
+        self.ctx = ctx
+        # Signatures loaded along the task execution, each is read once (the task itself runs outside of it)
+        self.signatures: dict[str, TaskSignature] = {}
         self.task_data = ctx.additional_metadata.get(TASK_DATA_PARAM_NAME, {})
         self.workflow_id = ctx.workflow_id
         hatchet_ctx_metadata = ctx_additional_metadata.get() or {}
@@ -25,14 +49,71 @@ class HatchetInvoker(BaseInvoker):
     def task_ctx(self) -> dict:
         return self.task_data
 
+    @in_identity_map
     async def start_task(self) -> TaskSignature | None:
         task_id = self.task_data.get(TASK_ID_PARAM_NAME, None)
         if task_id:
-            async with TaskSignature.lock_from_key(task_id) as signature:
+
+            async def activate(signature: TaskSignature) -> TaskSignature:
                 await signature.change_status(SignatureStatus.ACTIVE)
                 await signature.task_status.aupdate(worker_task_id=self.workflow_id)
                 return signature
 
+            return await TaskSignature.update_from_key(task_id, activate)
+
+    @contextlib.asynccontextmanager
+    async def keep_swarm_item_lease(self):
+        item_key = self.task_data.get(SWARM_ITEM_TASK_ID_PARAM_NAME)
+        lease_ttl = self.task_data.get(SWARM_ITEM_LEASE_TTL_PARAM_NAME)
+        pool_name = self.task_data.get(SWARM_ITEM_POOL_PARAM_NAME)
+        pool_holder = self.task_data.get(SWARM_ITEM_POOL_HOLDER_PARAM_NAME)
+
+        from mageflow.pool.model import ConcurrencyPool
+        from mageflow.swarm.model import BatchItemTaskSignature
+
+        pool = await ConcurrencyPool.get_safe(pool_name) if pool_name else None
+        leases_ttls = [lease_ttl] if lease_ttl else []
+        if pool is not None:
+            leases_ttls.append(pool.lease_ttl.total_seconds())
+        if not item_key or not leases_ttls:
+            yield
+            return
+
+        async def heartbeat():
+            # Both leases are renewed before the shorter one expires
+            while True:
+                if lease_ttl:
+                    await BatchItemTaskSignature.renew_slot_lease(
+                        item_key, timedelta(seconds=lease_ttl)
+                    )
+                if pool is not None:
+                    await pool.renew(pool_holder, [item_key])
+                await asyncio.sleep(min(leases_ttls) / 3)
+
+        heartbeat_task = asyncio.create_task(heartbeat())
+        try:
+            yield
+        finally:
+            heartbeat_task.cancel()
+
+    async def reschedule(self, delay: timedelta):
+        """
+        Run the task again after the delay, with the same input and signature
+        """
+        workflow = client_workflow(
+            mageflow_config.hatchet_client, self.ctx.action.job_name
+        )
+        workflow = MageflowWorkflow(
+            workflow, workflow_params={}, task_ctx=self.task_data
+        )
+        options = ScheduleTriggerWorkflowOptions(
+            additional_metadata=dict(self.ctx.additional_metadata)
+        )
+        await workflow.aio_schedule(
+            datetime.now() + delay, self.ctx.workflow_input, options
+        )
+
+    @in_identity_map
     async def run_success(self, result: Any) -> bool:
         success_publish_tasks = []
         task_id = self.task_data.get(TASK_ID_PARAM_NAME, None)
@@ -46,6 +127,7 @@ class HatchetInvoker(BaseInvoker):
             return True
         return False
 
+    @in_identity_map
     async def run_error(self) -> bool:
         error_publish_tasks = []
         task_id = self.task_data.get(TASK_ID_PARAM_NAME, None)
@@ -59,6 +141,7 @@ class HatchetInvoker(BaseInvoker):
             return True
         return False
 
+    @in_identity_map
     async def remove_task(
         self, with_success: bool = True, with_error: bool = True
     ) -> TaskSignature | None:
@@ -68,6 +151,7 @@ class HatchetInvoker(BaseInvoker):
             if signature:
                 await signature.remove(with_error, with_success)
 
+    @in_identity_map
     async def should_run_task(self) -> bool:
         task_id = self.task_data.get(TASK_ID_PARAM_NAME, None)
         if task_id:
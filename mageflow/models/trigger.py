@@ -0,0 +1,13 @@
+import dataclasses
+from datetime import timedelta
+from typing import Any, Optional
+
+
+@dataclasses.dataclass
+class WorkflowTriggerParams:
+    workflow_name: str
+    input_validator: Any = None
+    workflow_params: dict = dataclasses.field(default_factory=dict)
+    return_value_field: Optional[str] = None
+    task_ctx: dict = dataclasses.field(default_factory=dict)
+    stagger_delta: Optional[timedelta] = None
@@ -0,0 +1,18 @@
+from datetime import timedelta
+from typing import Optional
+
+from mageflow.pool.model import ConcurrencyPool
+
+
+async def concurrency_pool(
+    name: str,
+    limit: int,
+    lease_ttl: timedelta = timedelta(minutes=10),
+    rate_limit: Optional[float] = None,
+    rate_burst: Optional[int] = None,
+) -> ConcurrencyPool:
+    """
+    Create (or update the limits of) a named concurrency pool that swarms and tasks can share.
+    rate_limit - items started per second by all the swarms of the pool, up to rate_burst at once
+    """
+    return await ConcurrencyPool.create(name, limit, lease_ttl, rate_limit, rate_burst)
@@ -0,0 +1,162 @@
+import asyncio
+import contextlib
+import time
+import uuid
+from datetime import timedelta
+from typing import Self, AsyncGenerator, Optional
+
+from rapyer import AtomicRedisModel
+from rapyer.errors.base import KeyNotFound
+
+from mageflow.errors import MissingConcurrencyPoolError
+from mageflow.pool.rate_limit import TokenBucket
+from mageflow.pool.scripts import ACQUIRE_LEASE, RENEW_LEASES, RELEASE_LEASES
+
+POOL_STATE_KEYS = [
+    "leases",
+    "lease_holders",
+    "holders_leases",
+    "holders",
+    "weights",
+    "waiting",
+]
+
+
+class ConcurrencyPool(AtomicRedisModel):
+    """
+    A named budget of running slots shared by several swarms and tasks.
+    Slots are given as leases that expire after lease_ttl, so slots of a dead worker return to the pool.
+    When the pool is contended, each holder gets a share of the limit relative to its weight.
+    """
+
+    limit: int
+    lease_ttl: timedelta = timedelta(minutes=10)
+    # Items started per second by all the pool users, None for no rate limit
+    rate_limit: Optional[float] = None
+    rate_burst: Optional[int] = None
+
+    @classmethod
+    def key_for(cls, name: str) -> str:
+        # Hash tagged, the pool and its state keys are used together in scripts
+        return f"{cls.class_key_initials()}:{{{name}}}"
+
+    @classmethod
+    async def create(
+        cls,
+        name: str,
+        limit: int,
+        lease_ttl: timedelta = timedelta(minutes=10),
+        rate_limit: Optional[float] = None,
+        rate_burst: Optional[int] = None,
+    ) -> Self:
+        pool = cls(
+            limit=limit,
+            lease_ttl=lease_ttl,
+            rate_limit=rate_limit,
+            rate_burst=rate_burst,
+        )
+        pool.key = cls.key_for(name)
+        await pool.asave()
+        return pool
+
+    @classmethod
+    async def get_safe(cls, name: str) -> Optional[Self]:
+        try:
+            return await cls.aget(cls.key_for(name))
+        except KeyNotFound:
+            return None
+
+    @classmethod
+    async def from_name(cls, name: str) -> Self:
+        pool = await cls.get_safe(name)
+        if pool is None:
+            raise MissingConcurrencyPoolError(f"Concurrency pool {name} does not exist")
+        return pool
+
+    @property
+    def state_keys(self) -> list[str]:
+        return [f"{self.key}/{state}" for state in POOL_STATE_KEYS]
+
+    @property
+    def rate_bucket(self) -> Optional[TokenBucket]:
+        if self.rate_limit is None:
+            return None
+        return TokenBucket(
+            self.Meta.redis, f"{self.key}/rate", self.rate_limit, self.rate_burst
+        )
+
+    async def _run_script(self, script: str, *args):
+        run_script = self.Meta.redis.register_script(script)
+        return await run_script(keys=self.state_keys, args=[time.time(), *args])
+
+    async def acquire(
+        self, holder: str, lease_id: str, weight: float = 1, wait: bool = True
+    ) -> bool:
+        """
+        Try to take a slot for lease_id, with wait the holder is marked as waiting when denied,
+        so holders above their share stop borrowing slots.
+        """
+        granted = await self._run_script(
+            ACQUIRE_LEASE,
+            self.lease_ttl.total_seconds(),
+            self.limit,
+            holder,
+            weight,
+            lease_id,
+            int(wait),
+        )
+        return bool(granted)
+
+    async def renew(self, holder: str, lease_ids: list[str]) -> int:
+        if not lease_ids:
+            return 0
+        return await self._run_script(
+            RENEW_LEASES, self.lease_ttl.total_seconds(), holder, *lease_ids
+        )
+
+    async def release(self, lease_ids: list[str]) -> list[str]:
+        """
+        Returns the holders that waited for a slot, they should try again now that slots were freed.
+        """
+        if not lease_ids:
+            return []
+        waiting = await self._run_script(RELEASE_LEASES, *lease_ids)
+        return [
+            holder.decode() if isinstance(holder, bytes) else holder
+            for holder in waiting
+        ]
+
+    async def active_leases(self) -> int:
+        leases_key = self.state_keys[0]
+        return await self.Meta.redis.zcount(leases_key, time.time(), "+inf")
+
+    @contextlib.asynccontextmanager
+    async def lease(
+        self,
+        holder: str,
+        weight: float = 1,
+        poll_interval: timedelta = timedelta(seconds=1),
+    ) -> AsyncGenerator[str, None]:
+        lease_id = uuid.uuid4().hex
+        while not await self.acquire(holder, lease_id, weight):
+            await asyncio.sleep(poll_interval.total_seconds())
+        async with self.keep_lease(holder, lease_id):
+            yield lease_id
+
+    @contextlib.asynccontextmanager
+    async def keep_lease(self, holder: str, lease_id: str) -> AsyncGenerator[str, None]:
+        """
+        Renew an acquired lease while in the context and release it at the end
+        """
+
+        async def keep_alive():
+            while True:
+                await asyncio.sleep(self.lease_ttl.total_seconds() / 3)
+                await self.renew(holder, [lease_id])
+
+        keep_alive_task = asyncio.create_task(keep_alive())
+        try:
+            yield lease_id
+        finally:
+            keep_alive_task.cancel()
+            await self.release([lease_id])
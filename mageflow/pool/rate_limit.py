@@ -0,0 +1,45 @@
+import math
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Optional
+
+from redis.asyncio import Redis
+
+from mageflow.pool.scripts import TAKE_TOKENS
+
+
+@dataclass
+class TokenBucket:
+    """
+    Requests per second limit stored in redis, the bucket holds up to burst tokens and refills at rate tokens per second.
+    """
+
+    redis: Redis
+    key: str
+    rate: float
+    burst: Optional[int] = None
+
+    @property
+    def capacity(self) -> int:
+        return self.burst or max(1, math.ceil(self.rate))
+
+    async def _run(self, requested: int) -> tuple[int, timedelta]:
+        take_tokens = self.redis.register_script(TAKE_TOKENS)
+        granted, retry_after = await take_tokens(
+            keys=[self.key],
+            args=[int(time.time() * 1000), self.rate, self.capacity, requested],
+        )
+        return int(granted), timedelta(seconds=float(retry_after))
+
+    async def take(self, count: int) -> tuple[int, timedelta]:
+        """
+        Take up to count tokens, returns how many were taken and how long until the next token
+        """
+        if count <= 0:
+            return 0, timedelta()
+        return await self._run(count)
+
+    async def refund(self, count: int):
+        if count > 0:
+            await self._run(-count)
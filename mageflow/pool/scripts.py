@@ -0,0 +1,136 @@
+# KEYS of every pool script:
+# 1 - leases (zset of lease id by expiry), 2 - lease holders (hash lease id -> holder)
+# 3 - holders leases count (hash), 4 - registered holders (zset of holder by expiry)
+# 5 - holders weights (hash), 6 - waiting holders (zset of holder by expiry)
+PURGE_EXPIRED = """
+local function purge_expired(now)
+    local expired = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', now)
+    for _, lease_id in ipairs(expired) do
+        local holder = redis.call('HGET', KEYS[2], lease_id)
+        if holder then
+            redis.call('HINCRBY', KEYS[3], holder, -1)
+            redis.call('HDEL', KEYS[2], lease_id)
+        end
+    end
+    if #expired > 0 then
+        redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+    end
+    -- Holders stop counting for the fair share once they are gone and hold no leases
+    for _, holder in ipairs(redis.call('ZRANGEBYSCORE', KEYS[4], '-inf', now)) do
+        if tonumber(redis.call('HGET', KEYS[3], holder) or '0') <= 0 then
+            redis.call('ZREM', KEYS[4], holder)
+            redis.call('HDEL', KEYS[3], holder)
+            redis.call('HDEL', KEYS[5], holder)
+        end
+    end
+    redis.call('ZREMRANGEBYSCORE', KEYS[6], '-inf', now)
+    return #expired
+end
+"""
+
+# ARGV: now, lease ttl, pool limit, holder, holder weight, lease id, wait when denied (0/1)
+ACQUIRE_LEASE = PURGE_EXPIRED + """
+local now = tonumber(ARGV[1])
+local ttl = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+local holder = ARGV[4]
+local weight = tonumber(ARGV[5])
+local lease_id = ARGV[6]
+purge_expired(now)
+redis.call('ZADD', KEYS[4], now + ttl, holder)
+redis.call('HSET', KEYS[5], holder, weight)
+if redis.call('ZSCORE', KEYS[1], lease_id) then
+    redis.call('ZADD', KEYS[1], now + ttl, lease_id)
+    return 1
+end
+
+local granted = false
+if redis.call('ZCARD', KEYS[1]) < limit then
+    local total_weight = 0
+    for _, holder_weight in ipairs(redis.call('HVALS', KEYS[5])) do
+        total_weight = total_weight + tonumber(holder_weight)
+    end
+    local share = math.max(1, math.floor(limit * weight / total_weight))
+    local held = tonumber(redis.call('HGET', KEYS[3], holder) or '0')
+    local others_waiting = redis.call('ZCARD', KEYS[6])
+    if redis.call('ZSCORE', KEYS[6], holder) then
+        others_waiting = others_waiting - 1
+    end
+    -- A holder may borrow above its share only while no one else is waiting
+    granted = held < share or others_waiting == 0
+end
+
+if granted then
+    redis.call('ZADD', KEYS[1], now + ttl, lease_id)
+    redis.call('HSET', KEYS[2], lease_id, holder)
+    redis.call('HINCRBY', KEYS[3], holder, 1)
+    redis.call('ZREM', KEYS[6], holder)
+    return 1
+end
+if ARGV[7] == '1' then
+    redis.call('ZADD', KEYS[6], now + ttl, holder)
+end
+return 0
+"""
+
+# ARGV: now, lease ttl, holder, lease ids...
+RENEW_LEASES = PURGE_EXPIRED + """
+local now = tonumber(ARGV[1])
+local ttl = tonumber(ARGV[2])
+purge_expired(now)
+redis.call('ZADD', KEYS[4], now + ttl, ARGV[3])
+local renewed = 0
+for i = 4, #ARGV do
+    renewed = renewed + redis.call('ZADD', KEYS[1], 'XX', 'CH', now + ttl, ARGV[i])
+end
+return renewed
+"""
+
+# ARGV: now, lease ids... Returns the waiting holders when slots were freed
+RELEASE_LEASES = PURGE_EXPIRED + """
+local freed = purge_expired(tonumber(ARGV[1]))
+for i = 2, #ARGV do
+    local holder = redis.call('HGET', KEYS[2], ARGV[i])
+    if redis.call('ZREM', KEYS[1], ARGV[i]) == 1 then
+        freed = freed + 1
+    end
+    if holder then
+        redis.call('HINCRBY', KEYS[3], holder, -1)
+        redis.call('HDEL', KEYS[2], ARGV[i])
+    end
+end
+if freed == 0 then
+    return {}
+end
+-- Waiting holders stay marked until they get a slot, so others don't borrow the freed slots
+return redis.call('ZRANGE', KEYS[6], 0, -1)
+"""
+
+# KEYS: bucket hash. ARGV: now in milliseconds, rate per second, burst, requested tokens (negative to give tokens back)
+# Returns the granted tokens and the seconds until the next token
+TAKE_TOKENS = """
+local now = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local burst = tonumber(ARGV[3])
+local requested = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(state[1]) or burst
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated_at) / 1000 * rate)
+
+local granted = 0
+if requested < 0 then
+    tokens = math.min(burst, tokens - requested)
+else
+    granted = math.min(requested, math.floor(tokens))
+    tokens = tokens - granted
+end
+redis.call('HSET', KEYS[1], 'tokens', string.format('%.17g', tokens), 'updated_at', ARGV[1])
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+
+local retry_after = 0
+if granted < requested then
+    retry_after = (1 - tokens) / rate
+end
+return {granted, tostring(retry_after)}
+"""
@@ -0,0 +1,181 @@
+import asyncio
+import contextlib
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Unpack
+
+from hatchet_sdk import ClientConfig, WorkflowRunRef
+from hatchet_sdk.clients.admin import (
+    AdminClient,
+    TriggerWorkflowOptions,
+    ScheduleTriggerWorkflowOptions,
+)
+from hatchet_sdk.clients.listeners.run_event_listener import RunEventListenerClient
+from hatchet_sdk.clients.listeners.workflow_listener import PooledWorkflowRunListener
+from hatchet_sdk.contracts.workflows_pb2 import WorkflowVersion
+from hatchet_sdk.features.runs import RunsClient
+from pydantic import BaseModel
+from redis.asyncio import Redis
+
+from mageflow.chain.creator import chain
+from mageflow.connection import RedisConnectionConfig, resolve_redis_client
+from mageflow.models.trigger import WorkflowTriggerParams
+from mageflow.signature.creator import sign, TaskSignatureConvertible
+from mageflow.signature.model import TaskSignature, TaskInputType
+from mageflow.signature.ttl import TTLPolicy
+from mageflow.signature.types import HatchetTaskType
+from mageflow.startup import mageflow_config, init_mageflow, teardown_mageflow
+from mageflow.swarm.creator import swarm, SignatureOptions
+from mageflow.workflows import (
+    TASK_DATA_PARAM_NAME,
+    dump_workflow_params,
+    merge_workflow_input,
+    staggered_run_at,
+    schedule_options,
+    stagger_seconds,
+)
+
+
+class ProducerWorkflow:
+    """
+    Triggers a signature workflow directly through the admin client, without building hatchet workflow objects.
+    Staggered runs are triggered like MageflowWorkflow - scheduled by aio_run_no_wait, delayed in the caller by aio_run.
+    """
+
+    def __init__(self, admin: AdminClient, params: WorkflowTriggerParams):
+        self.admin = admin
+        self.params = params
+
+    def _create_input(self, input: BaseModel | dict | None) -> dict:
+        if isinstance(input, BaseModel):
+            input = input.model_dump(mode="json")
+        dumped_params = dump_workflow_params(self.params.workflow_params)
+        return merge_workflow_input(
+            input or {}, dumped_params, self.params.return_value_field
+        )
+
+    def _update_options(
+        self, options: TriggerWorkflowOptions | ScheduleTriggerWorkflowOptions | None
+    ):
+        if options is None:
+            options = TriggerWorkflowOptions()
+        if self.params.task_ctx:
+            options.additional_metadata[TASK_DATA_PARAM_NAME] = self.params.task_ctx
+        return options
+
+    async def aio_run_no_wait(
+        self,
+        input: BaseModel | dict = None,
+        options: TriggerWorkflowOptions = None,
+    ) -> WorkflowRunRef | WorkflowVersion:
+        if self.params.stagger_delta:
+            return await self.admin.aio_schedule_workflow(
+                self.params.workflow_name,
+                [staggered_run_at(self.params.stagger_delta)],
+                self._create_input(input),
+                schedule_options(self._update_options(options)),
+            )
+        return await self._aio_trigger(input, options)
+
+    async def _aio_trigger(
+        self, input: BaseModel | dict, options: TriggerWorkflowOptions
+    ) -> WorkflowRunRef:
+        return await self.admin.aio_run_workflow(
+            self.params.workflow_name,
+            self._create_input(input),
+            self._update_options(options),
+        )
+
+    async def aio_schedule(
+        self,
+        run_at: datetime,
+        input: BaseModel | dict = None,
+        options: ScheduleTriggerWorkflowOptions = None,
+    ):
+        return await self.admin.aio_schedule_workflow(
+            self.params.workflow_name,
+            [run_at],
+            self._create_input(input),
+            self._update_options(options or ScheduleTriggerWorkflowOptions()),
+        )
+
+    async def aio_run(
+        self,
+        input: BaseModel | dict = None,
+        options: TriggerWorkflowOptions = None,
+    ) -> dict[str, Any]:
+        if self.params.stagger_delta:
+            await asyncio.sleep(stagger_seconds(self.params.stagger_delta))
+        workflow_run = await self._aio_trigger(input, options)
+        return await workflow_run.aio_result()
+
+
+class MageflowProducer:
+    """
+    Client for processes that only create and trigger signatures (chains, swarms, tasks).
+    It doesn't build a hatchet worker client, all triggers share a single admin gRPC channel
+    and all signatures share the redis connection pool of the given client.
+    The producer configures mageflow for the whole process (redis client, ttl policies, triggers),
+    create one producer per process - a later producer or Mageflow client replaces its configuration.
+    """
+
+    def __init__(
+        self,
+        hatchet_config: ClientConfig = None,
+        redis_client: Redis | str = None,
+        redis_config: RedisConnectionConfig = None,
+        optimistic_concurrency: bool = False,
+        ttl_policies: dict[type, TTLPolicy] = None,
+    ):
+        hatchet_config = hatchet_config or ClientConfig()
+        # Workflows are triggered with their registered (already namespaced) names
+        self.hatchet_config = hatchet_config.model_copy(update={"namespace": ""})
+        workflow_listener = PooledWorkflowRunListener(self.hatchet_config)
+        event_listener = RunEventListenerClient(self.hatchet_config)
+        runs = RunsClient(self.hatchet_config, workflow_listener, event_listener)
+        self.admin = AdminClient(
+            self.hatchet_config, workflow_listener, event_listener, runs
+        )
+
+        redis_client = resolve_redis_client(redis_client, redis_config)
+        self.redis = redis_client
+
+        mageflow_config.redis_client = redis_client
+        mageflow_config.producer = self
+        mageflow_config.optimistic_concurrency = optimistic_concurrency
+        mageflow_config.ttl_policies = ttl_policies or {}
+
+    @contextlib.asynccontextmanager
+    async def lifespan(self, app: Any = None) -> AsyncIterator[None]:
+        """
+        Initializes the mageflow storage on the producer redis client and tears it down on exit.
+        Takes the app, so it can be passed as a FastAPI lifespan - FastAPI(lifespan=producer.lifespan).
+        """
+        await init_mageflow()
+        try:
+            yield
+        finally:
+            await teardown_mageflow()
+
+    def workflow(self, params: WorkflowTriggerParams) -> ProducerWorkflow:
+        return ProducerWorkflow(self.admin, params)
+
+    async def sign(self, task: str | HatchetTaskType, **options: Any) -> TaskSignature:
+        return await sign(task, **options)
+
+    async def chain(
+        self,
+        tasks: list[TaskSignatureConvertible],
+        name: str = None,
+        error: TaskInputType = None,
+        success: TaskInputType = None,
+        ttl: timedelta = None,
+    ):
+        return await chain(tasks, name, error, success, ttl)
+
+    async def swarm(
+        self,
+        tasks: list[TaskSignatureConvertible] = None,
+        task_name: str = None,
+        **kwargs: Unpack[SignatureOptions],
+    ):
+        return await swarm(tasks, task_name, **kwargs)
@@ -0,0 +1,224 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from mageflow.errors import MissingSignatureError
+from mageflow.signature.model import (
+    TaskSignature,
+    SIGNATURES_NAME_MAPPING,
+    type_policy_ttl,
+)
+from mageflow.signature.payloads import extend_payloads_ttl
+from mageflow.signature.scripts import TRANSITION_STATUS
+from mageflow.signature.status import SignatureStatus
+from mageflow.signature.status_index import serialize_status, signature_index_keys
+from mageflow.signature.types import TaskIdentifierType
+from rapyer.errors.base import KeyNotFound
+
+BULK_STATUS_BATCH_SIZE = 1000
+
+SIGNATURE_MISSING = 0
+STATUS_UNCHANGED = 1
+STATUS_CHANGED = 2
+RESUMED_FROM_ACTIVE = 3
+
+
+@dataclass
+class StatusChangeCounts:
+    changed: int = 0
+    unchanged: int = 0
+    missing: int = 0
+
+    def __add__(self, other: "StatusChangeCounts") -> "StatusChangeCounts":
+        return StatusChangeCounts(
+            changed=self.changed + other.changed,
+            unchanged=self.unchanged + other.unchanged,
+            missing=self.missing + other.missing,
+        )
+
+    @classmethod
+    def from_results(cls, results: list[int]) -> "StatusChangeCounts":
+        return cls(
+            changed=len([res for res in results if res >= STATUS_CHANGED]),
+            unchanged=results.count(STATUS_UNCHANGED),
+            missing=results.count(SIGNATURE_MISSING),
+        )
+
+
+async def bulk_change_status(
+    task_keys: list[TaskIdentifierType], status: SignatureStatus
+) -> StatusChangeCounts:
+    """
+    Change the status of many signatures with a redis script, in pipelined batches.
+    """
+    return await _bulk_transition(task_keys, status)
+
+
+async def bulk_resume(task_keys: list[TaskIdentifierType]) -> StatusChangeCounts:
+    """
+    Set many signatures back to their last status, signatures that were active are set to pending and run again.
+    """
+    return await _bulk_transition(task_keys, None)
+
+
+def _signature_class(task_key: TaskIdentifierType) -> type[TaskSignature]:
+    class_name = task_key.split(":", maxsplit=1)[0]
+    return SIGNATURES_NAME_MAPPING.get(class_name, TaskSignature)
+
+
+async def _bulk_transition(
+    task_keys: list[TaskIdentifierType], status: Optional[SignatureStatus]
+) -> StatusChangeCounts:
+    from mageflow.swarm.model import BatchItemTaskSignature
+
+    plain_keys, item_keys, container_keys = [], [], []
+    for task_key in task_keys:
+        signature_class = _signature_class(task_key)
+        if signature_class is TaskSignature:
+            plain_keys.append(task_key)
+        elif issubclass(signature_class, BatchItemTaskSignature):
+            item_keys.append(task_key)
+        else:
+            container_keys.append(task_key)
+
+    counts = StatusChangeCounts()
+    if item_keys:
+        # Swarm items status is kept in their original task, the items follow it
+        original_keys = await _load_original_task_keys(item_keys)
+        counts.missing += original_keys.count(None)
+        counts += await _bulk_transition(
+            [key for key in original_keys if key is not None], status
+        )
+        await _run_transition(item_keys, status, BatchItemTaskSignature)
+
+    results = await _run_transition(plain_keys, status, TaskSignature)
+    counts += StatusChangeCounts.from_results(results)
+    if status is None:
+        resumed_keys = [
+            task_key
+            for task_key, result in zip(plain_keys, results)
+            if result == RESUMED_FROM_ACTIVE
+        ]
+        await _run_again(resumed_keys)
+
+    # Chains and swarms change their own sub tasks
+    for container_key in container_keys:
+        counts += await _container_transition(container_key, status)
+    return counts
+
+
+def _status_ttls(signature_class: type[TaskSignature]) -> list:
+    status_ttls = []
+    for status in SignatureStatus:
+        ttl = type_policy_ttl(signature_class, status)
+        ttl = ttl if ttl is not None else signature_class.Meta.ttl
+        status_ttls += [serialize_status(status), ttl if ttl is not None else ""]
+    return status_ttls
+
+
+async def _run_transition(
+    task_keys: list[TaskIdentifierType],
+    status: Optional[SignatureStatus],
+    signature_class: type[TaskSignature],
+) -> list[int]:
+    redis = TaskSignature.Meta.redis
+    transition_status = redis.register_script(TRANSITION_STATUS)
+    results = []
+    for i in range(0, len(task_keys), BULK_STATUS_BATCH_SIZE):
+        batch_keys = task_keys[i : i + BULK_STATUS_BATCH_SIZE]
+        # The status indexes are changed by the script, their keys depend on the task name which never changes
+        task_names = await _load_task_names(batch_keys)
+        args = [
+            serialize_status(status) if status is not None else "",
+            serialize_status(SignatureStatus.ACTIVE),
+            serialize_status(SignatureStatus.PENDING),
+            time.time(),
+            *_status_ttls(signature_class),
+        ]
+        stored_keys = [
+            (task_key, task_name)
+            for task_key, task_name in zip(batch_keys, task_names)
+            if task_name is not None
+        ]
+        async with redis.pipeline(transaction=False) as pipe:
+            for task_key, task_name in stored_keys:
+                index_keys = signature_index_keys(task_key, task_name)
+                await transition_status(
+                    keys=[task_key, *index_keys], args=args, client=pipe
+                )
+            transitions = iter(await pipe.execute())
+        batch_transitions = [
+            next(transitions) if task_name is not None else [SIGNATURE_MISSING]
+            for task_name in task_names
+        ]
+        async with redis.pipeline(transaction=False) as pipe:
+            for transition in batch_transitions:
+                if transition[0] < STATUS_CHANGED:
+                    continue
+                _, _, _, _, ttl, *payload_keys = transition
+                if ttl not in ("", b""):
+                    extend_payloads_ttl(pipe, payload_keys, int(ttl))
+            await pipe.execute()
+        results.extend(transition[0] for transition in batch_transitions)
+    return results
+
+
+async def _load_task_names(task_keys: list[TaskIdentifierType]) -> list[Optional[str]]:
+    redis = TaskSignature.Meta.redis
+    async with redis.pipeline(transaction=False) as pipe:
+        for task_key in task_keys:
+            pipe.json().get(task_key, "$.task_name")
+        results = await pipe.execute(raise_on_error=False)
+    return [res[0] if isinstance(res, list) and res else None for res in results]
+
+
+async def _load_original_task_keys(
+    item_keys: list[TaskIdentifierType],
+) -> list[Optional[TaskIdentifierType]]:
+    redis = TaskSignature.Meta.redis
+    original_keys = []
+    for i in range(0, len(item_keys), BULK_STATUS_BATCH_SIZE):
+        async with redis.pipeline(transaction=False) as pipe:
+            for item_key in item_keys[i : i + BULK_STATUS_BATCH_SIZE]:
+                pipe.json().get(item_key, "$.original_task_id")
+            results = await pipe.execute(raise_on_error=False)
+        original_keys.extend(
+            (
+                TaskSignature.validate_task_key(res[0])
+                if isinstance(res, list) and res
+                else None
+            )
+            for res in results
+        )
+    return original_keys
+
+
+async def _run_again(task_keys: list[TaskIdentifierType]):
+    from hatchet_sdk.runnables.types import EmptyModel
+
+    tasks = await asyncio.gather(
+        *[TaskSignature.get_safe(task_key) for task_key in task_keys]
+    )
+    await asyncio.gather(
+        *[task.aio_run_no_wait(EmptyModel()) for task in tasks if task is not None]
+    )
+
+
+async def _container_transition(
+    task_key: TaskIdentifierType, status: Optional[SignatureStatus]
+) -> StatusChangeCounts:
+    async def transition(task: TaskSignature) -> StatusChangeCounts:
+        previous_status = task.task_status.status
+        if status is None:
+            await task.resume()
+        else:
+            await task.change_status(status)
+        if task.task_status.status == previous_status:
+            return StatusChangeCounts(unchanged=1)
+        return StatusChangeCounts(changed=1)
+
+    try:
+        return await TaskSignature.update_from_key(task_key, transition)
+    except (KeyNotFound, MissingSignatureError):
+        return StatusChangeCounts(missing=1)
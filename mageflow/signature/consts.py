@@ -1,3 +1,21 @@
+from datetime import timedelta
+
 TASK_ID_PARAM_NAME = "task_id"
 
 MAGEFLOW_TASK_INITIALS = "mageflow_"
+
+# Signatures are hash tagged to one of these redis cluster slots, the signatures indexes are kept per slot
+SIGNATURE_SHARDS = 64
+
+# Garbage collection of orphan signatures
+ON_SIGNATURES_GC = f"{MAGEFLOW_TASK_INITIALS}signatures_gc"
+GC_BATCH_SIZE = 500
+# Batches collected from each shard on a run, the next run continues from where it stopped
+GC_MAX_SHARD_BATCHES = 4
+# Signatures younger than this are not collected, their parent may still be stored
+GC_GRACE_PERIOD = timedelta(minutes=10)
+
+# Kwargs values larger than this (in serialized bytes) are stored once by their content hash
+PAYLOAD_OFFLOAD_THRESHOLD = 64 * 1024
+# Payloads kept in the memory of each worker
+PAYLOAD_CACHE_SIZE = 128
@@ -1,6 +1,7 @@
-from datetime import datetime
-from typing import TypeAlias, TypedDict, Any, overload
+from datetime import datetime, timedelta
+from typing import TypeAlias, TypedDict, Any, overload, Optional
 
+from mageflow.signature.hash_tag import WORKFLOW_HASH_TAG, first_hash_tag
 from mageflow.signature.model import (
     TaskSignature,
     TaskIdentifierType,
@@ -22,6 +23,29 @@ async def resolve_signature_key(task: TaskSignatureConvertible) -> TaskSignature
         return await TaskSignature.from_task(task)
 
 
+async def resolve_workflow_task(task: TaskSignatureConvertible) -> TaskSignature:
+    """
+    Resolve a task of a chain or swarm. Plain signatures given as objects are moved to the workflow slot,
+    the given object takes the new key. Signatures given by key keep it, as do chains and swarms,
+    which are referenced by their own signatures.
+    """
+    if type(task) is TaskSignature:
+        return await task.move_to_workflow_slot()
+    return await resolve_signature_key(task)
+
+
+def workflow_hash_tag(tasks: list[TaskSignatureConvertible]) -> Optional[str]:
+    """
+    The hash tag for a workflow of these tasks, reuse the active scope or the slot of already tagged tasks.
+    """
+    task_keys = [
+        task.key if isinstance(task, TaskSignature) else task
+        for task in tasks
+        if isinstance(task, (TaskSignature, TaskIdentifierType))
+    ]
+    return WORKFLOW_HASH_TAG.get() or first_hash_tag(task_keys)
+
+
 try:
     # Python 3.12+
     from typing import Unpack
@@ -38,6 +62,7 @@ class TaskSignatureOptions(TypedDict, total=False):
     error_callbacks: list[TaskIdentifierType]
     task_status: TaskStatus
     task_identifiers: dict
+    ttl: timedelta
 
 
 @overload
@@ -0,0 +1,127 @@
+from collections import defaultdict
+from typing import Optional
+
+from mageflow.signature.garbage_collector import unindex_creation
+from mageflow.signature.hash_tag import key_shard_tag
+from mageflow.signature.identity_map import unmap_signatures
+from mageflow.signature.model import TaskSignature, SIGNATURES_NAME_MAPPING
+from mageflow.signature.status_index import (
+    deserialize_status,
+    status_index_key,
+    task_names_key,
+)
+from mageflow.signature.types import TaskIdentifierType
+
+REMOVE_BATCH_SIZE = 1000
+
+
+async def remove_signatures(
+    task_keys: list[TaskIdentifierType],
+    with_error: bool = True,
+    with_success: bool = True,
+    loaded_fields: dict[str, dict] = None,
+) -> int:
+    """
+    Remove signatures and everything removed along with them (callbacks, swarm items and their tasks).
+    The tree is read a level at a time in pipelined batches, then unlinked in pipelined chunks.
+    with_error / with_success apply to the callbacks of the given signatures, the rest of the tree is removed entirely.
+    loaded_fields - removal fields of already loaded signatures, they are not read again.
+    Returns the number of removed keys.
+    """
+    removed = await collect_removal_tree(
+        task_keys, with_error, with_success, loaded_fields
+    )
+    await unlink_removal_tree(removed)
+    return len(removed)
+
+
+def _node_class(key: TaskIdentifierType) -> type:
+    from mageflow.swarm.model import SwarmShard
+
+    class_name = key.split(":", maxsplit=1)[0]
+    if class_name == SwarmShard.__name__:
+        return SwarmShard
+    return SIGNATURES_NAME_MAPPING.get(class_name, TaskSignature)
+
+
+async def collect_removal_tree(
+    task_keys: list[TaskIdentifierType],
+    with_error: bool = True,
+    with_success: bool = True,
+    loaded_fields: dict[str, dict] = None,
+) -> dict[str, Optional[dict]]:
+    """
+    Map each stored key reachable from the signatures to its removal fields (None for keys that are not signatures).
+    """
+    loaded_fields = loaded_fields or {}
+    removed: dict[str, Optional[dict]] = {}
+    roots = set(task_keys)
+    level = list(dict.fromkeys(task_keys))
+    while level:
+        unknown_keys = [key for key in level if key not in loaded_fields]
+        read_fields = dict(zip(unknown_keys, await _read_removal_fields(unknown_keys)))
+        stored = [loaded_fields.get(key, read_fields.get(key)) for key in level]
+        next_level = []
+        for key, fields in zip(level, stored):
+            if not isinstance(fields, dict):
+                continue
+            node_class = _node_class(key)
+            removed[key] = fields if issubclass(node_class, TaskSignature) else None
+            if key in roots:
+                children = node_class.removed_with(
+                    key, fields, with_error, with_success
+                )
+            else:
+                children = node_class.removed_with(key, fields)
+            next_level.extend(children)
+        level = [
+            TaskSignature.validate_task_key(key)
+            for key in dict.fromkeys(next_level)
+            if TaskSignature.validate_task_key(key) not in removed
+        ]
+    return removed
+
+
+async def _read_removal_fields(keys: list[str]) -> list:
+    redis = TaskSignature.Meta.redis
+    stored = []
+    for i in range(0, len(keys), REMOVE_BATCH_SIZE):
+        async with redis.pipeline(transaction=False) as pipe:
+            for key in keys[i : i + REMOVE_BATCH_SIZE]:
+                pipe.json().get(key, *_node_class(key).removal_paths())
+            stored.extend(await pipe.execute(raise_on_error=False))
+    return stored
+
+
+async def unlink_removal_tree(removed: dict[str, Optional[dict]]):
+    redis = TaskSignature.Meta.redis
+    keys = list(removed)
+    for i in range(0, len(keys), REMOVE_BATCH_SIZE):
+        chunk = keys[i : i + REMOVE_BATCH_SIZE]
+        signature_keys = [key for key in chunk if removed[key] is not None]
+        status_entries, task_names_entries = defaultdict(list), defaultdict(list)
+        for key in signature_keys:
+            fields = removed[key]
+            shard_tag = key_shard_tag(key)
+            task_names_entries[task_names_key(shard_tag)].append(key)
+            status = deserialize_status((fields["$.task_status.status"] or [None])[0])
+            if status is None:
+                continue
+            status_entries[status_index_key(shard_tag, status)].append(key)
+            if fields["$.task_name"]:
+                task_name = fields["$.task_name"][0]
+                status_entries[status_index_key(shard_tag, status, task_name)].append(
+                    key
+                )
+
+        async with redis.pipeline(transaction=False) as pipe:
+            # A command per key, a multi key UNLINK would cross cluster slots
+            for key in chunk:
+                pipe.unlink(key)
+            unindex_creation(pipe, signature_keys)
+            for index_key, index_entries in status_entries.items():
+                pipe.zrem(index_key, *index_entries)
+            for names_key, names_entries in task_names_entries.items():
+                pipe.hdel(names_key, *names_entries)
+            await pipe.execute()
+        unmap_signatures(chunk)
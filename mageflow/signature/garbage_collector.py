@@ -0,0 +1,260 @@
+import asyncio
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import TYPE_CHECKING
+
+from redis.asyncio.client import Pipeline
+
+from mageflow.signature.consts import (
+    GC_BATCH_SIZE,
+    GC_GRACE_PERIOD,
+    GC_MAX_SHARD_BATCHES,
+)
+from mageflow.signature.hash_tag import key_shard_tag, SHARD_HASH_TAGS
+from mageflow.signature.status_index import unindex_status, task_names_key
+from mageflow.signature.types import TaskIdentifierType
+
+if TYPE_CHECKING:
+    from mageflow.signature.model import TaskSignature
+
+# Keys of the stored signatures of each shard slot, scored by their creation time
+SIGNATURE_CREATION_INDEX_PREFIX = "SignatureCreationIndex"
+# The signature holding each callback, until it triggers the callback, in the callback shard slot
+CALLBACK_PARENTS_PREFIX = "SignatureCallbackParents"
+# The creation time each shard creation index is collected from, the next run continues from it
+GC_CURSORS_KEY = "SignatureGCCursors"
+
+
+def creation_index_key(shard_tag: str) -> str:
+    return f"{SIGNATURE_CREATION_INDEX_PREFIX}:{{{shard_tag}}}"
+
+
+def callback_parents_key(shard_tag: str) -> str:
+    return f"{CALLBACK_PARENTS_PREFIX}:{{{shard_tag}}}"
+
+
+def keys_by_shard(
+    task_keys: list[TaskIdentifierType],
+) -> dict[str, list[TaskIdentifierType]]:
+    shard_keys = defaultdict(list)
+    for task_key in task_keys:
+        shard_keys[key_shard_tag(task_key)].append(task_key)
+    return shard_keys
+
+
+@dataclass
+class GarbageCollectionReport:
+    scanned: int = 0
+    # Index entries of signatures that expired by their ttl
+    expired: int = 0
+    deleted: int = 0
+    failed: int = 0
+    bytes_freed: int = 0
+
+    def __add__(self, other: "GarbageCollectionReport") -> "GarbageCollectionReport":
+        return GarbageCollectionReport(
+            scanned=self.scanned + other.scanned,
+            expired=self.expired + other.expired,
+            deleted=self.deleted + other.deleted,
+            failed=self.failed + other.failed,
+            bytes_freed=self.bytes_freed + other.bytes_freed,
+        )
+
+
+def index_creation(pipe: Pipeline, signature: "TaskSignature"):
+    pipe.zadd(
+        creation_index_key(key_shard_tag(signature.key)),
+        {signature.key: signature.creation_time.timestamp()},
+    )
+    callback_keys = [*signature.success_callbacks, *signature.error_callbacks]
+    index_callbacks_parent(pipe, signature.key, callback_keys)
+
+
+def index_callbacks_parent(
+    pipe: Pipeline,
+    parent_key: TaskIdentifierType,
+    callback_keys: list[TaskIdentifierType],
+):
+    for shard_tag, shard_callback_keys in keys_by_shard(callback_keys).items():
+        mapping = {callback_key: parent_key for callback_key in shard_callback_keys}
+        pipe.hset(callback_parents_key(shard_tag), mapping=mapping)
+
+
+def unindex_callbacks_parent(pipe: Pipeline, callback_keys: list[TaskIdentifierType]):
+    for shard_tag, shard_callback_keys in keys_by_shard(callback_keys).items():
+        pipe.hdel(callback_parents_key(shard_tag), *shard_callback_keys)
+
+
+def unindex_creation(pipe: Pipeline, task_keys: list[TaskIdentifierType]):
+    for shard_tag, shard_keys in keys_by_shard(task_keys).items():
+        pipe.zrem(creation_index_key(shard_tag), *shard_keys)
+    unindex_callbacks_parent(pipe, task_keys)
+
+
+async def collect_garbage(
+    grace_period: timedelta = GC_GRACE_PERIOD,
+    batch_size: int = GC_BATCH_SIZE,
+    max_shard_batches: int = GC_MAX_SHARD_BATCHES,
+) -> GarbageCollectionReport:
+    """
+    Delete orphan signatures - callbacks whose parent was deleted before triggering them,
+    and swarm items whose swarm was deleted. Index entries of expired signatures are dropped.
+    Each shard creation index is collected incrementally, up to max_shard_batches batches per run,
+    from where the previous run stopped. A shard collected to its end starts over on the next run.
+    """
+    from mageflow.signature.model import TaskSignature
+
+    redis = TaskSignature.Meta.redis
+    created_before = time.time() - grace_period.total_seconds()
+    stored_cursors = await redis.hmget(GC_CURSORS_KEY, SHARD_HASH_TAGS)
+    report = GarbageCollectionReport()
+    next_cursors = {}
+    for shard_tag, cursor in zip(SHARD_HASH_TAGS, stored_cursors):
+        shard_report, next_cursor = await _collect_shard(
+            shard_tag,
+            float(cursor) if cursor is not None else "-inf",
+            created_before,
+            batch_size,
+            max_shard_batches,
+        )
+        report += shard_report
+        next_cursors[shard_tag] = next_cursor
+    await redis.hset(GC_CURSORS_KEY, mapping=next_cursors)
+    return report
+
+
+async def _collect_shard(
+    shard_tag: str,
+    cursor: float | str,
+    created_before: float,
+    batch_size: int,
+    max_batches: int,
+) -> tuple[GarbageCollectionReport, float | str]:
+    from mageflow.signature.model import TaskSignature
+
+    redis = TaskSignature.Meta.redis
+    report = GarbageCollectionReport()
+    # Walk by creation time rather than offset, deletions cascade to signatures anywhere in the index
+    min_score, keys_at_min_score = cursor, set()
+    for _ in range(max_batches):
+        limit = batch_size + len(keys_at_min_score)
+        entries = await redis.zrangebyscore(
+            creation_index_key(shard_tag),
+            min_score,
+            created_before,
+            start=0,
+            num=limit,
+            withscores=True,
+        )
+        entries = [
+            (TaskSignature.validate_task_key(task_key), score)
+            for task_key, score in entries
+        ]
+        batch = [key for key, _ in entries if key not in keys_at_min_score]
+        if not batch:
+            return report, "-inf"
+        report += await _collect_batch(batch)
+        if len(entries) < limit:
+            return report, "-inf"
+        last_score = entries[-1][1]
+        if last_score != min_score:
+            min_score, keys_at_min_score = last_score, set()
+        keys_at_min_score.update(key for key, score in entries if score == last_score)
+    # The entries created at the last score are collected again by the next run
+    return report, min_score
+
+
+async def _collect_batch(
+    task_keys: list[TaskIdentifierType],
+) -> GarbageCollectionReport:
+    from mageflow.signature.model import TaskSignature
+
+    redis = TaskSignature.Meta.redis
+    async with redis.pipeline(transaction=False) as pipe:
+        for task_key in task_keys:
+            pipe.json().get(task_key, "$.swarm_id")
+        # The batch is of a single shard
+        pipe.hmget(callback_parents_key(key_shard_tag(task_keys[0])), task_keys)
+        *swarm_ids, parent_keys = await pipe.execute(raise_on_error=False)
+
+    expired_keys = []
+    owner_keys: dict[TaskIdentifierType, TaskIdentifierType] = {}
+    for task_key, swarm_id, parent_key in zip(task_keys, swarm_ids, parent_keys):
+        if swarm_id is None:
+            expired_keys.append(task_key)
+        elif isinstance(swarm_id, list) and swarm_id:
+            owner_keys[task_key] = TaskSignature.validate_task_key(swarm_id[0])
+        elif parent_key is not None:
+            owner_keys[task_key] = TaskSignature.validate_task_key(parent_key)
+
+    async with redis.pipeline(transaction=False) as pipe:
+        for owner_key in owner_keys.values():
+            pipe.exists(owner_key)
+        owners_exist = await pipe.execute()
+    orphan_keys = [
+        task_key for task_key, exists in zip(owner_keys, owners_exist) if not exists
+    ]
+
+    report = GarbageCollectionReport(scanned=len(task_keys))
+    if orphan_keys:
+        orphans_report, vanished_keys = await _delete_orphans(orphan_keys)
+        report += orphans_report
+        expired_keys.extend(vanished_keys)
+    if expired_keys:
+        await _drop_expired_entries(expired_keys)
+        report.expired += len(expired_keys)
+    return report
+
+
+async def _delete_orphans(
+    orphan_keys: list[TaskIdentifierType],
+) -> tuple[GarbageCollectionReport, list[TaskIdentifierType]]:
+    from mageflow.signature.model import TaskSignature
+
+    redis = TaskSignature.Meta.redis
+    # Not every redis deployment has MEMORY USAGE, those signatures are reported as 0 bytes
+    async with redis.pipeline(transaction=False) as pipe:
+        for orphan_key in orphan_keys:
+            pipe.memory_usage(orphan_key)
+        memory_usages = await pipe.execute(raise_on_error=False)
+    orphans = await asyncio.gather(
+        *[TaskSignature.get_safe(orphan_key) for orphan_key in orphan_keys]
+    )
+    removals = await asyncio.gather(
+        *[orphan.remove() for orphan in orphans if orphan is not None],
+        return_exceptions=True,
+    )
+    removal_results = iter(removals)
+
+    report = GarbageCollectionReport()
+    vanished_keys = []
+    for orphan_key, orphan, memory_usage in zip(orphan_keys, orphans, memory_usages):
+        if orphan is None:
+            vanished_keys.append(orphan_key)
+        elif isinstance(next(removal_results), BaseException):
+            report.failed += 1
+        else:
+            report.deleted += 1
+            report.bytes_freed += memory_usage if isinstance(memory_usage, int) else 0
+    return report, vanished_keys
+
+
+async def _drop_expired_entries(task_keys: list[TaskIdentifierType]):
+    from mageflow.signature.model import TaskSignature
+
+    redis = TaskSignature.Meta.redis
+    # The task names are kept apart from the signatures, to drop their task name status entries after they expired
+    async with redis.pipeline(transaction=False) as pipe:
+        for task_key in task_keys:
+            pipe.hget(task_names_key(key_shard_tag(task_key)), task_key)
+        task_names = await pipe.execute()
+
+    async with redis.pipeline(transaction=False) as pipe:
+        unindex_creation(pipe, task_keys)
+        for task_key, task_name in zip(task_keys, task_names):
+            if isinstance(task_name, bytes):
+                task_name = task_name.decode()
+            unindex_status(pipe, task_key, task_name)
+        await pipe.execute()
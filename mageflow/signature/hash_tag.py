@@ -0,0 +1,78 @@
+import contextlib
+import random
+import uuid
+from contextvars import ContextVar
+from typing import Optional, Iterator
+
+from redis.crc import key_slot
+
+from mageflow.signature.consts import SIGNATURE_SHARDS
+
+# Signatures created while a hash tag is set share a redis cluster slot
+WORKFLOW_HASH_TAG: ContextVar[Optional[str]] = ContextVar(
+    "workflow_hash_tag", default=None
+)
+
+
+def shard_hash_tag(shard: int) -> str:
+    return f"shard-{shard}"
+
+
+SHARD_HASH_TAGS = [shard_hash_tag(shard) for shard in range(SIGNATURE_SHARDS)]
+
+
+def new_hash_tag() -> str:
+    return random.choice(SHARD_HASH_TAGS)
+
+
+def key_hash_tag(key: str) -> Optional[str]:
+    """
+    Return the hash tag redis cluster uses to choose the key slot (the content of the first {...}).
+    """
+    start = key.find("{")
+    if start == -1:
+        return None
+    end = key.find("}", start + 1)
+    if end <= start + 1:
+        return None
+    return key[start + 1 : end]
+
+
+def first_hash_tag(keys: list[str]) -> Optional[str]:
+    for key in keys:
+        hash_tag = key_hash_tag(key)
+        if hash_tag:
+            return hash_tag
+    return None
+
+
+def key_shard_tag(key: str) -> str:
+    """
+    The hash tag of the slot storing the key indexes.
+    Keys stored before signatures were always hash tagged are indexed by their slot.
+    """
+    hash_tag = key_hash_tag(key)
+    if hash_tag:
+        return hash_tag
+    return SHARD_HASH_TAGS[key_slot(key.encode()) % SIGNATURE_SHARDS]
+
+
+def new_signature_pk() -> str:
+    pk = str(uuid.uuid4())
+    hash_tag = WORKFLOW_HASH_TAG.get() or new_hash_tag()
+    return f"{{{hash_tag}}}{pk}"
+
+
+@contextlib.contextmanager
+def workflow_scope(hash_tag: str = None) -> Iterator[str]:
+    """
+    All signatures created in this scope share the same hash tag, so they are stored in the same redis cluster slot.
+    Nested scopes reuse the active hash tag, unrelated workflows get a random one.
+    A given hash tag should be taken from a signature key, the signatures indexes are kept only in the shard slots.
+    """
+    hash_tag = hash_tag or WORKFLOW_HASH_TAG.get() or new_hash_tag()
+    token = WORKFLOW_HASH_TAG.set(hash_tag)
+    try:
+        yield hash_tag
+    finally:
+        WORKFLOW_HASH_TAG.reset(token)
@@ -0,0 +1,48 @@
+import contextlib
+from contextvars import ContextVar
+from typing import Optional, Iterator, TYPE_CHECKING
+
+from mageflow.signature.types import TaskIdentifierType
+
+if TYPE_CHECKING:
+    from mageflow.signature.model import TaskSignature
+
+# Signatures loaded in the current scope by their key, each signature is read once per scope
+SIGNATURES_IDENTITY_MAP: ContextVar[Optional[dict[str, "TaskSignature"]]] = ContextVar(
+    "signatures_identity_map", default=None
+)
+
+
+@contextlib.contextmanager
+def signatures_identity_map(
+    signatures: dict[str, "TaskSignature"] = None,
+) -> Iterator[dict[str, "TaskSignature"]]:
+    """
+    Signatures loaded in this scope are kept by their key and loading them again returns the same instance.
+    Updates of the instance keep it current, locking a signature reloads it.
+    Pass the same dict to share the loaded signatures between scopes.
+    """
+    signatures = signatures if signatures is not None else {}
+    token = SIGNATURES_IDENTITY_MAP.set(signatures)
+    try:
+        yield signatures
+    finally:
+        SIGNATURES_IDENTITY_MAP.reset(token)
+
+
+def mapped_signature(task_key: TaskIdentifierType) -> Optional["TaskSignature"]:
+    signatures = SIGNATURES_IDENTITY_MAP.get()
+    return signatures.get(task_key) if signatures is not None else None
+
+
+def map_signature(signature: "TaskSignature"):
+    signatures = SIGNATURES_IDENTITY_MAP.get()
+    if signatures is not None:
+        signatures[signature.key] = signature
+
+
+def unmap_signatures(task_keys: list[TaskIdentifierType]):
+    signatures = SIGNATURES_IDENTITY_MAP.get()
+    if signatures is not None:
+        for task_key in task_keys:
+            signatures.pop(task_key, None)
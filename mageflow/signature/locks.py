@@ -0,0 +1,29 @@
+import contextlib
+from contextvars import ContextVar
+from typing import AsyncIterator
+
+from rapyer.utils.redis import acquire_lock
+from redis.asyncio import Redis
+
+# Signature locks held by the running flow, including the tasks it gathers
+HELD_SIGNATURE_LOCKS: ContextVar[frozenset[str]] = ContextVar(
+    "held_signature_locks", default=frozenset()
+)
+
+
+@contextlib.asynccontextmanager
+async def acquire_signature_lock(redis: Redis, lock_name: str) -> AsyncIterator[None]:
+    """
+    Lock held until the scope ends. Locking again in a flow that holds the lock does not wait for it,
+    such as a swarm item started by a fill under the swarm lock.
+    """
+    held_locks = HELD_SIGNATURE_LOCKS.get()
+    if lock_name in held_locks:
+        yield
+        return
+    token = HELD_SIGNATURE_LOCKS.set(held_locks | {lock_name})
+    try:
+        async with acquire_lock(redis, lock_name):
+            yield
+    finally:
+        HELD_SIGNATURE_LOCKS.reset(token)
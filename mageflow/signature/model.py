@@ -1,32 +1,85 @@
 import asyncio
 import contextlib
-from datetime import datetime
-from typing import Optional, Self, Any, TypeAlias, AsyncGenerator, ClassVar
+import functools
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from typing import (
+    Optional,
+    Self,
+    Any,
+    TypeAlias,
+    AsyncGenerator,
+    ClassVar,
+    TYPE_CHECKING,
+    Callable,
+    Awaitable,
+    TypeVar,
+)
 
 import rapyer
-from hatchet_sdk.runnables.types import EmptyModel
-from hatchet_sdk.runnables.workflow import Workflow
-from mageflow.errors import MissingSignatureError
+from mageflow.errors import MissingSignatureError, SignatureVersionConflictError
 from mageflow.models.message import ReturnValue
+from mageflow.models.trigger import WorkflowTriggerParams
 from mageflow.signature.consts import TASK_ID_PARAM_NAME
+from mageflow.signature.garbage_collector import (
+    index_creation,
+    index_callbacks_parent,
+    unindex_callbacks_parent,
+    callback_parents_key,
+)
+from mageflow.signature.hash_tag import (
+    new_signature_pk,
+    key_hash_tag,
+    key_shard_tag,
+    WORKFLOW_HASH_TAG,
+)
+from mageflow.signature.identity_map import (
+    mapped_signature,
+    map_signature,
+    unmap_signatures,
+)
+from mageflow.signature.locks import acquire_signature_lock
+from mageflow.signature.payloads import (
+    offload_kwargs,
+    resolve_kwargs,
+    refresh_payloads_ttl,
+    kwargs_payload_keys,
+)
+from mageflow.signature.scripts import VERSIONED_UPDATE
 from mageflow.signature.status import TaskStatus, SignatureStatus, PauseActionTypes
+from mageflow.signature.status_index import (
+    index_status,
+    signature_index_keys,
+    serialized_statuses,
+)
+from mageflow.signature.ttl import ttl_seconds
 from mageflow.signature.types import TaskIdentifierType, HatchetTaskType
 from mageflow.startup import mageflow_config
-from mageflow.task.model import HatchetTaskModel
+from mageflow.task.model import load_task_definition, task_definitions_scope
 from mageflow.utils.models import get_marked_fields
-from mageflow.workflows import MageflowWorkflow
 from pydantic import (
     BaseModel,
     field_validator,
     Field,
+    PrivateAttr,
 )
 from rapyer import AtomicRedisModel
 from rapyer.config import RedisConfig
 from rapyer.errors.base import KeyNotFound
-from rapyer.types import RedisDict, RedisList, RedisDatetime
-from rapyer.utils.redis import acquire_lock
+from rapyer.types import RedisDict, RedisList, RedisDatetime, RedisInt
+from rapyer.types.base import REDIS_DUMP_FLAG_NAME
 from typing_extensions import deprecated
 
+if TYPE_CHECKING:
+    from hatchet_sdk.runnables.workflow import Workflow
+
+T = TypeVar("T")
+
+OPTIMISTIC_UPDATE_ATTEMPTS = 5
+OPTIMISTIC_RETRY_BACKOFF = 0.01
+
 
 class TaskSignature(AtomicRedisModel):
     task_name: str
@@ -37,8 +90,22 @@ class TaskSignature(AtomicRedisModel):
     error_callbacks: RedisList[TaskIdentifierType] = Field(default_factory=list)
     task_status: TaskStatus = Field(default_factory=TaskStatus)
     task_identifiers: RedisDict = Field(default_factory=dict)
-
-    Meta: ClassVar[RedisConfig] = RedisConfig(ttl=24 * 60 * 60)
+    # Bumped on every status change, optimistic updates are applied only over the version they loaded
+    version: RedisInt = 0
+    # Keys of the offloaded kwargs values, they are kept as long as the signature
+    payload_keys: RedisList[str] = Field(default_factory=list)
+    # Seconds the signature is kept after its last activity, set where it is created - overrides the ttl policies
+    ttl: Optional[int] = None
+    # Signatures created in a workflow scope are hash tagged to the workflow cluster slot
+    _pk: str = PrivateAttr(default_factory=new_signature_pk)
+
+    # The ttl is refreshed by the signature itself, on updates and status changes, see signature_ttl
+    Meta: ClassVar[RedisConfig] = RedisConfig(ttl=24 * 60 * 60, refresh_ttl=False)
+
+    @field_validator("ttl", mode="before")
+    @classmethod
+    def validate_ttl(cls, v: Optional[timedelta | int]) -> Optional[int]:
+        return ttl_seconds(v)
 
     @field_validator("success_callbacks", "error_callbacks", mode="before")
     @classmethod
@@ -76,19 +143,69 @@ class TaskSignature(AtomicRedisModel):
         await signature.save()
         return signature
 
+    async def asave(self) -> Self:
+        ttl = self.signature_ttl()
+        self.kwargs.update(await offload_kwargs(self.kwargs, ttl))
+        new_keys = set(kwargs_payload_keys(self.kwargs)) - set(self.payload_keys)
+        self.payload_keys.extend(sorted(new_keys))
+        await super().asave()
+        async with self.Meta.redis.pipeline(transaction=False) as pipe:
+            if ttl is not None:
+                pipe.expire(self.key, ttl)
+            index_status(pipe, self.key, self.task_name, self.task_status.status)
+            index_creation(pipe, self)
+            await pipe.execute()
+        map_signature(self)
+        return self
+
+    def signature_ttl(self, status: SignatureStatus = None) -> Optional[int]:
+        """
+        Seconds to keep the signature in a status (the current one by default) -
+        the ttl it was created with, else the ttl policy of its type, else the default ttl.
+        """
+        if self.ttl is not None:
+            return self.ttl
+        policy_ttl = type_policy_ttl(type(self), status or self.task_status.status)
+        return policy_ttl if policy_ttl is not None else self.Meta.ttl
+
+    async def refresh_ttl_if_needed(self):
+        ttl = self.signature_ttl()
+        if ttl is not None:
+            await self.Meta.redis.expire(self.key, ttl)
+        await refresh_payloads_ttl(self.payload_keys, ttl)
+
     @classmethod
     async def get_safe(cls, task_key: TaskIdentifierType) -> Optional[Self]:
+        signature = mapped_signature(task_key)
+        if signature is not None:
+            return signature
         try:
-            return await rapyer.aget(task_key)
+            signature = await rapyer.aget(task_key)
         except KeyNotFound:
             return None
+        map_signature(signature)
+        return signature
+
+    @classmethod
+    @contextlib.asynccontextmanager
+    async def alock_from_key(
+        cls, key: str, action: str = "default", save_at_end: bool = False
+    ) -> AsyncGenerator[Self, None]:
+        # The signature is reloaded under the lock, the instance loaded before may be stale
+        unmap_signatures([key])
+        async with acquire_signature_lock(cls.Meta.redis, f"{key}/{action}"):
+            redis_model = await cls.aget(key)
+            map_signature(redis_model)
+            yield redis_model
+            if save_at_end:
+                await redis_model.asave()
 
     @classmethod
     async def from_task_name(
         cls, task_name: str, model_validators: type[BaseModel] = None, **kwargs
     ) -> Self:
         if not model_validators:
-            task_def = await HatchetTaskModel.safe_get(task_name)
+            task_def = await load_task_definition(task_name)
             model_validators = task_def.input_validator if task_def else None
 
         signature = cls(
@@ -99,6 +216,7 @@ class TaskSignature(AtomicRedisModel):
 
     @classmethod
     async def delete_signature(cls, task_key: TaskIdentifierType):
+        unmap_signatures([task_key])
         result = await mageflow_config.redis_client.remove(task_key)
         return result
 
@@ -112,47 +230,50 @@ class TaskSignature(AtomicRedisModel):
         async with self.pipeline() as signature:
             await signature.success_callbacks.aextend(success)
             await signature.error_callbacks.aextend(errors)
+        async with self.Meta.redis.pipeline(transaction=False) as pipe:
+            index_callbacks_parent(pipe, self.key, (success or []) + (errors or []))
+            await pipe.execute()
 
     def return_value_field(self) -> Optional[str]:
-        marked_field = get_marked_fields(self.model_validators, ReturnValue)
-        try:
-            return_field_name = marked_field[0][1]
-        except IndexError:
-            return_field_name = None
-        return return_field_name or "results"
+        return marked_return_field(self.model_validators) or "results"
 
-    async def workflow(self, use_return_field: bool = True, **task_additional_params):
-        total_kwargs = self.kwargs | task_additional_params
-        task_def = await HatchetTaskModel.safe_get(self.task_name)
+    async def trigger_params(
+        self, use_return_field: bool = True, **task_additional_params
+    ) -> WorkflowTriggerParams:
+        total_kwargs = await resolve_kwargs(self.kwargs | task_additional_params)
+        task_def = await load_task_definition(self.task_name)
         task = task_def.task_name if task_def else self.task_name
         return_field = self.return_value_field() if use_return_field else None
-
-        workflow = mageflow_config.hatchet_client.workflow(
-            name=task, input_validator=self.model_validators
-        )
-        mageflow_wf = MageflowWorkflow(
-            workflow,
+        return WorkflowTriggerParams(
+            workflow_name=task,
+            input_validator=self.model_validators,
             workflow_params=total_kwargs,
             return_value_field=return_field,
             task_ctx=self.task_ctx(),
+            stagger_delta=task_def.stagger_delta if task_def else None,
         )
-        return mageflow_wf
+
+    async def workflow(self, use_return_field: bool = True, **task_additional_params):
+        params = await self.trigger_params(use_return_field, **task_additional_params)
+        return trigger_workflow(params)
 
     def task_ctx(self) -> dict:
         return self.task_identifiers | {TASK_ID_PARAM_NAME: self.key}
 
-    async def aio_run_no_wait(self, msg: BaseModel, **kwargs):
-        workflow = await self.workflow(use_return_field=False)
+    async def aio_run_no_wait(self, msg: BaseModel, task_kwargs: dict = None, **kwargs):
+        # task_kwargs are merged over the signature kwargs for this run only, they are not stored
+        workflow = await self.workflow(use_return_field=False, **(task_kwargs or {}))
         return await workflow.aio_run_no_wait(msg, **kwargs)
 
     async def callback_workflows(
         self, with_success: bool = True, with_error: bool = True, **kwargs
-    ) -> list[Workflow]:
+    ) -> list["Workflow"]:
         callback_ids = []
         if with_success:
             callback_ids.extend(self.success_callbacks)
         if with_error:
             callback_ids.extend(self.error_callbacks)
+        callback_ids = list(dict.fromkeys(callback_ids))
         callbacks_signatures = await asyncio.gather(
             *[TaskSignature.get_safe(callback_id) for callback_id in callback_ids]
         )
@@ -160,9 +281,11 @@ class TaskSignature(AtomicRedisModel):
             raise MissingSignatureError(
                 f"Some callbacks not found {callback_ids}, signature can be called only once"
             )
-        workflows = await asyncio.gather(
-            *[callback.workflow(**kwargs) for callback in callbacks_signatures]
-        )
+        # Callbacks of the same task share one task definition lookup
+        with task_definitions_scope():
+            workflows = await asyncio.gather(
+                *[callback.workflow(**kwargs) for callback in callbacks_signatures]
+            )
         return workflows
 
     async def activate_callbacks(
@@ -170,6 +293,16 @@ class TaskSignature(AtomicRedisModel):
     ):
         workflows = await self.callback_workflows(with_success, with_error, **kwargs)
         await asyncio.gather(*[workflow.aio_run_no_wait(msg) for workflow in workflows])
+        # Triggered callbacks outlive their parent, they are no longer collected as orphans
+        triggered_callbacks = []
+        if with_success:
+            triggered_callbacks.extend(self.success_callbacks)
+        if with_error:
+            triggered_callbacks.extend(self.error_callbacks)
+        if triggered_callbacks:
+            async with self.Meta.redis.pipeline(transaction=False) as pipe:
+                unindex_callbacks_parent(pipe, triggered_callbacks)
+                await pipe.execute()
 
     async def activate_success(self, msg, **kwargs):
         return await self.activate_callbacks(
@@ -187,40 +320,87 @@ class TaskSignature(AtomicRedisModel):
 
     @classmethod
     async def try_remove(cls, task_key: TaskIdentifierType, **kwargs):
+        from mageflow.signature.deletion import remove_signatures
+
         try:
-            task = await cls.get_safe(task_key)
-            await task.remove(**kwargs)
+            await remove_signatures([task_key], **kwargs)
         except Exception as e:
             pass
 
     async def remove(self, with_error: bool = True, with_success: bool = True):
         return await self._remove(with_error, with_success)
 
+    async def move_to_workflow_slot(self) -> Self:
+        """
+        Store the signature under a key of the active workflow scope, in the workflow cluster slot,
+        and remove it from its previous key. Callbacks of another signature keep their key.
+        """
+        from mageflow.signature.deletion import unlink_removal_tree
+
+        hash_tag = WORKFLOW_HASH_TAG.get()
+        if hash_tag is None or key_hash_tag(self.key) == hash_tag:
+            return self
+        parents_key = callback_parents_key(key_shard_tag(self.key))
+        if await self.Meta.redis.hexists(parents_key, self.key):
+            return self
+
+        previous_key, removal_fields = self.key, self.removal_fields()
+        self.pk = new_signature_pk()
+        await self.save()
+        await unlink_removal_tree({previous_key: removal_fields})
+        return self
+
     async def _remove(self, with_error: bool = True, with_success: bool = True):
-        addition_tasks_to_delete = []
-        if with_error:
-            addition_tasks_to_delete.extend(
-                [error_id for error_id in self.error_callbacks]
-            )
-        if with_success:
-            addition_tasks_to_delete.extend(
-                [success_id for success_id in self.success_callbacks]
-            )
+        from mageflow.signature.deletion import remove_signatures
 
-        signatures_to_delete = await asyncio.gather(
-            *[TaskSignature.get_safe(task_id) for task_id in addition_tasks_to_delete]
+        # The signature callbacks are taken as loaded, not as stored
+        loaded_fields = {self.key: self.removal_fields()}
+        return await remove_signatures(
+            [self.key], with_error, with_success, loaded_fields
         )
 
-        delete_tasks = [self.delete()]
-        delete_tasks.extend(
-            [
-                signature_to_delete.remove()
-                for signature_to_delete in signatures_to_delete
-                if signature_to_delete
-            ]
-        )
+    def removal_fields(self) -> dict[str, list]:
+        """
+        The removal paths of the signature, in the format of a JSON.GET of these paths
+        """
+        dump = self.redis_dump()
+        fields = {}
+        for path in self.removal_paths():
+            value, found = dump, True
+            for field_name in path.removeprefix("$.").split("."):
+                if not isinstance(value, dict) or field_name not in value:
+                    found = False
+                    break
+                value = value[field_name]
+            fields[path] = [value] if found else []
+        return fields
+
+    @classmethod
+    def removal_paths(cls) -> list[str]:
+        """
+        JSON paths read to find the signatures removed along with a signature of this type
+        """
+        return [
+            "$.task_name",
+            "$.task_status.status",
+            "$.success_callbacks",
+            "$.error_callbacks",
+        ]
 
-        return await asyncio.gather(*delete_tasks)
+    @classmethod
+    def removed_with(
+        cls,
+        task_key: TaskIdentifierType,
+        fields: dict,
+        with_error: bool = True,
+        with_success: bool = True,
+    ) -> list[str]:
+        removed_keys = []
+        if with_success:
+            removed_keys.extend(fields["$.success_callbacks"][0])
+        if with_error:
+            removed_keys.extend(fields["$.error_callbacks"][0])
+        return removed_keys
 
     async def handle_inactive_task(self, msg: BaseModel):
         if self.task_status.status == SignatureStatus.SUSPENDED:
@@ -232,11 +412,86 @@ class TaskSignature(AtomicRedisModel):
         return self.task_status.should_run()
 
     async def change_status(self, status: SignatureStatus) -> bool:
-        await self.task_status.aupdate(
-            last_status=self.task_status.status, status=status
+        previous_status = self.task_status.status
+        await self.aupdate_versioned(
+            self.task_status, last_status=previous_status, status=status
+        )
+
+    async def aupdate_versioned(self, model: AtomicRedisModel, **kwargs):
+        """
+        Update fields of the signature, or of a model nested in it, and bump the signature version.
+        With optimistic concurrency the update is applied only if the version did not change since the signature was loaded.
+        """
+        serialized_fields = model.model_copy(update=kwargs).model_dump(
+            mode="json", context={REDIS_DUMP_FLAG_NAME: True}, include=set(kwargs)
+        )
+        updates = []
+        for field_name in kwargs:
+            updates += [
+                f"{model.json_path}.{field_name}",
+                json.dumps(serialized_fields[field_name]),
+            ]
+        expected_version = (
+            str(self.version) if mageflow_config.optimistic_concurrency else ""
+        )
+        new_status = kwargs.get("status") if model is self.task_status else None
+        ttl = self.signature_ttl(new_status)
+        ttl = ttl if ttl is not None else ""
+        keys, index_args = [self.key], [""]
+        if new_status is not None:
+            # The status index is changed in the same script as the status
+            keys += signature_index_keys(self.key, self.task_name)
+            index_args = [time.time(), *serialized_statuses()]
+        versioned_update = self.Meta.redis.register_script(VERSIONED_UPDATE)
+        new_version = await versioned_update(
+            keys=keys, args=[expected_version, ttl, *index_args, *updates]
+        )
+        if new_version == -1:
+            raise MissingSignatureError(f"Signature {self.key} was deleted")
+        if new_version == 0:
+            raise SignatureVersionConflictError(
+                f"Signature {self.key} changed since version {self.version}"
+            )
+        model.update(**kwargs)
+        self.version = new_version
+        if ttl != "":
+            # The offloaded kwargs are kept as long as the signature
+            await refresh_payloads_ttl(self.payload_keys, ttl)
+
+    @classmethod
+    async def update_from_key(
+        cls,
+        task_key: TaskIdentifierType,
+        update: Callable[["TaskSignature"], Awaitable[T]],
+    ) -> T:
+        """
+        Apply update on the stored signature, under the signature lock or
+        with optimistic concurrency - retrying with a reloaded signature when it changed meanwhile.
+        """
+        if not mageflow_config.optimistic_concurrency:
+            async with lock_from_key(cls, task_key) as task:
+                return await update(task)
+
+        for attempt in range(OPTIMISTIC_UPDATE_ATTEMPTS):
+            task = await rapyer.aget(task_key)
+            try:
+                result = await update(task)
+            except SignatureVersionConflictError:
+                unmap_signatures([task_key])
+                backoff = OPTIMISTIC_RETRY_BACKOFF * 2**attempt
+                await asyncio.sleep(random.uniform(0, backoff))
+            else:
+                map_signature(task)
+                return result
+        raise SignatureVersionConflictError(
+            f"Signature {task_key} kept changing, gave up after {OPTIMISTIC_UPDATE_ATTEMPTS} attempts"
         )
 
     async def aupdate_real_task_kwargs(self, **kwargs):
+        kwargs = await offload_kwargs(kwargs, self.signature_ttl())
+        new_keys = set(kwargs_payload_keys(kwargs)) - set(self.payload_keys)
+        if new_keys:
+            await self.payload_keys.aextend(sorted(new_keys))
         return await self.kwargs.aupdate(**kwargs)
 
     # When pausing signature from outside the task
@@ -245,23 +500,25 @@ class TaskSignature(AtomicRedisModel):
         cls, task_id: TaskIdentifierType, status: SignatureStatus
     ) -> bool:
         try:
-            async with lock_from_key(cls, task_id) as task:
-                return await task.change_status(status)
+            return await cls.update_from_key(
+                task_id, lambda task: task.change_status(status)
+            )
         except Exception as e:
             return False
 
     async def on_pause_signature(self, msg: BaseModel):
-        await self.kwargs.aupdate(**msg.model_dump(mode="json"))
+        await self.aupdate_real_task_kwargs(**msg.model_dump(mode="json"))
 
     async def on_cancel_signature(self, msg: BaseModel):
         await self.remove()
 
     @classmethod
     async def resume_from_key(cls, task_key: TaskIdentifierType):
-        async with lock_from_key(cls, task_key) as task:
-            await task.resume()
+        return await cls.update_from_key(task_key, lambda task: task.resume())
 
     async def resume(self):
+        from hatchet_sdk.runnables.types import EmptyModel
+
         last_status = self.task_status.last_status
         if last_status == SignatureStatus.ACTIVE:
             await self.change_status(SignatureStatus.PENDING)
@@ -271,8 +528,7 @@ class TaskSignature(AtomicRedisModel):
 
     @classmethod
     async def suspend_from_key(cls, task_key: TaskIdentifierType):
-        async with lock_from_key(cls, task_key) as task:
-            await task.suspend()
+        return await cls.update_from_key(task_key, lambda task: task.suspend())
 
     async def suspend(self):
         """
@@ -297,8 +553,9 @@ class TaskSignature(AtomicRedisModel):
         task_key: TaskIdentifierType,
         pause_type: PauseActionTypes = PauseActionTypes.SUSPEND,
     ):
-        async with lock_from_key(cls, task_key) as task:
-            await task.pause_task(pause_type)
+        return await cls.update_from_key(
+            task_key, lambda task: task.pause_task(pause_type)
+        )
 
     async def pause_task(self, pause_type: PauseActionTypes = PauseActionTypes.SUSPEND):
         if pause_type == PauseActionTypes.SUSPEND:
@@ -308,17 +565,61 @@ class TaskSignature(AtomicRedisModel):
         raise NotImplementedError(f"Pause type {pause_type} not supported")
 
 
+def trigger_workflow(params: WorkflowTriggerParams):
+    """
+    The workflow to trigger with the params, producer only processes trigger it through the producer
+    """
+    if mageflow_config.producer is not None:
+        return mageflow_config.producer.workflow(params)
+
+    from mageflow.workflows import MageflowWorkflow, client_workflow
+
+    workflow = client_workflow(
+        mageflow_config.hatchet_client,
+        params.workflow_name,
+        params.input_validator,
+    )
+    return MageflowWorkflow(
+        workflow,
+        workflow_params=params.workflow_params,
+        return_value_field=params.return_value_field,
+        task_ctx=params.task_ctx,
+        stagger_delta=params.stagger_delta,
+    )
+
+
+def type_policy_ttl(
+    signature_type: type["TaskSignature"], status: SignatureStatus
+) -> Optional[int]:
+    for klass in signature_type.__mro__:
+        policy = mageflow_config.ttl_policies.get(klass)
+        if policy is not None:
+            return policy.ttl_for(status)
+    return None
+
+
 @contextlib.asynccontextmanager
 @deprecated(f"You should switch to rapyer 1.1.1 with rapyer.lock_from_key")
 async def lock_from_key(
     cls, key: str, action: str = "default", save_at_end: bool = False
 ) -> AsyncGenerator[TaskSignature, None]:
-    async with acquire_lock(cls.Meta.redis, f"{key}/{action}"):
+    unmap_signatures([key])
+    async with acquire_signature_lock(cls.Meta.redis, f"{key}/{action}"):
         redis_model = await rapyer.aget(key)
+        map_signature(redis_model)
         yield redis_model
         if save_at_end:
             await redis_model.save()
 
 
+@functools.lru_cache(maxsize=None)
+def marked_return_field(model_validators: type[BaseModel]) -> Optional[str]:
+    marked_field = get_marked_fields(model_validators, ReturnValue)
+    try:
+        return marked_field[0][1]
+    except IndexError:
+        return None
+
+
 SIGNATURES_NAME_MAPPING: dict[str, type[TaskSignature]] = {}
 TaskInputType: TypeAlias = TaskIdentifierType | TaskSignature
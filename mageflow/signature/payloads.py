@@ -0,0 +1,143 @@
+import copy
+import hashlib
+from collections import OrderedDict
+from typing import Any, Optional
+
+from rapyer.types.base import RedisType
+from redis.asyncio.client import Pipeline
+
+from mageflow.errors import MissingPayloadError
+from mageflow.signature.consts import PAYLOAD_OFFLOAD_THRESHOLD, PAYLOAD_CACHE_SIZE
+
+# Large kwargs values are stored once under the hash of their content, signatures keep a reference
+PAYLOAD_KEY_PREFIX = "MageflowPayload"
+PAYLOAD_REF_FIELD = "__mageflow_payload__"
+
+# Payloads are immutable by their hash, workers keep the recently used ones
+_payloads_cache: OrderedDict[str, Any] = OrderedDict()
+
+
+def payload_key(content_hash: str) -> str:
+    return f"{PAYLOAD_KEY_PREFIX}:{content_hash}"
+
+
+def payload_ref(value: Any) -> Optional[str]:
+    if isinstance(value, dict) and len(value) == 1 and PAYLOAD_REF_FIELD in value:
+        return value[PAYLOAD_REF_FIELD]
+    return None
+
+
+def kwargs_payload_keys(kwargs: dict) -> list[str]:
+    keys = [payload_ref(value) for value in kwargs.values()]
+    return [key for key in keys if key is not None]
+
+
+def _serialize(value: Any) -> str:
+    # Stored the same way as the signature kwargs, so any value is resolved as it was signed
+    return RedisType.serialize_unknown(value)
+
+
+def _cache_payload(key: str, value: Any):
+    _payloads_cache[key] = value
+    _payloads_cache.move_to_end(key)
+    while len(_payloads_cache) > PAYLOAD_CACHE_SIZE:
+        _payloads_cache.popitem(last=False)
+
+
+def clear_payloads_cache():
+    _payloads_cache.clear()
+
+
+async def offload_kwargs(
+    kwargs: dict, ttl: Optional[int], threshold: int = PAYLOAD_OFFLOAD_THRESHOLD
+) -> dict:
+    """
+    Store the kwargs values larger than the threshold by their content hash and replace them with references.
+    A payload is stored once, storing it again only extends its ttl to the given ttl (None keeps it forever).
+    """
+    from mageflow.signature.model import TaskSignature
+
+    payloads = {}
+    for name, value in kwargs.items():
+        if payload_ref(value) is not None or isinstance(value, (int, float, bool)):
+            continue
+        serialized = _serialize(value)
+        if len(serialized) <= threshold:
+            continue
+        content_hash = hashlib.sha256(serialized.encode()).hexdigest()
+        payloads[name] = (payload_key(content_hash), serialized)
+    if not payloads:
+        return kwargs
+
+    redis = TaskSignature.Meta.redis
+    stored_keys = await _extend_payloads_ttl([key for key, _ in payloads.values()], ttl)
+    async with redis.pipeline(transaction=False) as pipe:
+        for key, serialized in payloads.values():
+            if key not in stored_keys:
+                pipe.set(key, serialized, ex=ttl, nx=True)
+        await pipe.execute()
+
+    offloaded = dict(kwargs)
+    for name, (key, _) in payloads.items():
+        offloaded[name] = {PAYLOAD_REF_FIELD: key}
+    return offloaded
+
+
+async def _extend_payloads_ttl(keys: list[str], ttl: Optional[int]) -> set[str]:
+    from mageflow.signature.model import TaskSignature
+
+    async with TaskSignature.Meta.redis.pipeline(transaction=False) as pipe:
+        for key in keys:
+            pipe.exists(key)
+            if ttl is None:
+                pipe.persist(key)
+            else:
+                extend_payloads_ttl(pipe, [key], ttl)
+        results = await pipe.execute()
+    return {key for key, exists in zip(keys, results[::2]) if exists}
+
+
+def extend_payloads_ttl(pipe: Pipeline, payload_keys: list[str], ttl: int):
+    # Other signatures may reference the payloads for longer
+    for key in payload_keys:
+        pipe.expire(key, ttl, gt=True)
+
+
+async def refresh_payloads_ttl(keys: list[str], ttl: Optional[int]):
+    if keys:
+        await _extend_payloads_ttl(keys, ttl)
+
+
+async def resolve_kwargs(kwargs: dict) -> dict:
+    """
+    Replace payload references with their values, from the worker cache or from redis.
+    """
+    from mageflow.signature.model import TaskSignature
+
+    refs = {name: payload_ref(value) for name, value in kwargs.items()}
+    refs = {name: key for name, key in refs.items() if key is not None}
+    if not refs:
+        return kwargs
+
+    payloads = {key: _payloads_cache.get(key) for key in refs.values()}
+    missing_keys = [key for key, value in payloads.items() if value is None]
+    if missing_keys:
+        # A command per key, payloads are spread across cluster slots
+        async with TaskSignature.Meta.redis.pipeline(transaction=False) as pipe:
+            for key in missing_keys:
+                pipe.get(key)
+            stored = await pipe.execute()
+        for key, serialized in zip(missing_keys, stored):
+            if serialized is None:
+                raise MissingPayloadError(
+                    f"Payload {key} expired before the task was run"
+                )
+            payloads[key] = RedisType.deserialize_unknown(serialized)
+    for key, value in payloads.items():
+        _cache_payload(key, value)
+
+    resolved = dict(kwargs)
+    for name, key in refs.items():
+        # Callers may change the values, the cached payload is kept as stored
+        resolved[name] = copy.deepcopy(payloads[key])
+    return resolved
@@ -0,0 +1,96 @@
+# Keeps the signature (KEYS[1]) indexed only in its status. KEYS[2i], KEYS[2i + 1] are the status and the
+# task name status indexes of the i-th status, whose serialized status is at ARGV[first_status_arg + (i - 1) * step]
+REINDEX_STATUS = """
+local function reindex_status(status, changed_at, first_status_arg, step)
+    for i = 1, (#KEYS - 1) / 2 do
+        if ARGV[first_status_arg + (i - 1) * step] == status then
+            redis.call('ZADD', KEYS[2 * i], changed_at, KEYS[1])
+            redis.call('ZADD', KEYS[2 * i + 1], changed_at, KEYS[1])
+        else
+            redis.call('ZREM', KEYS[2 * i], KEYS[1])
+            redis.call('ZREM', KEYS[2 * i + 1], KEYS[1])
+        end
+    end
+end
+"""
+
+# KEYS: signature, then the status indexes of each status if the status is changed (see REINDEX_STATUS).
+# ARGV: expected version ('' to update regardless of the version), ttl to refresh ('' to keep it),
+# status change time ('' if the status is not changed), the serialized status of each status indexes pair,
+# then json path and value pairs
+# Returns the new version, 0 if the version changed and -1 if the signature is missing
+VERSIONED_UPDATE = REINDEX_STATUS + """
+local stored = redis.call('JSON.GET', KEYS[1], '$.version')
+if not stored then
+    return -1
+end
+local version = tonumber(cjson.decode(stored)[1]) or 0
+if ARGV[1] ~= '' and version ~= tonumber(ARGV[1]) then
+    return 0
+end
+for i = 4 + (#KEYS - 1) / 2, #ARGV, 2 do
+    redis.call('JSON.SET', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+redis.call('JSON.SET', KEYS[1], '$.version', version + 1)
+if ARGV[2] ~= '' then
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+if ARGV[3] ~= '' then
+    local status = cjson.decode(redis.call('JSON.GET', KEYS[1], '$.task_status.status'))[1]
+    reindex_status(status, ARGV[3], 4, 1)
+end
+return version + 1
+"""
+
+# KEYS: signature, then the status indexes of each status in the status and ttl pairs order (see REINDEX_STATUS).
+# ARGV: new status (serialized, '' to resume to the last status), serialized active and pending statuses, status change time,
+# then serialized status and ttl pairs - the ttl to refresh in each status ('' to keep it), unless the signature has its own ttl
+# Returns {result} - 0 if the signature is missing, 1 if it is already in the status,
+# or {result, previous status, new status, task name, refreshed ttl ('' if kept), payload keys...} - 2 if changed,
+# 3 if resumed from active - it was set to pending and should be run again
+TRANSITION_STATUS = REINDEX_STATUS + """
+local stored = redis.call(
+    'JSON.GET', KEYS[1], '$.task_status', '$.version', '$.task_name', '$.ttl', '$.payload_keys'
+)
+if not stored then
+    return {0}
+end
+stored = cjson.decode(stored)
+local task_status = stored['$.task_status'][1]
+if not task_status then
+    return {0}
+end
+local status = ARGV[1]
+local result = 2
+if status == '' then
+    status = task_status['last_status']
+    if status == ARGV[2] then
+        status = ARGV[3]
+        result = 3
+    end
+end
+if task_status['status'] == status then
+    return {1}
+end
+redis.call('JSON.SET', KEYS[1], '$.task_status.last_status', cjson.encode(task_status['status']))
+redis.call('JSON.SET', KEYS[1], '$.task_status.status', cjson.encode(status))
+redis.call('JSON.SET', KEYS[1], '$.version', (tonumber(stored['$.version'][1]) or 0) + 1)
+local ttl = stored['$.ttl'][1]
+if ttl == nil or ttl == cjson.null then
+    ttl = ''
+    for i = 5, #ARGV, 2 do
+        if ARGV[i] == status then
+            ttl = ARGV[i + 1]
+        end
+    end
+end
+if ttl ~= '' then
+    redis.call('EXPIRE', KEYS[1], ttl)
+end
+reindex_status(status, ARGV[4], 5, 2)
+local transition = {result, task_status['status'], status, stored['$.task_name'][1], ttl}
+for _, payload_key in ipairs(stored['$.payload_keys'][1] or {}) do
+    table.insert(transition, payload_key)
+end
+return transition
+"""
@@ -0,0 +1,159 @@
+import time
+from typing import Optional
+
+from redis.asyncio.client import Pipeline
+
+from mageflow.signature.hash_tag import key_shard_tag, SHARD_HASH_TAGS
+from mageflow.signature.status import SignatureStatus, TaskStatus
+from mageflow.signature.types import TaskIdentifierType
+from rapyer.types.base import REDIS_DUMP_FLAG_NAME
+
+# Sorted sets of signatures keys by status (and by status and task name), scored by the status change time.
+# Each shard slot has its own indexes, so a signature and its index entries are changed in the same script.
+STATUS_INDEX_PREFIX = "SignatureStatusIndex"
+# The task name of each indexed signature, to drop the task name entries of signatures that expired
+TASK_NAMES_KEY_PREFIX = "SignatureTaskNames"
+
+
+def status_index_key(
+    shard_tag: str, status: SignatureStatus, task_name: str = None
+) -> str:
+    index_key = f"{STATUS_INDEX_PREFIX}:{{{shard_tag}}}:{status.value}"
+    return f"{index_key}:{task_name}" if task_name is not None else index_key
+
+
+def task_names_key(shard_tag: str) -> str:
+    return f"{TASK_NAMES_KEY_PREFIX}:{{{shard_tag}}}"
+
+
+def signature_index_keys(task_key: TaskIdentifierType, task_name: str) -> list[str]:
+    """
+    The status and the task name status index of each status, in the SignatureStatus order, see REINDEX_STATUS
+    """
+    shard_tag = key_shard_tag(task_key)
+    index_keys = []
+    for status in SignatureStatus:
+        index_keys += [
+            status_index_key(shard_tag, status),
+            status_index_key(shard_tag, status, task_name),
+        ]
+    return index_keys
+
+
+def serialize_status(status: SignatureStatus) -> str:
+    dump = TaskStatus(status=status).model_dump(
+        mode="json", context={REDIS_DUMP_FLAG_NAME: True}, include={"status"}
+    )
+    return dump["status"]
+
+
+def deserialize_status(serialized_status: str | bytes) -> Optional[SignatureStatus]:
+    if isinstance(serialized_status, bytes):
+        serialized_status = serialized_status.decode()
+    serialized_statuses = {
+        serialize_status(status): status for status in SignatureStatus
+    }
+    return serialized_statuses.get(serialized_status)
+
+
+def serialized_statuses() -> list[str]:
+    return [serialize_status(status) for status in SignatureStatus]
+
+
+def index_status(
+    pipe: Pipeline,
+    task_key: TaskIdentifierType,
+    task_name: str,
+    status: SignatureStatus,
+):
+    # Status changes are indexed by the status scripts, a saved signature is indexed in its current status
+    shard_tag = key_shard_tag(task_key)
+    changed_at = time.time()
+    pipe.zadd(status_index_key(shard_tag, status), {task_key: changed_at})
+    pipe.zadd(status_index_key(shard_tag, status, task_name), {task_key: changed_at})
+    pipe.hset(task_names_key(shard_tag), task_key, task_name)
+
+
+def unindex_status(
+    pipe: Pipeline, task_key: TaskIdentifierType, task_name: Optional[str]
+):
+    shard_tag = key_shard_tag(task_key)
+    for status in SignatureStatus:
+        pipe.zrem(status_index_key(shard_tag, status), task_key)
+        if task_name is not None:
+            pipe.zrem(status_index_key(shard_tag, status, task_name), task_key)
+    pipe.hdel(task_names_key(shard_tag), task_key)
+
+
+async def signatures_by_status(
+    status: SignatureStatus,
+    task_name: str = None,
+    cursor: float = 0,
+    count: int = 100,
+) -> tuple[list[TaskIdentifierType], Optional[float]]:
+    """
+    Page through the keys of the signatures in a status, oldest status change first.
+    The cursor is the status change time the page starts after.
+    Returns the page keys and the cursor of the next page, None after the last page.
+    Entries of signatures that expired or changed status meanwhile are dropped from the index,
+    so a page may have fewer keys than requested before the last page.
+    """
+    from mageflow.signature.model import TaskSignature
+
+    redis = TaskSignature.Meta.redis
+    async with redis.pipeline(transaction=False) as pipe:
+        for shard_tag in SHARD_HASH_TAGS:
+            pipe.zrangebyscore(
+                status_index_key(shard_tag, status, task_name),
+                f"({cursor!r}",
+                "+inf",
+                start=0,
+                num=count,
+                withscores=True,
+            )
+        shards_entries = await pipe.execute()
+
+    entries = sorted(
+        (score, TaskSignature.validate_task_key(task_key))
+        for shard_entries in shards_entries
+        for task_key, score in shard_entries
+    )
+    if not entries:
+        return [], None
+    # Entries changed at the same time as the last one are kept in the page, the next page starts after that time
+    page = entries[:count]
+    page += [entry for entry in entries[count:] if entry[0] == page[-1][0]]
+    has_more = len(entries) > len(page) or any(
+        len(shard_entries) == count for shard_entries in shards_entries
+    )
+    page_keys = [task_key for _, task_key in page]
+
+    async with redis.pipeline(transaction=False) as pipe:
+        for task_key in page_keys:
+            pipe.json().get(task_key, "$.task_status.status", "$.task_name")
+        stored = await pipe.execute(raise_on_error=False)
+
+    task_keys, stale_entries = [], []
+    for task_key, stored_fields in zip(page_keys, stored):
+        if not isinstance(stored_fields, dict) or not stored_fields.get("$.task_name"):
+            stale_entries.append((task_key, task_name))
+            continue
+        stored_task_name = stored_fields["$.task_name"][0]
+        stored_status = deserialize_status(stored_fields["$.task_status.status"][0])
+        if stored_status != status:
+            stale_entries.append((task_key, stored_task_name))
+            continue
+        task_keys.append(task_key)
+
+    if stale_entries:
+        async with redis.pipeline(transaction=False) as pipe:
+            for task_key, stale_task_name in stale_entries:
+                shard_tag = key_shard_tag(task_key)
+                pipe.zrem(status_index_key(shard_tag, status), task_key)
+                if stale_task_name is not None:
+                    pipe.zrem(
+                        status_index_key(shard_tag, status, stale_task_name), task_key
+                    )
+            await pipe.execute()
+
+    return task_keys, page[-1][0] if has_more else None
@@ -0,0 +1,25 @@
+from datetime import timedelta
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from mageflow.signature.status import SignatureStatus
+
+
+class TTLPolicy(BaseModel):
+    """
+    How long signatures are kept after their last activity, optionally by their status.
+    """
+
+    ttl: Optional[timedelta] = None
+    status_ttls: dict[SignatureStatus, timedelta] = Field(default_factory=dict)
+
+    def ttl_for(self, status: SignatureStatus) -> Optional[int]:
+        ttl = self.status_ttls.get(status, self.ttl)
+        return int(ttl.total_seconds()) if ttl is not None else None
+
+
+def ttl_seconds(ttl: Optional[timedelta | int]) -> Optional[int]:
+    if isinstance(ttl, timedelta):
+        return int(ttl.total_seconds())
+    return ttl
@@ -1,6 +1,7 @@
-from typing import Callable
+from typing import Callable, TYPE_CHECKING, Union
 
-from hatchet_sdk.runnables.workflow import BaseWorkflow
+if TYPE_CHECKING:
+    from hatchet_sdk.runnables.workflow import BaseWorkflow
 
 TaskIdentifierType = str
-HatchetTaskType = BaseWorkflow | Callable
+HatchetTaskType = Union["BaseWorkflow", Callable]
@@ -0,0 +1,16 @@
+import dataclasses
+
+from hatchet_sdk import Context
+from hatchet_sdk.runnables.types import EmptyModel
+
+from mageflow.signature.garbage_collector import collect_garbage
+
+
+async def signatures_garbage_collector(msg: EmptyModel, ctx: Context) -> dict:
+    report = await collect_garbage()
+    ctx.log(
+        f"Signatures garbage collector scanned {report.scanned} signatures - "
+        f"deleted {report.deleted} orphans ({report.bytes_freed} bytes), "
+        f"dropped {report.expired} expired entries, failed {report.failed}"
+    )
+    return dataclasses.asdict(report)
@@ -1,12 +1,18 @@
+from datetime import timedelta
+from typing import TYPE_CHECKING, Any, Optional
+
 import rapyer
-from hatchet_sdk import Hatchet
-from hatchet_sdk.runnables.workflow import Standalone
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from redis.asyncio.client import Redis
+from redis.asyncio.cluster import RedisCluster
 
+from mageflow.signature.ttl import TTLPolicy
 from mageflow.task.model import HatchetTaskModel
 
-REGISTERED_TASKS: list[tuple[Standalone, str]] = []
+if TYPE_CHECKING:
+    from hatchet_sdk.runnables.workflow import Standalone
+
+REGISTERED_TASKS: list[tuple["Standalone", str]] = []
 
 
 class ConfigModel(BaseModel):
@@ -15,8 +21,17 @@ class ConfigModel(BaseModel):
 
 
 class MageFlowConfigModel(ConfigModel):
-    hatchet_client: Hatchet | None = None
-    redis_client: Redis | None = None
+    # Typed as Any so the config can be imported without the hatchet extra
+    hatchet_client: Any = None
+    redis_client: Redis | RedisCluster | None = None
+    # Set in producer only processes, triggers workflows without hatchet workflow objects
+    producer: Any = None
+    # When set, swarm items completions in this window are applied to the swarm together
+    swarm_batch_window: Optional[timedelta] = None
+    # Signatures status updates check the signature version instead of taking the signature lock
+    optimistic_concurrency: bool = False
+    # TTL policies by signature type, a policy applies to the subclasses of its type as well
+    ttl_policies: dict[type, TTLPolicy] = Field(default_factory=dict)
 
 
 mageflow_config = MageFlowConfigModel()
@@ -47,6 +62,7 @@ async def update_register_signature_models():
 
 
 async def register_workflows():
+    hatchet_tasks = []
     for reg_task in REGISTERED_TASKS:
         workflow, mageflow_task_name = reg_task
         hatchet_task = HatchetTaskModel(
@@ -54,13 +70,31 @@ async def register_workflows():
             task_name=workflow.name,
             input_validator=workflow.input_validator,
             retries=workflow.tasks[0].retries,
+            stagger_delta=getattr(workflow, "__stagger_delta__", None),
         )
-        await hatchet_task.save()
+        hatchet_task.content_hash = hatchet_task.calculate_content_hash()
+        hatchet_tasks.append(hatchet_task)
+    if not hatchet_tasks:
+        return []
+
+    # Rolling restarts register the same definitions, only write what changed
+    stored_hashes = await HatchetTaskModel.stored_content_hashes(
+        [hatchet_task.key for hatchet_task in hatchet_tasks]
+    )
+    changed_tasks = [
+        hatchet_task
+        for hatchet_task, stored_hash in zip(hatchet_tasks, stored_hashes)
+        if hatchet_task.content_hash != stored_hash
+    ]
+    if changed_tasks:
+        await HatchetTaskModel.ainsert(*changed_tasks)
+    return changed_tasks
 
 
-async def lifespan_initialize():
+async def lifespan_initialize(app: Any = None):
     await init_mageflow()
-    # yield makes the function usable as a Hatchet lifespan context manager (can also be used for FastAPI):
+    # yield makes the function usable as a Hatchet lifespan context manager (can also be used for FastAPI,
+    # which passes the app - for a producer prefer MageflowProducer.lifespan):
     # - code before yield runs at startup (init config, register workers, etc.)
     # - code after yield would run at shutdown
     yield
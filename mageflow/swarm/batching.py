@@ -0,0 +1,72 @@
+import asyncio
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, Optional, Callable, Awaitable
+
+from mageflow.signature.types import TaskIdentifierType
+
+
+@dataclass
+class SwarmItemCompletion:
+    item_key: TaskIdentifierType
+    succeeded: bool
+    result: Any = None
+    shard_id: Optional[TaskIdentifierType] = None
+    # Used for logging, the worker context of the task that reported the completion
+    ctx: Any = None
+
+
+@dataclass
+class CompletionsBatch:
+    applied: asyncio.Future
+    completions: list[SwarmItemCompletion] = field(default_factory=list)
+
+
+ApplyCompletionsType = Callable[
+    [TaskIdentifierType, list[SwarmItemCompletion]], Awaitable[None]
+]
+
+
+class SwarmCompletionBatcher:
+    """
+    Buffers items completions of the same swarm for a short window and applies them together,
+    so a burst of finished items takes the swarm lock once instead of once per item.
+    """
+
+    def __init__(self, apply_completions: ApplyCompletionsType):
+        self.apply_completions = apply_completions
+        self.pending: dict[TaskIdentifierType, CompletionsBatch] = {}
+        self._flush_tasks: set[asyncio.Task] = set()
+
+    async def submit(
+        self,
+        swarm_key: TaskIdentifierType,
+        completion: SwarmItemCompletion,
+        window: timedelta,
+    ):
+        batch = self.pending.get(swarm_key)
+        if batch is None:
+            batch = CompletionsBatch(applied=asyncio.get_running_loop().create_future())
+            self.pending[swarm_key] = batch
+            flush_task = asyncio.create_task(self._flush(swarm_key, batch, window))
+            self._flush_tasks.add(flush_task)
+            flush_task.add_done_callback(self._flush_tasks.discard)
+        batch.completions.append(completion)
+        # Every reporter waits for the batch, so a failed update fails (and retries) all of them
+        await asyncio.shield(batch.applied)
+
+    async def _flush(
+        self,
+        swarm_key: TaskIdentifierType,
+        batch: CompletionsBatch,
+        window: timedelta,
+    ):
+        await asyncio.sleep(window.total_seconds())
+        # Completions reported from now on are collected to the next batch
+        self.pending.pop(swarm_key, None)
+        try:
+            await self.apply_completions(swarm_key, batch.completions)
+        except Exception as e:
+            batch.applied.set_exception(e)
+        else:
+            batch.applied.set_result(None)
@@ -0,0 +1,76 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+from pydantic import BaseModel, Field
+from rapyer import AtomicRedisModel
+
+# Weight of the latest completion in the smoothed failure rate
+FAILURE_RATE_SMOOTHING = 0.2
+MAX_CONCURRENCY_HISTORY = 100
+
+
+@dataclass
+class ItemOutcome:
+    succeeded: bool
+    # Seconds from the moment the item got a running slot, None if unknown
+    latency: Optional[float] = None
+
+
+class ConcurrencySample(BaseModel):
+    time: datetime
+    limit: int
+
+
+class SwarmConcurrency(AtomicRedisModel):
+    """
+    AIMD controller state of a swarm with adaptive concurrency.
+    The limit grows by one per success until the first congestion (slow start), then by one per full window of
+    successes, and is multiplied by the decrease factor on congestion (slow items or a high failure rate).
+    """
+
+    limit: float = 0
+    slow_start: bool = True
+    failure_rate: float = 0
+    completions_since_decrease: int = 0
+    history: list[ConcurrencySample] = Field(default_factory=list)
+
+    def effective_limit(self, min_concurrency: int) -> int:
+        return max(int(self.limit), min_concurrency)
+
+    def apply_outcome(
+        self,
+        outcome: ItemOutcome,
+        min_concurrency: int,
+        max_concurrency: int,
+        target_latency: Optional[timedelta],
+        max_failure_rate: float,
+        decrease_factor: float,
+    ):
+        self.limit = self.limit or min_concurrency
+        self.failure_rate += FAILURE_RATE_SMOOTHING * (
+            (0 if outcome.succeeded else 1) - self.failure_rate
+        )
+        too_slow = (
+            target_latency is not None
+            and outcome.latency is not None
+            and outcome.latency > target_latency.total_seconds()
+        )
+        is_congested = too_slow or self.failure_rate > max_failure_rate
+        self.completions_since_decrease += 1
+
+        if not is_congested:
+            increase = 1 if self.slow_start else 1 / self.limit
+            self.limit = min(self.limit + increase, max_concurrency)
+        elif self.completions_since_decrease >= self.limit:
+            # Decrease once per window, the rest of the window was sent with the old limit
+            self.slow_start = False
+            self.limit = max(self.limit * decrease_factor, min_concurrency)
+            self.completions_since_decrease = 0
+
+    def record_limit(self, previous_limit: int, min_concurrency: int):
+        limit = self.effective_limit(min_concurrency)
+        if limit == previous_limit:
+            return
+        self.history.append(ConcurrencySample(time=datetime.now(), limit=limit))
+        self.history = self.history[-MAX_CONCURRENCY_HISTORY:]
@@ -1,12 +1,28 @@
 # Params
+from datetime import timedelta
+
 from mageflow.signature.consts import MAGEFLOW_TASK_INITIALS
 
 BATCH_TASK_NAME_INITIALS = "batch-task-"
 SWARM_TASK_ID_PARAM_NAME = "swarm_task_id"
 SWARM_ITEM_TASK_ID_PARAM_NAME = "swarm_item_id"
+SWARM_SHARD_ID_PARAM_NAME = "swarm_shard_id"
+SWARM_ITEM_LEASE_TTL_PARAM_NAME = "swarm_item_lease_ttl"
+SWARM_ITEM_POOL_PARAM_NAME = "swarm_item_pool"
+SWARM_ITEM_POOL_HOLDER_PARAM_NAME = "swarm_item_pool_holder"
+
+# Running slots leases of all the swarms items, scored by the lease expiration time
+SWARM_ITEM_LEASES_KEY = "SwarmItemLeases"
+REAPER_BATCH_SIZE = 100
+
+# Progress events stream of a swarm, approximately capped and kept for a while after the swarm ends
+SWARM_EVENTS_MAX_LENGTH = 10_000
+SWARM_EVENTS_RETENTION = timedelta(hours=1)
 
 
 # Tasks
 ON_SWARM_START = f"{MAGEFLOW_TASK_INITIALS}on_swarm_start"
 ON_SWARM_ERROR = f"{MAGEFLOW_TASK_INITIALS}on_swarm_error"
 ON_SWARM_END = f"{MAGEFLOW_TASK_INITIALS}on_swarm_done"
+ON_SWARM_FILL = f"{MAGEFLOW_TASK_INITIALS}on_swarm_fill"
+ON_SWARM_SLOTS_REAPER = f"{MAGEFLOW_TASK_INITIALS}swarm_slots_reaper"
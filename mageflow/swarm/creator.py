@@ -4,7 +4,9 @@ import uuid
 from mageflow.signature.creator import (
     TaskSignatureConvertible,
     TaskSignatureOptions,
+    workflow_hash_tag,
 )
+from mageflow.signature.hash_tag import workflow_scope
 from mageflow.swarm.model import SwarmTaskSignature, SwarmConfig
 
 try:
@@ -28,7 +30,9 @@ async def swarm(
 ) -> SwarmTaskSignature:
     tasks = tasks or []
     task_name = task_name or f"swarm-task-{uuid.uuid4()}"
-    swarm_signature = SwarmTaskSignature(**kwargs, task_name=task_name)
+    # Items added later are stored in the swarm slot as well, see add_task
+    with workflow_scope(workflow_hash_tag(tasks)):
+        swarm_signature = SwarmTaskSignature(**kwargs, task_name=task_name)
     await swarm_signature.save()
     await asyncio.gather(*[swarm_signature.add_task(task) for task in tasks])
     return swarm_signature
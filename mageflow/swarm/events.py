@@ -0,0 +1,100 @@
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Optional, AsyncIterator, Callable, Awaitable
+
+from pydantic import BaseModel
+from redis.asyncio import Redis
+
+from mageflow.signature.types import TaskIdentifierType
+
+
+class SwarmEventType(str, Enum):
+    ITEM_STARTED = "item_started"
+    ITEM_FINISHED = "item_finished"
+    ITEM_FAILED = "item_failed"
+    SWARM_DONE = "swarm_done"
+    SWARM_FAILED = "swarm_failed"
+
+    def is_terminal(self) -> bool:
+        return self in (SwarmEventType.SWARM_DONE, SwarmEventType.SWARM_FAILED)
+
+
+class SwarmEvent(BaseModel):
+    id: str
+    type: SwarmEventType
+    item_key: Optional[TaskIdentifierType] = None
+    time: datetime
+
+    @classmethod
+    def from_entry(cls, entry_id, fields: dict) -> "SwarmEvent":
+        fields = {_decode(key): _decode(value) for key, value in fields.items()}
+        return cls(
+            id=_decode(entry_id),
+            type=fields["type"],
+            item_key=fields.get("item"),
+            time=datetime.fromtimestamp(float(fields["time"])),
+        )
+
+
+def _decode(value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+@dataclass
+class SwarmEventStream:
+    """
+    Capped redis stream of a swarm progress events, watchers read it instead of polling the swarm items
+    """
+
+    redis: Redis
+    key: str
+    max_length: int
+    ttl: timedelta
+
+    async def publish(
+        self, events: list[tuple[SwarmEventType, Optional[TaskIdentifierType]]]
+    ):
+        if not events:
+            return
+        now = str(time.time())
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for event_type, item_key in events:
+                fields = {"type": event_type.value, "time": now}
+                if item_key is not None:
+                    fields["item"] = item_key
+                pipe.xadd(self.key, fields, maxlen=self.max_length, approximate=True)
+            pipe.expire(self.key, self.ttl)
+            await pipe.execute()
+
+    async def last_event_id(self) -> str:
+        entries = await self.redis.xrevrange(self.key, count=1)
+        return _decode(entries[0][0]) if entries else "0-0"
+
+    async def watch(
+        self,
+        last_id: str = "0-0",
+        block: timedelta = timedelta(seconds=5),
+        is_alive: Optional[Callable[[], Awaitable[bool]]] = None,
+    ) -> AsyncIterator[SwarmEvent]:
+        """
+        last_id - events after this stream id are yielded, "$" for only new events
+        """
+        block_ms = int(block.total_seconds() * 1000)
+        while True:
+            response = await self.redis.xread({self.key: last_id}, block=block_ms)
+            if not response and is_alive is not None and not await is_alive():
+                # The swarm may have ended while blocking, read what was left before stopping
+                response = await self.redis.xread({self.key: last_id})
+                if not response:
+                    return
+            # RESP3 connections return the streams as a dict
+            streams = response.items() if isinstance(response, dict) else response
+            for _, entries in streams:
+                for entry_id, fields in entries:
+                    event = SwarmEvent.from_entry(entry_id, fields)
+                    last_id = event.id
+                    yield event
+                    if event.type.is_terminal():
+                        return
@@ -1,40 +1,93 @@
 import asyncio
-from typing import Self, Any, Optional
+import json
+import math
+import time
+from datetime import datetime, timedelta
+from typing import (
+    Self,
+    Any,
+    Optional,
+    ClassVar,
+    AsyncIterator,
+    AsyncIterable,
+    Callable,
+    Awaitable,
+    ContextManager,
+)
 
-from hatchet_sdk.runnables.types import EmptyModel
 from mageflow.errors import (
     MissingSignatureError,
     MissingSwarmItemError,
+    MissingSwarmShardError,
     TooManyTasksError,
     SwarmIsCanceledError,
 )
+from mageflow.models.trigger import WorkflowTriggerParams
+from mageflow.pool.model import ConcurrencyPool
+from mageflow.pool.rate_limit import TokenBucket
+from mageflow.signature.bulk import bulk_change_status, bulk_resume, StatusChangeCounts
+from mageflow.signature.deletion import remove_signatures
 from mageflow.signature.creator import (
     TaskSignatureConvertible,
     resolve_signature_key,
+    resolve_workflow_task,
 )
-from mageflow.signature.model import TaskSignature
+from mageflow.signature.hash_tag import workflow_scope, key_hash_tag
+from mageflow.signature.model import TaskSignature, trigger_workflow
+from mageflow.signature.payloads import resolve_kwargs
 from mageflow.signature.status import SignatureStatus
 from mageflow.signature.types import TaskIdentifierType
+from mageflow.task.model import load_task_definition
+from mageflow.swarm.batching import SwarmItemCompletion
+from mageflow.swarm.concurrency import SwarmConcurrency, ItemOutcome
 from mageflow.swarm.consts import (
     BATCH_TASK_NAME_INITIALS,
     SWARM_TASK_ID_PARAM_NAME,
     SWARM_ITEM_TASK_ID_PARAM_NAME,
+    SWARM_SHARD_ID_PARAM_NAME,
     ON_SWARM_END,
     ON_SWARM_ERROR,
     ON_SWARM_START,
+    ON_SWARM_FILL,
+    SWARM_ITEM_LEASE_TTL_PARAM_NAME,
+    SWARM_ITEM_POOL_PARAM_NAME,
+    SWARM_ITEM_POOL_HOLDER_PARAM_NAME,
+    SWARM_ITEM_LEASES_KEY,
+    SWARM_EVENTS_MAX_LENGTH,
+    SWARM_EVENTS_RETENTION,
 )
+from mageflow.swarm.events import SwarmEventStream, SwarmEventType, SwarmEvent
 from mageflow.swarm.messages import SwarmResultsMessage
+from mageflow.swarm.scripts import (
+    CLAIM_ITEM_LEASE,
+    RECLAIM_EXPIRED_LEASE,
+    RECORD_COMPLETIONS,
+)
 from mageflow.utils.pythonic import deep_merge
 from pydantic import Field, field_validator, BaseModel
 from rapyer import AtomicRedisModel
+from rapyer.config import RedisConfig
+from rapyer.errors.base import KeyNotFound
 from rapyer.types import RedisList, RedisInt
+from rapyer.types.base import REDIS_DUMP_FLAG_NAME
+from rapyer.utils.redis import acquire_lock
 
 
 class BatchItemTaskSignature(TaskSignature):
     swarm_id: TaskIdentifierType
     original_task_id: TaskIdentifierType
+    shard_id: Optional[TaskIdentifierType] = None
+    # When the item got a running slot, used for the latency of adaptive concurrency swarms
+    run_started_at: Optional[datetime] = None
+    # How many times the item slot lease expired and the item was started again
+    lease_reclaims: int = 0
 
-    async def aio_run_no_wait(self, msg: BaseModel, **orig_task_kwargs):
+    async def aio_run_no_wait(
+        self, msg: BaseModel, with_dispatch_token: bool = False, **orig_task_kwargs
+    ):
+        """
+        with_dispatch_token - the swarm rate limit token was taken for the item by a fill
+        """
         async with self.lock() as swarm_item:
             swarm_task = await SwarmTaskSignature.get_safe(self.swarm_id)
             original_task = await TaskSignature.get_safe(self.original_task_id)
@@ -46,29 +99,124 @@ class BatchItemTaskSignature(TaskSignature):
                 raise MissingSwarmItemError(
                     f"Task {self.original_task_id} was deleted before it was run in swarm"
                 )
-            can_run_task = await swarm_task.add_to_running_tasks(self)
-            kwargs = deep_merge(self.kwargs.clone(), original_task.kwargs.clone())
-            kwargs = deep_merge(kwargs, swarm_task.kwargs.clone())
+            can_run_task = await swarm_task.add_to_running_tasks(
+                self, with_dispatch_token
+            )
             if not can_run_task:
-                kwargs = deep_merge(kwargs, msg.model_dump(mode="json"))
-            await original_task.aupdate_real_task_kwargs(**kwargs)
+                # Queued items are run later without the message
+                await original_task.aupdate_real_task_kwargs(
+                    **msg.model_dump(mode="json")
+                )
+            if can_run_task and swarm_task.config.adaptive_concurrency:
+                await swarm_item.aupdate(run_started_at=datetime.now())
+            lease_ttl = swarm_task.config.item_lease_ttl
+            pool_name = swarm_task.config.concurrency_pool
+            if can_run_task and lease_ttl is not None:
+                await self.lease_slot(lease_ttl)
+            if can_run_task and (lease_ttl is not None or pool_name is not None):
+                # The worker running the task renews the slot and pool leases while it runs
+                lease_identifiers = {SWARM_ITEM_TASK_ID_PARAM_NAME: self.key}
+                if lease_ttl is not None:
+                    lease_identifiers[SWARM_ITEM_LEASE_TTL_PARAM_NAME] = (
+                        lease_ttl.total_seconds()
+                    )
+                if pool_name is not None:
+                    lease_identifiers[SWARM_ITEM_POOL_PARAM_NAME] = str(pool_name)
+                    lease_identifiers[SWARM_ITEM_POOL_HOLDER_PARAM_NAME] = (
+                        swarm_task.key
+                    )
+                await original_task.task_identifiers.aupdate(**lease_identifiers)
             if can_run_task:
-                return await original_task.aio_run_no_wait(msg, **orig_task_kwargs)
+                await swarm_task.publish_events(
+                    [(SwarmEventType.ITEM_STARTED, self.key)]
+                )
+                # The swarm kwargs are merged for the run, not copied into each task
+                # Offloaded values are resolved first, a merged reference would not resolve
+                item_kwargs, task_kwargs, swarm_kwargs = await asyncio.gather(
+                    resolve_kwargs(self.kwargs.clone()),
+                    resolve_kwargs(original_task.kwargs.clone()),
+                    resolve_kwargs(swarm_task.kwargs.clone()),
+                )
+                kwargs = deep_merge(item_kwargs, task_kwargs)
+                kwargs = deep_merge(kwargs, swarm_kwargs)
+                return await original_task.aio_run_no_wait(
+                    msg, task_kwargs=kwargs, **orig_task_kwargs
+                )
 
-            return None
+        if swarm_task.is_sharded:
+            # Sharded swarms take running slots without a lock, one could be freed before this task was queued
+            await swarm_task.fill_running_tasks()
+        return None
 
-    async def _remove(self, with_error: bool = True, with_success: bool = True):
-        remove_self = super()._remove(with_error, with_success)
-        remove_original = TaskSignature.try_remove(self.original_task_id)
-        return await asyncio.gather(remove_self, remove_original)
+    async def lease_slot(self, lease_ttl: timedelta):
+        expire_at = time.time() + lease_ttl.total_seconds()
+        await self.Meta.redis.zadd(SWARM_ITEM_LEASES_KEY, {self.key: expire_at})
+
+    @classmethod
+    async def renew_slot_lease(
+        cls, item_key: TaskIdentifierType, lease_ttl: timedelta
+    ) -> bool:
+        expire_at = time.time() + lease_ttl.total_seconds()
+        # Only existing leases are renewed, a reclaimed slot is not taken back (nor a completing one shortened)
+        renewed = await cls.Meta.redis.zadd(
+            SWARM_ITEM_LEASES_KEY, {item_key: expire_at}, xx=True, gt=True, ch=True
+        )
+        return bool(renewed)
+
+    @classmethod
+    async def claim_completed_lease(cls, item_key: TaskIdentifierType) -> bool:
+        """
+        Keep the lease of a completed item until its completion is recorded, returns False if the slot was reclaimed
+        """
+        claim_lease = cls.Meta.redis.register_script(CLAIM_ITEM_LEASE)
+        return bool(await claim_lease(keys=[SWARM_ITEM_LEASES_KEY], args=[item_key]))
+
+    @classmethod
+    async def reclaim_expired_lease(cls, item_key: TaskIdentifierType) -> bool:
+        reclaim_lease = cls.Meta.redis.register_script(RECLAIM_EXPIRED_LEASE)
+        reclaimed = await reclaim_lease(
+            keys=[SWARM_ITEM_LEASES_KEY], args=[item_key, time.time()]
+        )
+        return bool(reclaimed)
+
+    @classmethod
+    async def release_slot_lease(cls, item_key: TaskIdentifierType) -> bool:
+        return bool(await cls.Meta.redis.zrem(SWARM_ITEM_LEASES_KEY, item_key))
+
+    @classmethod
+    async def expired_slot_leases(cls, limit: int) -> list[TaskIdentifierType]:
+        expired = await cls.Meta.redis.zrangebyscore(
+            SWARM_ITEM_LEASES_KEY, "-inf", time.time(), start=0, num=limit
+        )
+        return [cls.validate_task_key(item_key) for item_key in expired]
+
+    @classmethod
+    def removal_paths(cls) -> list[str]:
+        return super().removal_paths() + ["$.original_task_id"]
+
+    @classmethod
+    def removed_with(
+        cls,
+        task_key: TaskIdentifierType,
+        fields: dict,
+        with_error: bool = True,
+        with_success: bool = True,
+    ) -> list[str]:
+        removed_keys = super().removed_with(task_key, fields, with_error, with_success)
+        return removed_keys + fields["$.original_task_id"]
 
     async def change_status(self, status: SignatureStatus):
         return await TaskSignature.safe_change_status(self.original_task_id, status)
 
     async def resume(self):
-        async with TaskSignature.lock_from_key(self.original_task_id) as task:
+        async def resume_original(task: TaskSignature):
             await task.resume()
-            return await super().change_status(task.task_status.last_status)
+            return task.task_status.last_status
+
+        last_status = await TaskSignature.update_from_key(
+            self.original_task_id, resume_original
+        )
+        return await super().change_status(last_status)
 
     async def suspend(self):
         await TaskSignature.suspend_from_key(self.original_task_id)
@@ -79,15 +227,87 @@ class BatchItemTaskSignature(TaskSignature):
         return await super().change_status(SignatureStatus.INTERRUPTED)
 
 
+class SwarmShard(AtomicRedisModel):
+    """
+    Items state of a bounded part of a sharded swarm, each shard has its own queue and lists
+    """
+
+    swarm_id: TaskIdentifierType
+    tasks: RedisList[TaskIdentifierType] = Field(default_factory=list)
+    tasks_left_to_run: RedisList[TaskIdentifierType] = Field(default_factory=list)
+    finished_tasks: RedisList[TaskIdentifierType] = Field(default_factory=list)
+    failed_tasks: RedisList[TaskIdentifierType] = Field(default_factory=list)
+    tasks_results: RedisList[Any] = Field(default_factory=list)
+
+    # Kept as long as the owning swarm, its ttl is set by the swarm, see SwarmTaskSignature.refresh_shards_ttl
+    Meta: ClassVar[RedisConfig] = RedisConfig(ttl=None)
+
+    @classmethod
+    def from_swarm(cls, swarm_key: TaskIdentifierType, shard_index: int) -> Self:
+        shard = cls(swarm_id=swarm_key)
+        # Derived from the swarm key, so the shard keeps the swarm hash tag
+        shard.pk = f"{swarm_key.split(':', maxsplit=1)[-1]}-{shard_index}"
+        return shard
+
+    @classmethod
+    def from_key(
+        cls, shard_key: TaskIdentifierType, swarm_key: TaskIdentifierType
+    ) -> Self:
+        shard = cls(swarm_id=swarm_key)
+        shard.key = shard_key
+        return shard
+
+    @classmethod
+    def removal_paths(cls) -> list[str]:
+        return ["$.swarm_id", "$.tasks"]
+
+    @classmethod
+    def removed_with(
+        cls,
+        shard_key: TaskIdentifierType,
+        fields: dict,
+        with_error: bool = True,
+        with_success: bool = True,
+    ) -> list[str]:
+        return fields["$.tasks"][0] if fields["$.tasks"] else []
+
+    async def create_if_missing(self, ttl: Optional[int]):
+        created = await self.Meta.redis.json().set(
+            self.key, self.json_path, self.redis_dump(), nx=True
+        )
+        if created and ttl is not None:
+            await self.Meta.redis.expire(self.key, ttl)
+
+
 class SwarmConfig(AtomicRedisModel):
     max_concurrency: int = 30
     stop_after_n_failures: Optional[int] = None
     max_task_allowed: Optional[int] = None
+    # Split the items state to shards of this size, None keeps all the items in the swarm document
+    shard_size: Optional[int] = None
+    # Adjust the running tasks limit between min and max concurrency from the items latency and failures
+    adaptive_concurrency: bool = False
+    min_concurrency: int = 1
+    target_latency: Optional[timedelta] = None
+    max_failure_rate: float = 0.2
+    concurrency_decrease_factor: float = 0.5
+    # Name of a concurrency pool the swarm items take slots from, shared with other swarms and tasks
+    concurrency_pool: Optional[str] = None
+    pool_weight: float = 1
+    # Items started per second, queued items wait for tokens instead of sleeping in a worker
+    rate_limit: Optional[float] = None
+    rate_burst: Optional[int] = None
+    # Running items hold a slot lease renewed by their worker, the reaper reclaims slots of expired leases
+    item_lease_ttl: Optional[timedelta] = None
+    # Times an item with an expired lease is started again before it is failed
+    max_item_reclaims: int = 1
+    # False removes the finished items and keeps only their counts, the success callbacks get no results
+    keep_finished_items: bool = True
 
     def can_add_task(self, swarm: "SwarmTaskSignature") -> bool:
         if self.max_task_allowed is None:
             return True
-        return len(swarm.tasks) < self.max_task_allowed
+        return swarm.total_tasks < self.max_task_allowed
 
 
 class SwarmTaskSignature(TaskSignature):
@@ -101,6 +321,13 @@ class SwarmTaskSignature(TaskSignature):
     # How many tasks can be added to the swarm at a time
     current_running_tasks: RedisInt = 0
     config: SwarmConfig = Field(default_factory=SwarmConfig)
+    # Counters of sharded swarms, the items themselves are stored in the shards
+    tasks_count: RedisInt = 0
+    finished_count: RedisInt = 0
+    failed_count: RedisInt = 0
+    concurrency: SwarmConcurrency = Field(default_factory=SwarmConcurrency)
+    # Position in the items source of a fed swarm, stored after each page so feeding can resume
+    source_cursor: Optional[str] = None
 
     @field_validator(
         "tasks", "tasks_left_to_run", "finished_tasks", "failed_tasks", mode="before"
@@ -109,24 +336,124 @@ class SwarmTaskSignature(TaskSignature):
     def validate_tasks(cls, v):
         return [cls.validate_task_key(item) for item in v]
 
+    @property
+    def is_sharded(self) -> bool:
+        return self.config.shard_size is not None
+
+    @property
+    def counts_items(self) -> bool:
+        # Sharded swarms and swarms that don't keep their finished items count them instead of listing them
+        return self.is_sharded or not self.config.keep_finished_items
+
+    @property
+    def total_tasks(self) -> int:
+        return self.tasks_count if self.counts_items else len(self.tasks)
+
+    @property
+    def pending_items_count(self) -> int:
+        if self.counts_items:
+            return self.tasks_count - self.finished_count - self.failed_count
+        return len(self.tasks) - len(self.finished_tasks) - len(self.failed_tasks)
+
+    @property
+    def concurrency_limit(self) -> int:
+        if not self.config.adaptive_concurrency:
+            return self.config.max_concurrency
+        return self.concurrency.effective_limit(self.config.min_concurrency)
+
     @property
     def has_swarm_started(self):
+        if self.counts_items:
+            return (
+                self.current_running_tasks or self.failed_count or self.finished_count
+            )
         return self.current_running_tasks or self.failed_tasks or self.finished_tasks
 
-    async def aio_run_no_wait(self, msg: BaseModel, **kwargs):
-        await self.kwargs.aupdate(**msg.model_dump(mode="json"))
+    def shards(self) -> list[SwarmShard]:
+        shards_count = math.ceil(self.tasks_count / self.config.shard_size)
+        return [SwarmShard.from_swarm(self.key, i) for i in range(shards_count)]
+
+    async def load_shards(self) -> list[SwarmShard]:
+        try:
+            return await asyncio.gather(*[shard.aload() for shard in self.shards()])
+        except KeyNotFound as e:
+            raise MissingSwarmShardError(
+                f"Shard of swarm {self.key} expired or was deleted"
+            ) from e
+
+    @property
+    def shards_ttl_key(self) -> str:
+        return f"{self.key}/shards-ttl"
+
+    def shards_ttl(self) -> tuple[Optional[int], Optional[int]]:
+        """
+        The shards ttl and how often it is refreshed. Shards are kept a refresh period longer than the swarm,
+        so a shard refreshed a period before the last swarm activity is not removed before the swarm.
+        """
+        ttl = self.signature_ttl()
+        if ttl is None:
+            return None, None
+        refresh_period = max(ttl // 2, 1)
+        return ttl + refresh_period, refresh_period
+
+    async def refresh_shards_ttl(self, force: bool = False):
+        """
+        Keep the shards as long as the swarm, on the swarm activity - at most once per refresh period unless forced.
+        """
+        if not self.is_sharded:
+            return
+        ttl, refresh_period = self.shards_ttl()
+        if force:
+            await self.Meta.redis.set(self.shards_ttl_key, 1, ex=refresh_period)
+        elif not await self.Meta.redis.set(
+            self.shards_ttl_key, 1, ex=refresh_period, nx=True
+        ):
+            return
+        # Counted without the swarm lock, the stored count includes shards created meanwhile
+        tasks_count = int(await self.tasks_count.aload())
+        shards_count = math.ceil(tasks_count / self.config.shard_size)
+        async with self.Meta.redis.pipeline(transaction=False) as pipe:
+            for i in range(shards_count):
+                shard_key = SwarmShard.from_swarm(self.key, i).key
+                if ttl is None:
+                    pipe.persist(shard_key)
+                else:
+                    pipe.expire(shard_key, ttl)
+            await pipe.execute()
+
+    async def refresh_ttl_if_needed(self):
+        await super().refresh_ttl_if_needed()
+        await self.refresh_shards_ttl()
+
+    async def aupdate_versioned(self, model: AtomicRedisModel, **kwargs):
+        await super().aupdate_versioned(model, **kwargs)
+        # The swarm ttl is refreshed, or changed with its status
+        await self.refresh_shards_ttl(force=True)
+
+    async def item_keys(self) -> list[TaskIdentifierType]:
+        if not self.is_sharded:
+            return list(self.tasks)
+        shards = await self.load_shards()
+        return [task_key for shard in shards for task_key in shard.tasks]
+
+    async def aio_run_no_wait(self, msg: BaseModel, task_kwargs: dict = None, **kwargs):
+        # The swarm items are run later by other workers, from the stored swarm kwargs
+        task_kwargs = deep_merge(task_kwargs or {}, msg.model_dump(mode="json"))
+        await self.aupdate_real_task_kwargs(**task_kwargs)
         workflow = await self.workflow(use_return_field=False)
         return await workflow.aio_run_no_wait(msg, **kwargs)
 
-    async def workflow(self, use_return_field: bool = True, **task_additional_params):
+    async def trigger_params(
+        self, use_return_field: bool = True, **task_additional_params
+    ) -> WorkflowTriggerParams:
         # Use on swarm start task name for wf
         task_name = self.task_name
         self.task_name = ON_SWARM_START
-        workflow = await super().workflow(
+        params = await super().trigger_params(
             **task_additional_params, use_return_field=use_return_field
         )
         self.task_name = task_name
-        return workflow
+        return params
 
     def task_ctx(self) -> dict:
         original_ctx = super().task_ctx()
@@ -136,28 +463,42 @@ class SwarmTaskSignature(TaskSignature):
     async def try_delete_sub_tasks(
         self, with_error: bool = True, with_success: bool = True
     ):
-        tasks = await asyncio.gather(
-            *[TaskSignature.get_safe(task_id) for task_id in self.tasks],
-            return_exceptions=True,
-        )
-        tasks = [task for task in tasks if isinstance(task, TaskSignature)]
-        await asyncio.gather(
-            *[task.remove(with_error, with_success) for task in tasks],
-            return_exceptions=True,
-        )
+        shard_keys = [shard.key for shard in self.shards()] if self.is_sharded else []
+        await remove_signatures(list(self.tasks) + shard_keys, with_error, with_success)
 
-    async def _remove(self, *args, **kwargs):
-        delete_signature = super()._remove(*args, **kwargs)
-        delete_tasks = self.try_delete_sub_tasks()
+    @classmethod
+    def removal_paths(cls) -> list[str]:
+        return super().removal_paths() + [
+            "$.tasks",
+            "$.tasks_count",
+            "$.config.shard_size",
+        ]
 
-        return await asyncio.gather(delete_signature, delete_tasks)
+    @classmethod
+    def removed_with(
+        cls,
+        task_key: TaskIdentifierType,
+        fields: dict,
+        with_error: bool = True,
+        with_success: bool = True,
+    ) -> list[str]:
+        removed_keys = super().removed_with(task_key, fields, with_error, with_success)
+        # Items are removed with the swarm, sharded swarms items are found through their shards
+        removed_keys.extend(fields["$.tasks"][0] if fields["$.tasks"] else [])
+        shard_size = fields["$.config.shard_size"]
+        if shard_size and shard_size[0] and fields["$.tasks_count"]:
+            tasks_count = int(fields["$.tasks_count"][0])
+            shards_count = math.ceil(tasks_count / shard_size[0])
+            removed_keys.extend(
+                SwarmShard.from_swarm(task_key, i).key for i in range(shards_count)
+            )
+        return removed_keys
 
-    async def change_status(self, status: SignatureStatus):
-        paused_chain_tasks = [
-            TaskSignature.safe_change_status(task, status) for task in self.tasks
-        ]
-        pause_chain = super().change_status(status)
-        await asyncio.gather(pause_chain, *paused_chain_tasks, return_exceptions=True)
+    async def change_status(self, status: SignatureStatus) -> StatusChangeCounts:
+        counts = await bulk_change_status(await self.item_keys(), status)
+        # A version conflict of the swarm itself is raised, so optimistic updates retry it
+        await super().change_status(status)
+        return counts
 
     async def add_task(
         self, task: TaskSignatureConvertible, close_on_max_task: bool = True
@@ -174,43 +515,84 @@ class SwarmTaskSignature(TaskSignature):
             raise SwarmIsCanceledError(
                 f"Swarm {self.task_name} is {self.task_status} - can't add task"
             )
-        task = await resolve_signature_key(task)
-        dump = task.model_dump(exclude={"task_name"})
+        with self.items_scope():
+            return await self._add_task(task, close_on_max_task)
+
+    def items_scope(self) -> ContextManager[str]:
+        """
+        Signatures created in this scope are stored in the swarm slot, so they are not moved when added to the swarm.
+        """
+        return workflow_scope(key_hash_tag(self.key))
+
+    async def _add_task(
+        self, task: TaskSignatureConvertible, close_on_max_task: bool = True
+    ) -> BatchItemTaskSignature:
+        task = await resolve_workflow_task(task)
+        shard = await self.reserve_shard() if self.is_sharded else None
+        # The item is run with the original task kwargs, they are not copied to the item
+        dump = task.model_dump(exclude={"task_name", "kwargs"})
         batch_task_name = f"{BATCH_TASK_NAME_INITIALS}{task.task_name}"
+        # The swarm signatures, and tasks without their own ttl, are kept as long as the swarm
+        task.ttl = task.ttl if task.ttl is not None else self.ttl
+        dump["ttl"] = self.ttl
         batch_task = BatchItemTaskSignature(
             **dump,
             task_name=batch_task_name,
             swarm_id=self.key,
             original_task_id=task.key,
+            shard_id=shard.key if shard else None,
         )
 
         swarm_identifiers = {
             SWARM_TASK_ID_PARAM_NAME: self.key,
             SWARM_ITEM_TASK_ID_PARAM_NAME: batch_task.key,
         }
+        if shard:
+            swarm_identifiers[SWARM_SHARD_ID_PARAM_NAME] = shard.key
         on_success_swarm_item = await TaskSignature.from_task_name(
             task_name=ON_SWARM_END,
             input_validator=SwarmResultsMessage,
             task_identifiers=swarm_identifiers,
+            ttl=self.ttl,
         )
         on_error_swarm_item = await TaskSignature.from_task_name(
-            task_name=ON_SWARM_ERROR, task_identifiers=swarm_identifiers
+            task_name=ON_SWARM_ERROR, task_identifiers=swarm_identifiers, ttl=self.ttl
         )
         task.success_callbacks.append(on_success_swarm_item.key)
         task.error_callbacks.append(on_error_swarm_item.key)
         await task.save()
         await batch_task.save()
-        await self.tasks.aappend(batch_task.key)
+        if shard:
+            await shard.tasks.aappend(batch_task.key)
+        else:
+            await self.tasks.aappend(batch_task.key)
+            if self.counts_items:
+                await self.tasks_count.increase()
+                self.tasks_count += 1
 
         if close_on_max_task and not self.config.can_add_task(self):
             await self.close_swarm()
 
         return batch_task
 
-    async def add_to_running_tasks(self, task: TaskSignatureConvertible) -> bool:
+    async def reserve_shard(self) -> SwarmShard:
+        tasks_count = int(await self.tasks_count.increase())
+        self.tasks_count += 1
+        shard_index = (tasks_count - 1) // self.config.shard_size
+        shard = SwarmShard.from_swarm(self.key, shard_index)
+        shards_ttl, _ = self.shards_ttl()
+        await shard.create_if_missing(shards_ttl)
+        return shard
+
+    async def add_to_running_tasks(
+        self, task: TaskSignatureConvertible, with_dispatch_token: bool = False
+    ) -> bool:
+        if self.is_sharded:
+            return await self.add_to_sharded_running_tasks(task, with_dispatch_token)
         async with self.lock() as swarm_task:
             task = await resolve_signature_key(task)
-            if self.current_running_tasks < self.config.max_concurrency:
+            can_run = self.current_running_tasks < self.concurrency_limit
+            if can_run and await self.acquire_dispatch(task.key, with_dispatch_token):
                 await self.current_running_tasks.increase()
                 self.current_running_tasks += 1
                 return True
@@ -218,14 +600,194 @@ class SwarmTaskSignature(TaskSignature):
                 await self.tasks_left_to_run.aappend(task.key)
                 return False
 
+    async def add_to_sharded_running_tasks(
+        self, task: TaskSignatureConvertible, with_dispatch_token: bool = False
+    ) -> bool:
+        # The running slot is taken atomically and given back when over the limit, no swarm lock is needed
+        task = await resolve_signature_key(task)
+        running_tasks = await self.current_running_tasks.increase()
+        can_run = running_tasks <= self.concurrency_limit
+        if can_run and await self.acquire_dispatch(task.key, with_dispatch_token):
+            return True
+        await self.current_running_tasks.increase(-1)
+        shard = SwarmShard.from_key(task.shard_id, self.key)
+        await shard.tasks_left_to_run.aappend(task.key)
+        return False
+
+    async def acquire_dispatch(
+        self, task_key: TaskIdentifierType, with_dispatch_token: bool = False
+    ) -> bool:
+        """
+        Take a rate limit token (unless one was taken for the item) and a pool slot for the item to start.
+        An item denied a token is queued, a fill is scheduled for when the next token is available.
+        """
+        if not with_dispatch_token:
+            granted, retry_after = await self.take_dispatch_tokens(1)
+            if not granted:
+                await self.schedule_fill(retry_after)
+                return False
+        if await self.acquire_pool_slot(task_key):
+            return True
+        await self.refund_dispatch_tokens(1)
+        return False
+
+    async def acquire_pool_slot(self, task_key: TaskIdentifierType) -> bool:
+        if self.config.concurrency_pool is None:
+            return True
+        pool = await ConcurrencyPool.from_name(self.config.concurrency_pool)
+        return await pool.acquire(self.key, task_key, self.config.pool_weight)
+
+    async def release_pool_slots(self, task_keys: list[TaskIdentifierType]):
+        if self.config.concurrency_pool is None:
+            return
+        pool = await ConcurrencyPool.from_name(self.config.concurrency_pool)
+        waiting_holders = await pool.release(task_keys)
+        # Swarms that were denied a pool slot have no running item to refill them, start them now
+        swarm_prefix = f"{self.class_key_initials()}:"
+        waiting_swarms = await asyncio.gather(
+            *[
+                SwarmTaskSignature.get_safe(holder)
+                for holder in waiting_holders
+                if holder != self.key and holder.startswith(swarm_prefix)
+            ]
+        )
+        await asyncio.gather(
+            *[swarm.fill_running_tasks() for swarm in waiting_swarms if swarm]
+        )
+
+    @property
+    def rate_bucket(self) -> Optional[TokenBucket]:
+        if self.config.rate_limit is None:
+            return None
+        return TokenBucket(
+            self.Meta.redis,
+            f"{self.key}/rate",
+            self.config.rate_limit,
+            self.config.rate_burst,
+        )
+
+    async def take_dispatch_tokens(self, num_of_tasks: int) -> tuple[int, timedelta]:
+        """
+        Returns how many of the tasks may start now by the swarm and pool rate limits,
+        and how long until another task may start.
+        """
+        buckets = [self.rate_bucket]
+        if self.config.concurrency_pool is not None:
+            pool = await ConcurrencyPool.from_name(self.config.concurrency_pool)
+            buckets.append(pool.rate_bucket)
+        buckets = [bucket for bucket in buckets if bucket is not None]
+
+        granted, retry_after = num_of_tasks, timedelta()
+        taken_buckets = []
+        for bucket in buckets:
+            bucket_granted, bucket_retry_after = await bucket.take(granted)
+            retry_after = max(retry_after, bucket_retry_after)
+            # Tokens taken from the previous buckets for tasks this bucket denied are given back
+            for taken_bucket in taken_buckets:
+                await taken_bucket.refund(granted - bucket_granted)
+            taken_buckets.append(bucket)
+            granted = bucket_granted
+        return granted, retry_after
+
+    async def refund_dispatch_tokens(self, num_of_tasks: int):
+        buckets = [self.rate_bucket]
+        if self.config.concurrency_pool is not None:
+            pool = await ConcurrencyPool.from_name(self.config.concurrency_pool)
+            buckets.append(pool.rate_bucket)
+        await asyncio.gather(
+            *[bucket.refund(num_of_tasks) for bucket in buckets if bucket is not None]
+        )
+
+    async def schedule_fill(self, delay: timedelta):
+        # A single fill is scheduled at a time, the fill schedules the next one if needed
+        fill_lock_ms = math.ceil(delay.total_seconds() * 1000) + 1
+        is_first = await self.Meta.redis.set(
+            f"{self.key}/fill_scheduled", 1, nx=True, px=fill_lock_ms
+        )
+        if not is_first:
+            return
+        task_def = await load_task_definition(ON_SWARM_FILL)
+        params = WorkflowTriggerParams(
+            workflow_name=task_def.task_name if task_def else ON_SWARM_FILL,
+            task_ctx={SWARM_TASK_ID_PARAM_NAME: self.key},
+        )
+        await trigger_workflow(params).aio_schedule(datetime.now() + delay)
+
+    async def claim_item_lease(self, item_key: TaskIdentifierType) -> bool:
+        """
+        Returns False if the item slot was already reclaimed by the reaper, its completion should be ignored
+        """
+        if self.config.item_lease_ttl is None:
+            return True
+        if await BatchItemTaskSignature.claim_completed_lease(item_key):
+            return True
+        # A retried completion may be recorded already, with its lease released
+        return bool(await self.Meta.redis.sismember(self.completions_key, item_key))
+
+    async def release_items_leases(self, item_keys: list[TaskIdentifierType]):
+        if self.config.item_lease_ttl is None or not item_keys:
+            return
+        await self.Meta.redis.zrem(SWARM_ITEM_LEASES_KEY, *item_keys)
+
+    async def requeue_reclaimed_item(self, item: BatchItemTaskSignature):
+        await self.release_pool_slots([item.key])
+        await self.decrease_running_tasks_count()
+        if self.is_sharded:
+            shard = SwarmShard.from_key(item.shard_id, self.key)
+            await shard.tasks_left_to_run.aappend(item.key)
+        else:
+            await self.tasks_left_to_run.aappend(item.key)
+
+    async def pop_shards_tasks_left_to_run(
+        self, num_of_tasks: int
+    ) -> list[TaskIdentifierType]:
+        shards = self.shards()
+        async with self.Meta.redis.pipeline(transaction=False) as pipe:
+            for shard in shards:
+                pipe.json().arrlen(shard.key, "$.tasks_left_to_run")
+            queues_length = await pipe.execute(raise_on_error=False)
+
+        task_ids = []
+        for shard, queue_length in zip(shards, queues_length):
+            if not isinstance(queue_length, list) or not queue_length[0]:
+                continue
+            num_to_pop = min(num_of_tasks - len(task_ids), queue_length[0])
+            popped_ids = await asyncio.gather(
+                *[shard.tasks_left_to_run.apop() for i in range(num_to_pop)]
+            )
+            task_ids.extend(popped_ids)
+            if len(task_ids) >= num_of_tasks:
+                break
+        return task_ids
+
     async def fill_running_tasks(self) -> int:
-        resource_to_run = self.config.max_concurrency - self.current_running_tasks
+        from hatchet_sdk.runnables.types import EmptyModel
+
+        if self.is_sharded:
+            # Sharded swarms update the counter without the swarm lock
+            running_tasks = await self.current_running_tasks.aload()
+        else:
+            running_tasks = self.current_running_tasks
+        resource_to_run = self.concurrency_limit - running_tasks
+        if not self.is_sharded:
+            resource_to_run = min(resource_to_run, len(self.tasks_left_to_run))
         if resource_to_run <= 0:
             return 0
-        num_of_task_to_run = min(resource_to_run, len(self.tasks_left_to_run))
-        task_ids = await asyncio.gather(
-            *[self.tasks_left_to_run.apop() for i in range(num_of_task_to_run)]
+        num_of_task_to_run, retry_after = await self.take_dispatch_tokens(
+            resource_to_run
         )
+        if num_of_task_to_run < resource_to_run:
+            # Rate limited tasks stay in the queue until tokens are available
+            await self.schedule_fill(retry_after)
+        if num_of_task_to_run <= 0:
+            return 0
+        if self.is_sharded:
+            task_ids = await self.pop_shards_tasks_left_to_run(num_of_task_to_run)
+            await self.refund_dispatch_tokens(num_of_task_to_run - len(task_ids))
+        else:
+            task_ids = await asyncio.gather(
+                *[self.tasks_left_to_run.apop() for i in range(num_of_task_to_run)]
+            )
         tasks = await asyncio.gather(
             *[
                 BatchItemTaskSignature.get_safe(task_id)
@@ -234,7 +796,7 @@ class SwarmTaskSignature(TaskSignature):
             ]
         )
         publish_coroutine = [
-            next_task.aio_run_no_wait(EmptyModel())
+            next_task.aio_run_no_wait(EmptyModel(), with_dispatch_token=True)
             for next_task in tasks
             if next_task is not None
         ]
@@ -243,9 +805,172 @@ class SwarmTaskSignature(TaskSignature):
             raise MissingSwarmItemError(f"swarm item was deleted before swarm is done")
         return len(tasks)
 
-    async def decrease_running_tasks_count(self):
-        await self.current_running_tasks.increase(-1)
-        self.current_running_tasks -= 1
+    async def record_items_completion(
+        self, items: list[tuple[TaskIdentifierType, bool]]
+    ):
+        """
+        items - the completed items keys and whether they succeeded
+        """
+        await self.record_items_outcome(items)
+        await self.release_pool_slots([item_key for item_key, _ in items])
+        await self.publish_events(
+            [
+                (
+                    (
+                        SwarmEventType.ITEM_FINISHED
+                        if succeeded
+                        else SwarmEventType.ITEM_FAILED
+                    ),
+                    item_key,
+                )
+                for item_key, succeeded in items
+            ]
+        )
+
+    @property
+    def event_stream(self) -> SwarmEventStream:
+        return SwarmEventStream(
+            self.Meta.redis,
+            f"{self.key}/events",
+            SWARM_EVENTS_MAX_LENGTH,
+            timedelta(seconds=self.signature_ttl()),
+        )
+
+    async def publish_events(
+        self, events: list[tuple[SwarmEventType, Optional[TaskIdentifierType]]]
+    ):
+        await self.event_stream.publish(events)
+
+    async def publish_end_event(self, event_type: SwarmEventType):
+        stream = self.event_stream
+        stream.ttl = SWARM_EVENTS_RETENTION
+        await stream.publish([(event_type, None)])
+
+    async def watch(
+        self, from_start: bool = True, block: timedelta = timedelta(seconds=5)
+    ) -> AsyncIterator[SwarmEvent]:
+        """
+        Iterate the swarm progress events until the swarm is done or failed.
+        from_start - replay the events published before watching started
+        block - how long to wait for new events before checking the swarm still exists
+        """
+
+        last_id = "0-0" if from_start else "$"
+        async for event in self.event_stream.watch(last_id, block, self.is_alive):
+            yield event
+
+    async def is_alive(self) -> bool:
+        return bool(await self.Meta.redis.exists(self.key))
+
+    async def record_items_outcome(self, items: list[tuple[TaskIdentifierType, bool]]):
+        if not self.config.adaptive_concurrency:
+            return
+        batch_items = await asyncio.gather(
+            *[BatchItemTaskSignature.get_safe(item_key) for item_key, _ in items]
+        )
+        now = datetime.now()
+        outcomes = [
+            ItemOutcome(
+                succeeded=succeeded,
+                latency=(
+                    (now - item.run_started_at).total_seconds()
+                    if item is not None and item.run_started_at is not None
+                    else None
+                ),
+            )
+            for item, (_, succeeded) in zip(batch_items, items)
+        ]
+
+        config = self.config
+        async with acquire_lock(self.Meta.redis, f"{self.key}/concurrency"):
+            concurrency = await self.concurrency.aload()
+            previous_limit = concurrency.effective_limit(config.min_concurrency)
+            for outcome in outcomes:
+                concurrency.apply_outcome(
+                    outcome,
+                    min_concurrency=config.min_concurrency,
+                    max_concurrency=config.max_concurrency,
+                    target_latency=config.target_latency,
+                    max_failure_rate=config.max_failure_rate,
+                    decrease_factor=config.concurrency_decrease_factor,
+                )
+            concurrency.record_limit(previous_limit, config.min_concurrency)
+            await concurrency.asave()
+        self.concurrency = concurrency
+
+    @property
+    def completions_key(self) -> str:
+        return f"{self.key}/completions"
+
+    async def record_completions(
+        self, completions: list[SwarmItemCompletion]
+    ) -> tuple[list[SwarmItemCompletion], int]:
+        """
+        Store the items outcomes and free their running slots at once, items already recorded are skipped.
+        Returns the newly recorded completions and the failed items count after the update.
+        """
+        finished = [c for c in completions if c.succeeded]
+        item_keys = self.finished_tasks._adapter.dump_python(
+            [c.item_key for c in completions],
+            mode="json",
+            context={REDIS_DUMP_FLAG_NAME: True},
+        )
+        results = dict(
+            zip(
+                [c.item_key for c in finished],
+                self.tasks_results._adapter.dump_python(
+                    [c.result for c in finished],
+                    mode="json",
+                    context={REDIS_DUMP_FLAG_NAME: True},
+                ),
+            )
+        )
+        lists_keys = [self.key]
+        if self.is_sharded:
+            lists_keys = list(dict.fromkeys(c.shard_id for c in completions))
+        args = []
+        for completion, item_key in zip(completions, item_keys):
+            lists_key = completion.shard_id if self.is_sharded else self.key
+            args.extend(
+                [
+                    completion.item_key,
+                    int(completion.succeeded),
+                    json.dumps(item_key),
+                    json.dumps(results.get(completion.item_key)),
+                    lists_keys.index(lists_key) + 3,
+                ]
+            )
+        record_completions = self.Meta.redis.register_script(RECORD_COMPLETIONS)
+        recorded = await record_completions(
+            keys=[self.key, self.completions_key, *lists_keys],
+            args=[
+                int(self.counts_items),
+                int(self.config.keep_finished_items),
+                *args,
+            ],
+        )
+        if not recorded:
+            return [], 0
+        failed_count = int(json.loads(recorded[0])[0])
+        recorded_keys = {item_key.decode() for item_key in recorded[1:]}
+        recorded = [c for c in completions if c.item_key in recorded_keys]
+
+        self.current_running_tasks -= len(recorded)
+        if not self.counts_items:
+            self.finished_tasks.extend([c.item_key for c in recorded if c.succeeded])
+            self.tasks_results.extend([c.result for c in recorded if c.succeeded])
+            self.failed_tasks.extend([c.item_key for c in recorded if not c.succeeded])
+        return recorded, failed_count
+
+    async def remove_finished_items(self, item_keys: list[TaskIdentifierType]):
+        if self.config.keep_finished_items or not item_keys:
+            return
+        # The item is removed with its original task, and the item callbacks that were not called
+        await remove_signatures(item_keys)
+
+    async def decrease_running_tasks_count(self, amount: int = 1):
+        await self.current_running_tasks.increase(-amount)
+        self.current_running_tasks -= amount
 
     async def add_to_finished_tasks(self, task: TaskIdentifierType):
         await self.finished_tasks.aappend(task)
@@ -253,7 +978,34 @@ class SwarmTaskSignature(TaskSignature):
     async def add_to_failed_tasks(self, task: TaskIdentifierType):
         await self.failed_tasks.aappend(task)
 
+    async def add_to_shard_finished_tasks(
+        self, shard_id: TaskIdentifierType, task: TaskIdentifierType, result: Any
+    ) -> int:
+        shard = SwarmShard.from_key(shard_id, self.key)
+        await asyncio.gather(
+            shard.finished_tasks.aappend(task), shard.tasks_results.aappend(result)
+        )
+        # Counted only after the result is stored, so a done swarm has all its results
+        return int(await self.finished_count.increase())
+
+    async def add_to_shard_failed_tasks(
+        self, shard_id: TaskIdentifierType, task: TaskIdentifierType
+    ) -> int:
+        shard = SwarmShard.from_key(shard_id, self.key)
+        await shard.failed_tasks.aappend(task)
+        return int(await self.failed_count.increase())
+
+    async def is_counted_swarm_done(self) -> bool:
+        # Counters are updated without the swarm lock or by a script, check the stored swarm
+        swarm_task = await self.__class__.get_safe(self.key)
+        if swarm_task is None:
+            return False
+        done_tasks = swarm_task.finished_count + swarm_task.failed_count
+        return swarm_task.is_swarm_closed and done_tasks >= swarm_task.tasks_count
+
     async def is_swarm_done(self):
+        if self.counts_items:
+            return await self.is_counted_swarm_done()
         done_tasks = self.finished_tasks + self.failed_tasks
         finished_all_tasks = set(done_tasks) == set(self.tasks)
         return self.is_swarm_closed and finished_all_tasks
@@ -263,30 +1015,154 @@ class SwarmTaskSignature(TaskSignature):
         return await super().activate_error(msg, **full_kwargs)
 
     async def activate_success(self, msg, **kwargs):
-        results = await self.tasks_results.load()
-        tasks_results = [res for res in results]
+        if self.is_sharded:
+            shards = await self.load_shards()
+            tasks_results = [res for shard in shards for res in shard.tasks_results]
+        else:
+            results = await self.tasks_results.load()
+            tasks_results = [res for res in results]
 
         await super().activate_success(tasks_results, **kwargs)
+        await self.publish_end_event(SwarmEventType.SWARM_DONE)
         await self.remove(with_success=False)
 
-    async def suspend(self):
-        await asyncio.gather(
-            *[TaskSignature.suspend_from_key(swarm_id) for swarm_id in self.tasks],
-            return_exceptions=True,
+    async def _remove(self, with_error: bool = True, with_success: bool = True):
+        removed = await super()._remove(with_error, with_success)
+        await self.Meta.redis.unlink(self.completions_key, self.shards_ttl_key)
+        return removed
+
+    async def suspend(self) -> StatusChangeCounts:
+        counts = await bulk_change_status(
+            await self.item_keys(), SignatureStatus.SUSPENDED
         )
         await super().change_status(SignatureStatus.SUSPENDED)
+        return counts
 
-    async def resume(self):
-        await asyncio.gather(
-            *[TaskSignature.resume_from_key(task_id) for task_id in self.tasks],
-            return_exceptions=True,
-        )
+    async def resume(self) -> StatusChangeCounts:
+        counts = await bulk_resume(await self.item_keys())
         await super().change_status(self.task_status.last_status)
+        return counts
 
     async def close_swarm(self) -> Self:
+        from hatchet_sdk.runnables.types import EmptyModel
+
         async with self.lock() as swarm_task:
             await swarm_task.aupdate(is_swarm_closed=True)
             should_finish_swarm = await swarm_task.is_swarm_done()
             if should_finish_swarm:
                 await swarm_task.activate_success(EmptyModel())
         return self
+
+    async def feed(
+        self,
+        tasks: AsyncIterable[TaskSignatureConvertible],
+        msg: BaseModel = None,
+        max_pending: int = None,
+        close_swarm: bool = True,
+    ) -> int:
+        """
+        Add and run the tasks as the swarm items finish, instead of creating all of them up front.
+        tasks - async iterable of the items to add, pulled only while fewer than max_pending items are not done
+        msg - message the items are run with
+        max_pending - items added and not finished yet, twice the max concurrency by default
+        close_swarm - close the swarm once the tasks are exhausted
+        Returns the number of items added, stops early if the swarm failed or was removed.
+        """
+
+        async def pages():
+            async for task in tasks:
+                yield [task], None
+
+        return await self._feed_pages(pages(), msg, max_pending, close_swarm)
+
+    async def feed_from_cursor(
+        self,
+        read_page: Callable[
+            [Optional[str]],
+            Awaitable[tuple[list[TaskSignatureConvertible], Optional[str]]],
+        ],
+        msg: BaseModel = None,
+        max_pending: int = None,
+        close_swarm: bool = True,
+    ) -> int:
+        """
+        Like feed, with the items read in pages from a cursor (such as a file offset).
+        read_page - returns the tasks from the given cursor and the cursor of the next page, None when exhausted
+        The cursor is stored in the swarm after each page, feeding the same swarm again resumes from it.
+        """
+        if self.is_swarm_closed:
+            return 0
+
+        async def pages():
+            cursor = self.source_cursor
+            while True:
+                page_tasks, cursor = await read_page(cursor)
+                yield page_tasks, cursor
+                if cursor is None:
+                    return
+
+        return await self._feed_pages(pages(), msg, max_pending, close_swarm)
+
+    async def _feed_pages(
+        self,
+        pages: AsyncIterator[tuple[list[TaskSignatureConvertible], Optional[str]]],
+        msg: Optional[BaseModel],
+        max_pending: Optional[int],
+        close_swarm: bool,
+    ) -> int:
+        from hatchet_sdk.runnables.types import EmptyModel
+
+        msg = msg or EmptyModel()
+        max_pending = max_pending or 2 * self.config.max_concurrency
+        # Events are read from before the count, completions counted twice only make us add items sooner
+        stream = self.event_stream
+        last_id = await stream.last_event_id()
+        stored_swarm = await self.__class__.get_safe(self.key)
+        pending = stored_swarm.pending_items_count if stored_swarm else 0
+        events = stream.watch(last_id, is_alive=self.is_alive)
+        completion_events = (SwarmEventType.ITEM_FINISHED, SwarmEventType.ITEM_FAILED)
+
+        num_fed = 0
+        try:
+            async for page_tasks, cursor in pages:
+                for task in page_tasks:
+                    while pending >= max_pending:
+                        event = await anext(events, None)
+                        if event is None:
+                            # The swarm failed or was removed
+                            return num_fed
+                        if event.type in completion_events:
+                            pending -= 1
+                    item = await self.add_task(task)
+                    await item.aio_run_no_wait(msg)
+                    pending += 1
+                    num_fed += 1
+                if cursor is not None:
+                    await self.aupdate(source_cursor=cursor)
+        finally:
+            await events.aclose()
+
+        if close_swarm:
+            await self.close_swarm()
+        return num_fed
+
+    async def activate_success_once(self, msg) -> bool:
+        """
+        Sharded swarm items finish without the swarm lock, it is taken only so the swarm is finished once.
+        """
+        try:
+            async with self.lock(save_at_end=False) as swarm_task:
+                if not await swarm_task.is_swarm_done():
+                    return False
+                await swarm_task.activate_success(msg)
+                return True
+        except KeyNotFound:
+            # Already finished and removed
+            return False
+
+    async def queue_shards_tasks(self):
+        shards = await self.load_shards()
+        for shard in shards:
+            async with shard.pipeline() as shard:
+                await shard.tasks_left_to_run.aclear()
+                await shard.tasks_left_to_run.aextend(shard.tasks)
@@ -0,0 +1,77 @@
+# KEYS: items leases. ARGV: item key
+# The lease of a completing item never expires, so the reaper leaves it until the completion is recorded.
+# Returns 0 if the item slot was already reclaimed
+CLAIM_ITEM_LEASE = """
+if not redis.call('ZSCORE', KEYS[1], ARGV[1]) then
+    return 0
+end
+redis.call('ZADD', KEYS[1], '+inf', ARGV[1])
+return 1
+"""
+
+# KEYS: items leases. ARGV: item key, now
+# Returns 1 if the lease was expired and removed
+RECLAIM_EXPIRED_LEASE = """
+local expire_at = tonumber(redis.call('ZSCORE', KEYS[1], ARGV[1]) or '')
+if expire_at and expire_at <= tonumber(ARGV[2]) then
+    return redis.call('ZREM', KEYS[1], ARGV[1])
+end
+return 0
+"""
+
+# KEYS: swarm, recorded completions (set of items keys), then the keys storing the items lists (swarm or shards).
+# ARGV: counts items (0/1 - sharded, or finished items are not kept), keeps finished items (0/1),
+# then for each item - key, succeeded (0/1), serialized item key, serialized result, its lists key index in KEYS.
+# Items already recorded are skipped, so a retried completion neither appends the item again nor frees another slot.
+# Finished items that are not kept are removed from the items list and only counted, their results are not stored.
+# Returns {serialized failed count, newly recorded items keys...}, or {} if the swarm is missing
+RECORD_COMPLETIONS = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return {}
+end
+local counts_items = ARGV[1] == '1'
+local keeps_items = ARGV[2] == '1'
+local recorded = {''}
+local finished, failed = 0, 0
+for i = 3, #ARGV, 5 do
+    if redis.call('SADD', KEYS[2], ARGV[i]) == 1 then
+        local lists_key = KEYS[tonumber(ARGV[i + 4])]
+        local succeeded = ARGV[i + 1] == '1'
+        if not keeps_items then
+            -- Searched with explicit bounds, an out of range stop is the end of the array
+            local index = redis.call('JSON.ARRINDEX', lists_key, '$.tasks', ARGV[i + 2], 0, 2147483647)[1]
+            if index and index >= 0 then
+                redis.call('JSON.ARRPOP', lists_key, '$.tasks', index)
+            end
+        elseif succeeded then
+            redis.call('JSON.ARRAPPEND', lists_key, '$.finished_tasks', ARGV[i + 2])
+            redis.call('JSON.ARRAPPEND', lists_key, '$.tasks_results', ARGV[i + 3])
+        else
+            redis.call('JSON.ARRAPPEND', lists_key, '$.failed_tasks', ARGV[i + 2])
+        end
+        if succeeded then
+            finished = finished + 1
+        else
+            failed = failed + 1
+        end
+        table.insert(recorded, ARGV[i])
+    end
+end
+if finished + failed > 0 then
+    redis.call('JSON.NUMINCRBY', KEYS[1], '$.current_running_tasks', -(finished + failed))
+end
+-- The recorded completions are kept as long as the swarm
+local ttl = redis.call('TTL', KEYS[1])
+if ttl > 0 then
+    redis.call('EXPIRE', KEYS[2], ttl)
+end
+if counts_items then
+    -- Counted only after the results are stored, so a done swarm has all its results
+    redis.call('JSON.NUMINCRBY', KEYS[1], '$.finished_count', finished)
+    redis.call('JSON.NUMINCRBY', KEYS[1], '$.failed_count', failed)
+    recorded[1] = redis.call('JSON.GET', KEYS[1], '$.failed_count')
+else
+    recorded[1] = cjson.encode(redis.call('JSON.ARRLEN', KEYS[1], '$.failed_tasks'))
+end
+return recorded
+"""
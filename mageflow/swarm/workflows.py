@@ -9,12 +9,18 @@ from mageflow.invokers.hatchet import HatchetInvoker
 from mageflow.signature.consts import TASK_ID_PARAM_NAME
 from mageflow.signature.model import TaskSignature
 from mageflow.signature.status import SignatureStatus
+from mageflow.signature.types import TaskIdentifierType
+from mageflow.startup import mageflow_config
+from mageflow.swarm.batching import SwarmItemCompletion, SwarmCompletionBatcher
 from mageflow.swarm.consts import (
     SWARM_TASK_ID_PARAM_NAME,
     SWARM_ITEM_TASK_ID_PARAM_NAME,
+    SWARM_SHARD_ID_PARAM_NAME,
+    REAPER_BATCH_SIZE,
 )
+from mageflow.swarm.events import SwarmEventType
 from mageflow.swarm.messages import SwarmResultsMessage
-from mageflow.swarm.model import SwarmTaskSignature
+from mageflow.swarm.model import SwarmTaskSignature, BatchItemTaskSignature
 
 
 async def swarm_start_tasks(msg: EmptyModel, ctx: Context):
@@ -26,21 +32,52 @@ async def swarm_start_tasks(msg: EmptyModel, ctx: Context):
         if swarm_task.has_swarm_started:
             ctx.log(f"Swarm task started but already running {msg}")
             return
-        tasks_ids_to_run = swarm_task.tasks[: swarm_task.config.max_concurrency]
-        tasks_left_to_run = swarm_task.tasks[swarm_task.config.max_concurrency :]
+        if swarm_task.is_sharded:
+            await swarm_task.queue_shards_tasks()
+            num_task_started = await swarm_task.fill_running_tasks()
+            ctx.log(f"Swarm task started with {num_task_started} tasks {msg}")
+            return
+        num_of_tasks = min(swarm_task.concurrency_limit, len(swarm_task.tasks))
+        num_task_to_run, retry_after = await swarm_task.take_dispatch_tokens(
+            num_of_tasks
+        )
+        if num_task_to_run < num_of_tasks:
+            await swarm_task.schedule_fill(retry_after)
+        tasks_ids_to_run = swarm_task.tasks[:num_task_to_run]
+        tasks_left_to_run = swarm_task.tasks[num_task_to_run:]
         async with swarm_task.pipeline() as swarm_task:
             await swarm_task.tasks_left_to_run.aclear()
             await swarm_task.tasks_left_to_run.aextend(tasks_left_to_run)
         tasks_to_run = await asyncio.gather(
-            *[TaskSignature.get_safe(task_id) for task_id in tasks_ids_to_run]
+            *[BatchItemTaskSignature.get_safe(task_id) for task_id in tasks_ids_to_run]
+        )
+        await asyncio.gather(
+            *[
+                task.aio_run_no_wait(msg, with_dispatch_token=True)
+                for task in tasks_to_run
+            ]
         )
-        await asyncio.gather(*[task.aio_run_no_wait(msg) for task in tasks_to_run])
         ctx.log(f"Swarm task started with tasks {tasks_ids_to_run} {msg}")
     except Exception:
         ctx.log(f"MAJOR - Error in swarm start tasks")
         raise
 
 
+async def swarm_fill_tasks(msg: EmptyModel, ctx: Context):
+    try:
+        task_data = HatchetInvoker(msg, ctx).task_ctx
+        swarm_task_id = task_data[SWARM_TASK_ID_PARAM_NAME]
+        swarm_task = await SwarmTaskSignature.get_safe(swarm_task_id)
+        if swarm_task is None:
+            ctx.log(f"Swarm {swarm_task_id} was removed before the scheduled fill")
+            return
+        num_task_started = await swarm_task.fill_running_tasks()
+        ctx.log(f"Swarm scheduled fill started {num_task_started}/{swarm_task.key}")
+    except Exception:
+        ctx.log(f"MAJOR - Error in swarm fill tasks")
+        raise
+
+
 async def swarm_item_done(msg: SwarmResultsMessage, ctx: Context):
     task_data = HatchetInvoker(msg, ctx).task_ctx
     task_id = task_data[TASK_ID_PARAM_NAME]
@@ -48,14 +85,14 @@ async def swarm_item_done(msg: SwarmResultsMessage, ctx: Context):
         swarm_task_id = task_data[SWARM_TASK_ID_PARAM_NAME]
         swarm_item_id = task_data[SWARM_ITEM_TASK_ID_PARAM_NAME]
         ctx.log(f"Swarm item done {swarm_item_id}")
-        # Update swarm tasks
-        swarm_task = await SwarmTaskSignature.get_safe(swarm_task_id)
-        res = msg.results
-        async with swarm_task.lock(save_at_end=False) as swarm_task:
-            ctx.log(f"Swarm item done {swarm_item_id} - saving results")
-            await swarm_task.finished_tasks.aappend(swarm_item_id)
-            await swarm_task.tasks_results.aappend(res)
-            await handle_finish_tasks(swarm_task, ctx, msg)
+        completion = SwarmItemCompletion(
+            item_key=swarm_item_id,
+            succeeded=True,
+            result=msg.results,
+            shard_id=task_data.get(SWARM_SHARD_ID_PARAM_NAME),
+            ctx=ctx,
+        )
+        await report_swarm_item_completion(swarm_task_id, completion)
     except Exception as e:
         ctx.log(f"MAJOR - Error in swarm start item done")
         raise
@@ -70,26 +107,13 @@ async def swarm_item_failed(msg: EmptyModel, ctx: Context):
         swarm_task_key = task_data[SWARM_TASK_ID_PARAM_NAME]
         swarm_item_key = task_data[SWARM_ITEM_TASK_ID_PARAM_NAME]
         ctx.log(f"Swarm item failed {swarm_item_key}")
-        # Check if the swarm should end
-        swarm_task = await SwarmTaskSignature.get_safe(swarm_task_key)
-        async with swarm_task.lock(save_at_end=False) as swarm_task:
-            await swarm_task.add_to_failed_tasks(swarm_item_key)
-            should_stop_after_failures = (
-                swarm_task.config.stop_after_n_failures is not None
-            )
-            stop_after_n_failures = swarm_task.config.stop_after_n_failures or 0
-            too_many_errors = len(swarm_task.failed_tasks) >= stop_after_n_failures
-            if should_stop_after_failures and too_many_errors:
-                ctx.log(
-                    f"Swarm item failed - stopping swarm {swarm_task.key} after {len(swarm_task.failed_tasks)} failures"
-                )
-                await swarm_task.change_status(SignatureStatus.CANCELED)
-                await swarm_task.activate_error(EmptyModel())
-                await swarm_task.remove(with_error=False)
-                ctx.log(f"Swarm item failed - stopped swarm {swarm_task.key}")
-                return
-
-            await handle_finish_tasks(swarm_task, ctx, msg)
+        completion = SwarmItemCompletion(
+            item_key=swarm_item_key,
+            succeeded=False,
+            shard_id=task_data.get(SWARM_SHARD_ID_PARAM_NAME),
+            ctx=ctx,
+        )
+        await report_swarm_item_completion(swarm_task_key, completion)
     except Exception as e:
         ctx.log(f"MAJOR - Error in swarm item failed")
         raise
@@ -97,10 +121,140 @@ async def swarm_item_failed(msg: EmptyModel, ctx: Context):
         await TaskSignature.try_remove(task_key)
 
 
+async def report_swarm_item_completion(
+    swarm_task_key: TaskIdentifierType, completion: SwarmItemCompletion
+):
+    if mageflow_config.swarm_batch_window:
+        await completions_batcher.submit(
+            swarm_task_key, completion, mageflow_config.swarm_batch_window
+        )
+        return
+    await apply_swarm_items_completions(swarm_task_key, [completion])
+
+
+async def stop_swarm(swarm_task: SwarmTaskSignature, ctx: Context, failed_count: int):
+    ctx.log(
+        f"Swarm item failed - stopping swarm {swarm_task.key} after {failed_count} failures"
+    )
+    await swarm_task.change_status(SignatureStatus.CANCELED)
+    await swarm_task.activate_error(EmptyModel())
+    await swarm_task.publish_end_event(SwarmEventType.SWARM_FAILED)
+    await swarm_task.remove(with_error=False)
+    ctx.log(f"Swarm item failed - stopped swarm {swarm_task.key}")
+
+
+async def apply_swarm_items_completions(
+    swarm_task_key: TaskIdentifierType,
+    completions: list[SwarmItemCompletion],
+    check_leases: bool = True,
+):
+    """
+    Completions are recorded before the items leases are released, and recording an item again does nothing,
+    so a completion retried after a failure at any step is applied once.
+    """
+    ctx = completions[0].ctx
+    swarm_task = await SwarmTaskSignature.get_safe(swarm_task_key)
+    if check_leases:
+        owned_leases = await asyncio.gather(
+            *[swarm_task.claim_item_lease(c.item_key) for c in completions]
+        )
+        completions = [c for c, owned in zip(completions, owned_leases) if owned]
+        if not completions:
+            ctx.log(f"Swarm items slots were reclaimed - ignoring")
+            return
+    if swarm_task.is_sharded:
+        await finish_swarm_items(swarm_task, ctx, completions)
+        return
+    async with swarm_task.lock(save_at_end=False) as swarm_task:
+        await finish_swarm_items(swarm_task, ctx, completions)
+
+
+async def finish_swarm_items(
+    swarm_task: SwarmTaskSignature,
+    ctx: Context,
+    completions: list[SwarmItemCompletion],
+):
+    recorded, failed_count = await swarm_task.record_completions(completions)
+    await swarm_task.record_items_completion(
+        [(c.item_key, c.succeeded) for c in recorded]
+    )
+    retried = [c.item_key for c in completions if c not in recorded]
+    if retried:
+        # A retried completion may have failed before its pool slot was released
+        await swarm_task.release_pool_slots(retried)
+    await swarm_task.release_items_leases([c.item_key for c in completions])
+    await swarm_task.remove_finished_items([c.item_key for c in completions])
+    failed = [c.item_key for c in completions if not c.succeeded]
+    newly_failed = len([c for c in recorded if not c.succeeded])
+    ctx.log(
+        f"Swarm items - {len(completions) - len(failed)} done, {len(failed)} failed in {swarm_task.key}"
+    )
+
+    stop_after_n_failures = swarm_task.config.stop_after_n_failures
+    if failed and stop_after_n_failures is not None:
+        # Sharded swarms are not locked, only the completions that reached the limit stop the swarm
+        previous_failed_count = (
+            failed_count - newly_failed if swarm_task.is_sharded else 0
+        )
+        if previous_failed_count < stop_after_n_failures <= failed_count:
+            await stop_swarm(swarm_task, ctx, failed_count)
+            return
+    await handle_finish_tasks(swarm_task, ctx, EmptyModel())
+
+
+completions_batcher = SwarmCompletionBatcher(apply_swarm_items_completions)
+
+
+async def swarm_slots_reaper(msg: EmptyModel, ctx: Context):
+    expired_items = await BatchItemTaskSignature.expired_slot_leases(REAPER_BATCH_SIZE)
+    ctx.log(f"Swarm slots reaper found {len(expired_items)} expired slots")
+    for item_key in expired_items:
+        # Only the reaper that removed the expired lease reclaims the slot, a completing item is not reclaimed
+        if not await BatchItemTaskSignature.reclaim_expired_lease(item_key):
+            continue
+        try:
+            await reclaim_swarm_item(item_key, ctx)
+        except Exception:
+            ctx.log(f"MAJOR - Error reclaiming swarm item {item_key}")
+
+
+async def reclaim_swarm_item(item_key: TaskIdentifierType, ctx: Context):
+    item = await BatchItemTaskSignature.get_safe(item_key)
+    swarm_task = await SwarmTaskSignature.get_safe(item.swarm_id) if item else None
+    if swarm_task is None:
+        ctx.log(f"Swarm item {item_key} was removed before its slot was reclaimed")
+        return
+    if item.lease_reclaims < swarm_task.config.max_item_reclaims:
+        ctx.log(f"Swarm item {item_key} slot expired - starting it again")
+        await item.aupdate(lease_reclaims=item.lease_reclaims + 1)
+        if swarm_task.is_sharded:
+            await requeue_swarm_item(swarm_task, item)
+            return
+        # Like the items completions, the running tasks count is changed under the swarm lock
+        async with swarm_task.lock(save_at_end=False) as swarm_task:
+            await requeue_swarm_item(swarm_task, item)
+        return
+
+    ctx.log(f"Swarm item {item_key} slot expired too many times - failing it")
+    completion = SwarmItemCompletion(
+        item_key=item_key, succeeded=False, shard_id=item.shard_id, ctx=ctx
+    )
+    await apply_swarm_items_completions(
+        swarm_task.key, [completion], check_leases=False
+    )
+
+
+async def requeue_swarm_item(
+    swarm_task: SwarmTaskSignature, item: BatchItemTaskSignature
+):
+    await swarm_task.requeue_reclaimed_item(item)
+    await swarm_task.fill_running_tasks()
+
+
 async def handle_finish_tasks(
     swarm_task: SwarmTaskSignature, ctx: Context, msg: BaseModel
 ):
-    await swarm_task.decrease_running_tasks_count()
+    # The finished items running slots were freed when their completions were recorded
     num_task_started = await swarm_task.fill_running_tasks()
     if num_task_started:
         ctx.log(f"Swarm item started new task {num_task_started}/{swarm_task.key}")
@@ -110,5 +264,8 @@ async def handle_finish_tasks(
     # Check if the swarm should end
     if await swarm_task.is_swarm_done():
         ctx.log(f"Swarm item done - closing swarm {swarm_task.key}")
-        await swarm_task.activate_success(msg)
+        if swarm_task.is_sharded:
+            await swarm_task.activate_success_once(msg)
+        else:
+            await swarm_task.activate_success(msg)
         ctx.log(f"Swarm item done - closed swarm {swarm_task.key}")
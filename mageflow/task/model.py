@@ -1,10 +1,15 @@
-from typing import Optional, Annotated, Self
+import asyncio
+import contextlib
+import hashlib
+from contextvars import ContextVar
+from datetime import timedelta
+from typing import Optional, Annotated, Self, Iterator
 
-from hatchet_sdk import NonRetryableException
 from pydantic import BaseModel
 from rapyer import AtomicRedisModel
 from rapyer.errors.base import KeyNotFound
 from rapyer.fields import Key
+from rapyer.types.base import REDIS_DUMP_FLAG_NAME
 
 
 class HatchetTaskModel(AtomicRedisModel):
@@ -12,6 +17,10 @@ class HatchetTaskModel(AtomicRedisModel):
     task_name: str
     input_validator: Optional[type[BaseModel]] = None
     retries: Optional[int] = None
+    # Runs of the task are scheduled up to this delay after they are triggered
+    stagger_delta: Optional[timedelta] = None
+    # Hash of the definition, used to skip rewriting unchanged definitions on startup
+    content_hash: str = ""
 
     @classmethod
     async def safe_get(cls, key: str) -> Self | None:
@@ -20,6 +29,54 @@ class HatchetTaskModel(AtomicRedisModel):
         except KeyNotFound:
             return None
 
+    @classmethod
+    async def stored_content_hashes(cls, keys: list[str]) -> list[str | None]:
+        async with cls.Meta.redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.json().get(key, "$.content_hash")
+            results = await pipe.execute(raise_on_error=False)
+        return [res[0] if isinstance(res, list) and res else None for res in results]
+
+    def calculate_content_hash(self) -> str:
+        definition = self.model_dump_json(
+            context={REDIS_DUMP_FLAG_NAME: True}, exclude={"content_hash"}
+        )
+        return hashlib.sha256(definition.encode()).hexdigest()
+
     def should_retry(self, attempt_num: int, e: Exception) -> bool:
+        from hatchet_sdk import NonRetryableException
+
         finish_retry = self.retries is not None and attempt_num < self.retries
         return finish_retry and not isinstance(e, NonRetryableException)
+
+
+# Task definitions read in the current scope by their name, concurrent reads of the same definition share one lookup
+TASK_DEFINITIONS: ContextVar[Optional[dict[str, asyncio.Future]]] = ContextVar(
+    "task_definitions", default=None
+)
+
+
+@contextlib.contextmanager
+def task_definitions_scope() -> Iterator[None]:
+    """
+    Each task definition is read once in this scope, nested scopes reuse the active one.
+    """
+    if TASK_DEFINITIONS.get() is not None:
+        yield
+        return
+    token = TASK_DEFINITIONS.set({})
+    try:
+        yield
+    finally:
+        TASK_DEFINITIONS.reset(token)
+
+
+async def load_task_definition(task_name: str) -> Optional[HatchetTaskModel]:
+    definitions = TASK_DEFINITIONS.get()
+    if definitions is None:
+        return await HatchetTaskModel.safe_get(task_name)
+    if task_name not in definitions:
+        definitions[task_name] = asyncio.ensure_future(
+            HatchetTaskModel.safe_get(task_name)
+        )
+    return await definitions[task_name]
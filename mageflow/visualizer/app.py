@@ -1,6 +1,7 @@
 import click
 import dash_cytoscape as cyto
 import rapyer
+import redis
 from dash import Dash, html, dcc, Input, Output, callback
 
 from mageflow.visualizer.assets.cytoscape_styles import EDGE_STYLES, GRAPH_STYLES
@@ -11,6 +12,7 @@ from mageflow.visualizer.builder import (
     CTXType,
 )
 from mageflow.visualizer.data import extract_signatures, create
+from mageflow.visualizer.stats import collect_workflow_stats, SignatureKeysCache
 from mageflow.visualizer.utils import pydantic_validator
 
 # Load extra layouts
@@ -20,6 +22,17 @@ cyto.load_extra_layouts()
 async def create_app(redis_url: str):
     app = Dash(__name__)
     stylesheet = GRAPH_STYLES + EDGE_STYLES
+    stats_keys_cache = SignatureKeysCache()
+
+    @app.server.route("/api/stats")
+    async def workflow_stats():
+        # Each flask async request runs in its own loop, so the client can't be shared
+        redis_client = redis.asyncio.from_url(redis_url, decode_responses=True)
+        try:
+            stats = await collect_workflow_stats(redis_client, stats_keys_cache)
+        finally:
+            await redis_client.aclose()
+        return stats.model_dump(mode="json")
 
     app.layout = html.Div(
         [
@@ -0,0 +1,276 @@
+import math
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from pydantic import BaseModel
+from rapyer.types.base import REDIS_DUMP_FLAG_NAME
+from redis.asyncio import Redis
+
+from mageflow.chain.model import ChainTaskSignature
+from mageflow.signature.status import TaskStatus, SignatureStatus
+from mageflow.swarm.model import SwarmTaskSignature, SwarmShard, SwarmConfig
+
+SWARM_COUNTED_LISTS = ["tasks", "tasks_left_to_run", "finished_tasks", "failed_tasks"]
+SWARM_SCALAR_PATHS = [
+    "$.task_name",
+    "$.task_status",
+    "$.creation_time",
+    "$.current_running_tasks",
+    "$.tasks_left_to_run[0]",
+    "$.config.shard_size",
+    "$.tasks_count",
+    "$.finished_count",
+    "$.failed_count",
+    "$.config",
+    "$.concurrency.limit",
+]
+CHAIN_SCALAR_PATHS = ["$.task_name", "$.task_status", "$.creation_time"]
+# Swarms and chains are found by scanning the keyspace, at most once in this period
+SIGNATURE_KEYS_CACHE_TTL = timedelta(seconds=30)
+
+
+class SwarmStats(BaseModel):
+    key: str
+    task_name: str
+    status: SignatureStatus
+    total_tasks: int
+    queue_depth: int
+    running: int
+    concurrency_limit: int
+    finished: int
+    failed: int
+    failure_ratio: float
+    age_seconds: Optional[float] = None
+    oldest_pending_age_seconds: Optional[float] = None
+
+
+class ChainStats(BaseModel):
+    key: str
+    task_name: str
+    status: SignatureStatus
+    total_tasks: int
+    age_seconds: Optional[float] = None
+
+
+class WorkflowStats(BaseModel):
+    swarms: list[SwarmStats]
+    chains: list[ChainStats]
+
+
+def _first(values: dict, path: str):
+    found = values.get(path) or [None]
+    return found[0]
+
+
+def _decode(key: str | bytes) -> str:
+    return key.decode() if isinstance(key, bytes) else key
+
+
+def _age_seconds(creation_time: Optional[str], now: datetime) -> Optional[float]:
+    if creation_time is None:
+        return None
+    return (now - datetime.fromisoformat(creation_time)).total_seconds()
+
+
+def _load_status(dumped_status: dict) -> SignatureStatus:
+    task_status = TaskStatus.model_validate(
+        dumped_status, context={REDIS_DUMP_FLAG_NAME: True}
+    )
+    return task_status.status
+
+
+def _swarm_config(scalars: dict) -> SwarmConfig:
+    return SwarmConfig.model_validate(
+        _first(scalars, "$.config"), context={REDIS_DUMP_FLAG_NAME: True}
+    )
+
+
+def _keeps_finished_items(scalars: dict) -> bool:
+    config = _swarm_config(scalars)
+    return config.keep_finished_items and config.shard_size is None
+
+
+def _concurrency_limit(scalars: dict) -> int:
+    config = _swarm_config(scalars)
+    if not config.adaptive_concurrency:
+        return config.max_concurrency
+    limit = _first(scalars, "$.concurrency.limit") or 0
+    return max(int(limit), config.min_concurrency)
+
+
+def _shard_keys(swarm_key: str, scalars: dict) -> list[str]:
+    tasks_count = int(_first(scalars, "$.tasks_count") or 0)
+    shards_count = math.ceil(tasks_count / _first(scalars, "$.config.shard_size"))
+    return [SwarmShard.from_swarm(swarm_key, i).key for i in range(shards_count)]
+
+
+async def find_signature_keys(redis: Redis, model: type) -> list[str]:
+    # Lock keys and other derived keys share the model prefix, they are separated by "/"
+    keys = [
+        _decode(key)
+        async for key in redis.scan_iter(match=f"{model.class_key_initials()}:*")
+    ]
+    return [key for key in keys if "/" not in key]
+
+
+class SignatureKeysCache:
+    """
+    Keys of the stored signatures of each model, scanned again only after the ttl.
+    Signatures created meanwhile are listed after the next scan, deleted ones are skipped by the stats.
+    """
+
+    def __init__(self, ttl: timedelta = SIGNATURE_KEYS_CACHE_TTL):
+        self.ttl = ttl
+        self._keys: dict[type, tuple[float, list[str]]] = {}
+
+    async def keys(self, redis: Redis, model: type) -> list[str]:
+        scanned_at, keys = self._keys.get(model, (None, None))
+        now = time.monotonic()
+        if scanned_at is None or now - scanned_at >= self.ttl.total_seconds():
+            keys = await find_signature_keys(redis, model)
+            self._keys[model] = (now, keys)
+        return keys
+
+
+async def swarms_stats(redis: Redis, swarm_keys: list[str]) -> list[SwarmStats]:
+    if not swarm_keys:
+        return []
+
+    async with redis.pipeline(transaction=False) as pipe:
+        for key in swarm_keys:
+            pipe.json().get(key, *SWARM_SCALAR_PATHS)
+            for list_field in SWARM_COUNTED_LISTS:
+                pipe.json().arrlen(key, f"$.{list_field}")
+        results = await pipe.execute(raise_on_error=False)
+
+    commands_per_swarm = 1 + len(SWARM_COUNTED_LISTS)
+    raw_swarms = {}
+    for i, key in enumerate(swarm_keys):
+        swarm_results = results[i * commands_per_swarm : (i + 1) * commands_per_swarm]
+        scalars, *lengths = swarm_results
+        # Swarm was deleted between the scan and the pipeline
+        if not isinstance(scalars, dict) or not _first(scalars, "$.task_name"):
+            continue
+        lengths = [length[0] if length else 0 for length in lengths]
+        raw_swarms[key] = (scalars, dict(zip(SWARM_COUNTED_LISTS, lengths)))
+
+    # Items of sharded swarms are kept in the shards, use the swarm counters and the shards queues
+    sharded_swarms = {
+        key: _shard_keys(key, scalars)
+        for key, (scalars, _) in raw_swarms.items()
+        if _first(scalars, "$.config.shard_size")
+    }
+    async with redis.pipeline(transaction=False) as pipe:
+        for shard_keys in sharded_swarms.values():
+            for shard_key in shard_keys:
+                pipe.json().arrlen(shard_key, "$.tasks_left_to_run")
+                pipe.json().get(shard_key, "$.tasks_left_to_run[0]")
+        shards_queues = iter(await pipe.execute(raise_on_error=False))
+    pending_heads = {
+        key: [_first(scalars, "$.tasks_left_to_run[0]")]
+        for key, (scalars, _) in raw_swarms.items()
+        if key not in sharded_swarms
+    }
+    for key, shard_keys in sharded_swarms.items():
+        scalars, lengths = raw_swarms[key]
+        queues = [(next(shards_queues), next(shards_queues)) for _ in shard_keys]
+        lengths["tasks_left_to_run"] = sum(
+            length[0] for length, _ in queues if isinstance(length, list) and length
+        )
+        pending_heads[key] = [
+            head[0] for _, head in queues if isinstance(head, list) and head
+        ]
+    # Sharded swarms and swarms that don't keep their finished items only count them
+    for key, (scalars, lengths) in raw_swarms.items():
+        if _keeps_finished_items(scalars):
+            continue
+        lengths["tasks"] = _first(scalars, "$.tasks_count") or 0
+        lengths["finished_tasks"] = _first(scalars, "$.finished_count") or 0
+        lengths["failed_tasks"] = _first(scalars, "$.failed_count") or 0
+
+    # Each queue is ordered by addition, the oldest pending item is the oldest of the queues heads
+    pending_heads = {
+        key: [head for head in heads if head] for key, heads in pending_heads.items()
+    }
+    async with redis.pipeline(transaction=False) as pipe:
+        for heads in pending_heads.values():
+            for head_key in heads:
+                pipe.json().get(head_key, "$.creation_time")
+        heads_results = iter(await pipe.execute(raise_on_error=False))
+    heads_creation = {}
+    for key, heads in pending_heads.items():
+        creations = [next(heads_results) for _ in heads]
+        creations = [
+            creation[0]
+            for creation in creations
+            if isinstance(creation, list) and creation
+        ]
+        heads_creation[key] = min(creations, key=datetime.fromisoformat, default=None)
+
+    now = datetime.now()
+    stats = []
+    for key, (scalars, lengths) in raw_swarms.items():
+        done_tasks = lengths["finished_tasks"] + lengths["failed_tasks"]
+        failure_ratio = lengths["failed_tasks"] / done_tasks if done_tasks else 0.0
+        stats.append(
+            SwarmStats(
+                key=key,
+                task_name=_first(scalars, "$.task_name"),
+                status=_load_status(_first(scalars, "$.task_status")),
+                total_tasks=int(lengths["tasks"]),
+                queue_depth=lengths["tasks_left_to_run"],
+                running=_first(scalars, "$.current_running_tasks") or 0,
+                concurrency_limit=_concurrency_limit(scalars),
+                finished=int(lengths["finished_tasks"]),
+                failed=int(lengths["failed_tasks"]),
+                failure_ratio=failure_ratio,
+                age_seconds=_age_seconds(_first(scalars, "$.creation_time"), now),
+                oldest_pending_age_seconds=_age_seconds(heads_creation.get(key), now),
+            )
+        )
+    return stats
+
+
+async def chains_stats(redis: Redis, chain_keys: list[str]) -> list[ChainStats]:
+    if not chain_keys:
+        return []
+
+    async with redis.pipeline(transaction=False) as pipe:
+        for key in chain_keys:
+            pipe.json().get(key, *CHAIN_SCALAR_PATHS)
+            pipe.json().arrlen(key, "$.tasks")
+        results = await pipe.execute(raise_on_error=False)
+
+    now = datetime.now()
+    stats = []
+    for key, scalars, tasks_len in zip(chain_keys, results[::2], results[1::2]):
+        if not isinstance(scalars, dict) or not _first(scalars, "$.task_name"):
+            continue
+        stats.append(
+            ChainStats(
+                key=key,
+                task_name=_first(scalars, "$.task_name"),
+                status=_load_status(_first(scalars, "$.task_status")),
+                total_tasks=tasks_len[0] if tasks_len else 0,
+                age_seconds=_age_seconds(_first(scalars, "$.creation_time"), now),
+            )
+        )
+    return stats
+
+
+async def collect_workflow_stats(
+    redis: Redis, keys_cache: SignatureKeysCache = None
+) -> WorkflowStats:
+    """
+    Aggregate swarm and chain statistics using redis side operations only (array lengths and counters).
+    Full signatures are never loaded, so this is cheap enough to be scraped frequently.
+    Pass a keys cache to scan the keyspace for the swarms and chains once per its ttl instead of on every call.
+    """
+    keys_cache = keys_cache or SignatureKeysCache(ttl=timedelta(0))
+    swarm_keys = await keys_cache.keys(redis, SwarmTaskSignature)
+    chain_keys = await keys_cache.keys(redis, ChainTaskSignature)
+    return WorkflowStats(
+        swarms=await swarms_stats(redis, swarm_keys),
+        chains=await chains_stats(redis, chain_keys),
+    )
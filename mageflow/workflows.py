@@ -1,7 +1,16 @@
-from typing import Any, cast
-
-from hatchet_sdk import WorkflowRunRef
-from hatchet_sdk.clients.admin import TriggerWorkflowOptions, WorkflowRunTriggerConfig
+import asyncio
+import random
+import weakref
+from datetime import datetime, timedelta
+from typing import Any, cast, Optional
+
+from hatchet_sdk import WorkflowRunRef, Hatchet
+from hatchet_sdk.clients.admin import (
+    TriggerWorkflowOptions,
+    WorkflowRunTriggerConfig,
+    ScheduleTriggerWorkflowOptions,
+)
+from hatchet_sdk.contracts.workflows_pb2 import WorkflowVersion
 from hatchet_sdk.runnables.types import TWorkflowInput, EmptyModel
 from hatchet_sdk.runnables.workflow import Workflow
 from hatchet_sdk.utils.typing import JSONSerializableMapping
@@ -11,23 +20,85 @@ from mageflow.utils.pythonic import deep_merge
 
 TASK_DATA_PARAM_NAME = "task_data"
 
+# Workflow objects of each hatchet client by task name and input validator, they only hold the trigger config
+_client_workflows: weakref.WeakKeyDictionary[Hatchet, dict[tuple, Workflow]] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def client_workflow(
+    client: Hatchet, name: str, input_validator: Optional[type[BaseModel]] = None
+) -> Workflow:
+    workflows = _client_workflows.setdefault(client, {})
+    workflow_key = (name, input_validator)
+    if workflow_key not in workflows:
+        workflows[workflow_key] = client.workflow(
+            name=name, input_validator=input_validator
+        )
+    return workflows[workflow_key]
+
+
+def stagger_seconds(stagger_delta: timedelta) -> float:
+    return random.uniform(0, stagger_delta.total_seconds())
+
+
+def staggered_run_at(stagger_delta: timedelta) -> datetime:
+    return datetime.now() + timedelta(seconds=stagger_seconds(stagger_delta))
+
+
+def schedule_options(options: TriggerWorkflowOptions) -> ScheduleTriggerWorkflowOptions:
+    # Worker affinity and the dedup key are not supported by schedules, the other options are kept
+    return ScheduleTriggerWorkflowOptions(
+        **{
+            field: getattr(options, field)
+            for field in ScheduleTriggerWorkflowOptions.model_fields
+        }
+    )
+
 
 class ModelToDump(BaseModel):
     value: Any
 
 
+def dump_workflow_params(workflow_params: dict) -> dict:
+    # Force model dump
+    results_model = ModelToDump(value=workflow_params)
+    return results_model.model_dump(mode="json")["value"]
+
+
+def merge_workflow_input(
+    input: JSONSerializableMapping, dumped_params: dict, return_value_field: str = None
+) -> JSONSerializableMapping:
+    if return_value_field:
+        return_field = {return_value_field: input}
+    else:
+        return_field = input
+
+    return deep_merge(return_field, dumped_params)
+
+
 class MageflowWorkflow(Workflow):
+    """
+    Staggered workflows are triggered at a random time in the stagger window.
+    The no wait triggers and the sync run schedule the run and return the scheduled workflow version instead
+    of the run ref or result, sleeping would block the caller thread. aio_run delays the run in the caller,
+    which waits for the result anyway.
+    """
+
     def __init__(
         self,
         workflow: Workflow,
         workflow_params: dict,
         return_value_field: str = None,
         task_ctx: dict = None,
+        stagger_delta: Optional[timedelta] = None,
     ):
         super().__init__(config=workflow.config, client=workflow.client)
         self._mageflow_workflow_params = workflow_params
         self._return_value_field = return_value_field
         self._task_ctx = task_ctx or {}
+        # Staggered tasks are scheduled to a random time in the window instead of sleeping in the worker
+        self._stagger_delta = stagger_delta
 
     def _serialize_input(self, input: Any) -> JSONSerializableMapping:
         if isinstance(input, BaseModel):
@@ -39,14 +110,11 @@ class MageflowWorkflow(Workflow):
         extra_params = super(MageflowWorkflow, self)._serialize_input(results_model)
         dumped_kwargs = extra_params["value"]
 
-        if self._return_value_field:
-            return_field = {self._return_value_field: input}
-        else:
-            return_field = input
+        return merge_workflow_input(input, dumped_kwargs, self._return_value_field)
 
-        return deep_merge(return_field, dumped_kwargs)
-
-    def _update_options(self, options: TriggerWorkflowOptions):
+    def _update_options(
+        self, options: TriggerWorkflowOptions | ScheduleTriggerWorkflowOptions
+    ):
         if self._task_ctx:
             options.additional_metadata[TASK_DATA_PARAM_NAME] = self._task_ctx
         return options
@@ -58,6 +126,9 @@ class MageflowWorkflow(Workflow):
     ):
         if options is None:
             options = TriggerWorkflowOptions()
+        if self._stagger_delta:
+            run_at = staggered_run_at(self._stagger_delta)
+            return self.schedule(run_at, input, schedule_options(options))
         options = self._update_options(options)
         return super().run(input, options)
 
@@ -65,9 +136,12 @@ class MageflowWorkflow(Workflow):
         self,
         input: TWorkflowInput = cast(TWorkflowInput, EmptyModel()),
         options: TriggerWorkflowOptions = None,
-    ):
+    ) -> WorkflowRunRef | WorkflowVersion:
         if options is None:
             options = TriggerWorkflowOptions()
+        if self._stagger_delta:
+            run_at = staggered_run_at(self._stagger_delta)
+            return self.schedule(run_at, input, schedule_options(options))
         options = self._update_options(options)
         return super().run_no_wait(input, options)
 
@@ -92,9 +166,12 @@ class MageflowWorkflow(Workflow):
         self,
         input: TWorkflowInput = cast(TWorkflowInput, EmptyModel()),
         options: TriggerWorkflowOptions = None,
-    ) -> WorkflowRunRef:
+    ) -> WorkflowRunRef | WorkflowVersion:
         if options is None:
             options = TriggerWorkflowOptions()
+        if self._stagger_delta:
+            run_at = staggered_run_at(self._stagger_delta)
+            return await self.aio_schedule(run_at, input, schedule_options(options))
         options = self._update_options(options)
         return await super().aio_run_no_wait(input, options)
 
@@ -106,6 +183,8 @@ class MageflowWorkflow(Workflow):
         if options is None:
             options = TriggerWorkflowOptions()
         options = self._update_options(options)
+        if self._stagger_delta:
+            await asyncio.sleep(stagger_seconds(self._stagger_delta))
         return await super().aio_run(input, options)
 
     async def aio_run_many_no_wait(
@@ -126,3 +205,25 @@ class MageflowWorkflow(Workflow):
             wf.options = self._update_options(wf.options)
 
         return await super().aio_run_many(workflows, return_exceptions)
+
+    async def aio_schedule(
+        self,
+        run_at: datetime,
+        input: TWorkflowInput = cast(TWorkflowInput, EmptyModel()),
+        options: ScheduleTriggerWorkflowOptions = None,
+    ):
+        if options is None:
+            options = ScheduleTriggerWorkflowOptions()
+        options = self._update_options(options)
+        return await super().aio_schedule(run_at, input, options)
+
+    def schedule(
+        self,
+        run_at: datetime,
+        input: TWorkflowInput = cast(TWorkflowInput, EmptyModel()),
+        options: ScheduleTriggerWorkflowOptions = None,
+    ):
+        if options is None:
+            options = ScheduleTriggerWorkflowOptions()
+        options = self._update_options(options)
+        return super().schedule(run_at, input, options)
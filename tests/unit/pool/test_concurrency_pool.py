@@ -0,0 +1,124 @@
+import asyncio
+import time
+from datetime import timedelta
+from unittest.mock import patch, AsyncMock, MagicMock
+
+import pytest
+from hatchet_sdk.runnables.types import EmptyModel
+
+import mageflow
+from mageflow.invokers.hatchet import HatchetInvoker
+from mageflow.pool.model import ConcurrencyPool
+from mageflow.signature.model import TaskSignature
+from mageflow.swarm.model import SwarmTaskSignature, SwarmConfig
+from mageflow.workflows import TASK_DATA_PARAM_NAME
+
+
+@pytest.mark.asyncio
+async def test_pool_free_slot_goes_to_waiting_holder_under_share_sanity():
+    # Arrange
+    pool = await mageflow.concurrency_pool("weighted_api", limit=6)
+    await pool.acquire("heavy", "heavy_0", weight=2)
+    # No one is waiting, so light borrows above its share (2 of 6) until the pool is full
+    light_grants = [await pool.acquire("light", f"light_{i}", 1) for i in range(5)]
+    heavy_denied = await pool.acquire("heavy", "heavy_1", weight=2)
+    await pool.release(["light_0"])
+
+    # Act
+    light_granted = await pool.acquire("light", "light_5", 1)
+    heavy_granted = await pool.acquire("heavy", "heavy_1", weight=2)
+
+    # Assert
+    assert all(light_grants) and not heavy_denied
+    assert not light_granted
+    assert heavy_granted
+    assert await pool.active_leases() == 6
+
+
+@pytest.mark.asyncio
+async def test_pool_single_holder_uses_whole_limit_sanity():
+    # Arrange
+    pool = await mageflow.concurrency_pool("single_api", limit=3)
+
+    # Act
+    grants = [await pool.acquire("only", f"lease_{i}") for i in range(4)]
+
+    # Assert
+    assert grants == [True, True, True, False]
+
+
+@pytest.mark.asyncio
+async def test_pool_expired_leases_return_to_pool_edge_case():
+    # Arrange
+    pool = await mageflow.concurrency_pool(
+        "expiring_api", limit=1, lease_ttl=timedelta(seconds=30)
+    )
+    await pool.acquire("dead_worker", "lost_lease")
+    denied_before_expiry = await pool.acquire("other", "lease")
+
+    # Act
+    with patch("mageflow.pool.model.time.time", return_value=time.time() + 60):
+        granted_after_expiry = await pool.acquire("other", "lease")
+
+    # Assert
+    assert not denied_before_expiry
+    assert granted_after_expiry
+
+
+@pytest.mark.asyncio
+async def test_swarms_share_pool_and_release_wakes_waiting_swarm_sanity(
+    hatchet_mock,
+):
+    # Arrange
+    await mageflow.concurrency_pool("shared_api", limit=1)
+    config = SwarmConfig(concurrency_pool="shared_api", max_concurrency=5)
+    first_swarm = await mageflow.swarm(task_name="first", config=config)
+    second_swarm = await mageflow.swarm(task_name="second", config=config)
+    first_item = await first_swarm.add_task(TaskSignature(task_name="first_item"))
+    second_item = await second_swarm.add_task(TaskSignature(task_name="second_item"))
+
+    # Act
+    first_can_run = await first_swarm.add_to_running_tasks(first_item)
+    second_can_run = await second_swarm.add_to_running_tasks(second_item)
+    with patch.object(
+        SwarmTaskSignature, "fill_running_tasks", new_callable=AsyncMock
+    ) as fill_mock:
+        await first_swarm.release_pool_slots([first_item.key])
+
+    # Assert
+    assert first_can_run and not second_can_run
+    reloaded_second = await SwarmTaskSignature.get_safe(second_swarm.key)
+    assert reloaded_second.tasks_left_to_run == [second_item.key]
+    fill_mock.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_running_swarm_item_renews_pool_lease_sanity(redis_client):
+    # Arrange
+    pool = await mageflow.concurrency_pool(
+        "renewed_api", limit=1, lease_ttl=timedelta(seconds=30)
+    )
+    swarm_signature = await mageflow.swarm(
+        task_name="pool_swarm", config=SwarmConfig(concurrency_pool="renewed_api")
+    )
+    item = await swarm_signature.add_task(TaskSignature(task_name="pool_item"))
+    with patch.object(TaskSignature, "aio_run_no_wait", new_callable=AsyncMock):
+        await item.aio_run_no_wait(EmptyModel())
+    original_task = await TaskSignature.get_safe(item.original_task_id)
+    ctx = MagicMock(
+        additional_metadata={TASK_DATA_PARAM_NAME: original_task.task_ctx()},
+        workflow_id="workflow_run_id",
+    )
+    invoker = HatchetInvoker(EmptyModel(), ctx)
+
+    # Act
+    with patch("mageflow.pool.model.time.time", return_value=time.time() + 25):
+        async with invoker.keep_swarm_item_lease():
+            await asyncio.sleep(0.01)
+
+    # Assert
+    leases_key = pool.state_keys[0]
+    assert await redis_client.zscore(leases_key, item.key) > time.time() + 50
+    # The pool slot is still held after the original lease ttl
+    with patch("mageflow.pool.model.time.time", return_value=time.time() + 40):
+        assert not await pool.acquire("other", "other_lease")
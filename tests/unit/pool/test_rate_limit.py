@@ -0,0 +1,137 @@
+import time
+from datetime import timedelta
+from unittest.mock import patch, AsyncMock
+
+import pytest
+from hatchet_sdk.runnables.types import EmptyModel
+
+import mageflow
+from mageflow.pool.rate_limit import TokenBucket
+from mageflow.signature.model import TaskSignature
+from mageflow.swarm.model import SwarmTaskSignature, SwarmConfig, BatchItemTaskSignature
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_allows_burst_then_refills_by_rate_sanity(redis_client):
+    # Arrange
+    bucket = TokenBucket(redis_client, "test_bucket", rate=2, burst=3)
+    now = time.time()
+
+    # Act
+    with patch("mageflow.pool.rate_limit.time.time", return_value=now):
+        burst_granted, burst_retry = await bucket.take(5)
+    with patch("mageflow.pool.rate_limit.time.time", return_value=now + 1):
+        refilled_granted, _ = await bucket.take(5)
+
+    # Assert
+    assert burst_granted == 3
+    assert burst_retry == timedelta(seconds=0.5)
+    assert refilled_granted == 2
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_refund_is_capped_by_burst_edge_case(redis_client):
+    # Arrange
+    bucket = TokenBucket(redis_client, "refund_bucket", rate=0.001, burst=2)
+    await bucket.take(1)
+
+    # Act
+    await bucket.refund(5)
+    granted, _ = await bucket.take(5)
+
+    # Assert
+    assert granted == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(["shard_size"], [[None], [2]])
+async def test_fill_running_tasks_holds_rate_limited_items_in_queue_sanity(
+    shard_size,
+):
+    # Arrange
+    await mageflow.concurrency_pool("rate_api", limit=10, rate_limit=0.01, rate_burst=2)
+    swarm_signature = await mageflow.swarm(
+        task_name="rate_limited_swarm",
+        config=SwarmConfig(
+            max_concurrency=5,
+            rate_limit=100,
+            concurrency_pool="rate_api",
+            shard_size=shard_size,
+        ),
+    )
+    items = []
+    for i in range(4):
+        task = TaskSignature(task_name=f"rate_item_{i}")
+        await task.save()
+        items.append(await swarm_signature.add_task(task))
+    swarm_signature = await SwarmTaskSignature.get_safe(swarm_signature.key)
+    if shard_size:
+        await swarm_signature.queue_shards_tasks()
+    else:
+        await swarm_signature.tasks_left_to_run.aextend([item.key for item in items])
+
+    # Act
+    with (
+        patch.object(
+            BatchItemTaskSignature, "aio_run_no_wait", new_callable=AsyncMock
+        ) as run_mock,
+        patch.object(
+            SwarmTaskSignature, "schedule_fill", new_callable=AsyncMock
+        ) as schedule_mock,
+    ):
+        started = await swarm_signature.fill_running_tasks()
+
+    # Assert
+    # The pool burst is the tightest limit, the rest wait in the queue for a scheduled fill
+    assert started == run_mock.await_count == 2
+    schedule_mock.assert_awaited_once()
+    assert schedule_mock.call_args.args[0] > timedelta(seconds=1)
+    reloaded_swarm = await SwarmTaskSignature.get_safe(swarm_signature.key)
+    if shard_size:
+        shards = await reloaded_swarm.load_shards()
+        queued = [key for shard in shards for key in shard.tasks_left_to_run]
+    else:
+        queued = reloaded_swarm.tasks_left_to_run
+    assert len(queued) == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(["shard_size"], [[None], [2]])
+async def test_items_started_directly_take_rate_tokens_sanity(shard_size):
+    # Arrange
+    swarm_signature = await mageflow.swarm(
+        task_name="directly_started_swarm",
+        config=SwarmConfig(
+            max_concurrency=5, rate_limit=1, rate_burst=1, shard_size=shard_size
+        ),
+    )
+    items = []
+    for i in range(5):
+        task = TaskSignature(task_name=f"direct_item_{i}")
+        await task.save()
+        items.append(await swarm_signature.add_task(task))
+
+    # Act
+    with (
+        patch.object(
+            TaskSignature, "aio_run_no_wait", new_callable=AsyncMock
+        ) as run_mock,
+        patch.object(
+            SwarmTaskSignature, "schedule_fill", new_callable=AsyncMock
+        ) as schedule_mock,
+    ):
+        for item in items:
+            await item.aio_run_no_wait(EmptyModel())
+
+    # Assert
+    # The queued items wait for a scheduled fill instead of starting together
+    assert run_mock.await_count == 1
+    schedule_mock.assert_awaited()
+    reloaded_swarm = await SwarmTaskSignature.get_safe(swarm_signature.key)
+    assert reloaded_swarm.current_running_tasks == 1
+    if shard_size:
+        shards = await reloaded_swarm.load_shards()
+        queued = [key for shard in shards for key in shard.tasks_left_to_run]
+    else:
+        queued = reloaded_swarm.tasks_left_to_run
+    assert queued == [item.key for item in items[1:]]
@@ -0,0 +1,111 @@
+from unittest.mock import patch
+
+import pytest
+
+import mageflow
+from mageflow.chain.model import ChainTaskSignature
+from mageflow.signature.bulk import bulk_change_status, StatusChangeCounts
+from mageflow.signature.model import TaskSignature
+from mageflow.signature.status import SignatureStatus, TaskStatus
+from tests.unit.assertions import assert_tasks_changed_status
+
+
+async def create_chain() -> ChainTaskSignature:
+    return await mageflow.chain(
+        [await mageflow.sign(f"chain_task_{i}") for i in range(2)]
+    )
+
+
+@pytest.mark.asyncio
+async def test_bulk_change_status_counts_changed_unchanged_and_missing_sanity():
+    # Arrange
+    pending_tasks = [await mageflow.sign(f"bulk_task_{i}") for i in range(3)]
+    suspended_task = TaskSignature(
+        task_name="bulk_suspended_task",
+        task_status=TaskStatus(status=SignatureStatus.SUSPENDED),
+    )
+    await suspended_task.asave()
+    deleted_task = await mageflow.sign("bulk_deleted_task")
+    await deleted_task.remove()
+    task_keys = [task.key for task in pending_tasks]
+    task_keys += [suspended_task.key, deleted_task.key]
+
+    # Act
+    with patch("mageflow.signature.bulk.BULK_STATUS_BATCH_SIZE", 2):
+        counts = await bulk_change_status(task_keys, SignatureStatus.SUSPENDED)
+
+    # Assert
+    assert counts == StatusChangeCounts(changed=3, unchanged=1, missing=1)
+    await assert_tasks_changed_status(
+        [task.key for task in pending_tasks],
+        SignatureStatus.SUSPENDED,
+        SignatureStatus.PENDING,
+    )
+    reloaded_task = await TaskSignature.get_safe(pending_tasks[0].key)
+    assert reloaded_task.version == 1
+
+
+@pytest.mark.asyncio
+async def test_swarm_suspend_changes_items_without_locks_sanity():
+    # Arrange
+    tasks = [await mageflow.sign(f"bulk_item_{i}") for i in range(3)]
+    swarm_signature = await mageflow.swarm(tasks=tasks)
+
+    # Act
+    with patch("mageflow.signature.locks.acquire_lock") as lock_mock:
+        counts = await swarm_signature.suspend()
+
+    # Assert
+    lock_mock.assert_not_called()
+    assert counts == StatusChangeCounts(changed=3)
+    await assert_tasks_changed_status(
+        [task.key for task in tasks], SignatureStatus.SUSPENDED
+    )
+    await assert_tasks_changed_status(
+        list(swarm_signature.tasks), SignatureStatus.SUSPENDED
+    )
+
+
+@pytest.mark.asyncio
+async def test_bulk_change_status_counts_containers_sanity():
+    # Arrange
+    pending_chain = await create_chain()
+    suspended_chain = await create_chain()
+    await suspended_chain.suspend()
+    deleted_chain = await create_chain()
+    await deleted_chain.remove()
+    chain_keys = [pending_chain.key, suspended_chain.key, deleted_chain.key]
+
+    # Act
+    counts = await bulk_change_status(chain_keys, SignatureStatus.SUSPENDED)
+
+    # Assert
+    assert counts == StatusChangeCounts(changed=1, unchanged=1, missing=1)
+
+
+@pytest.mark.asyncio
+async def test_bulk_change_status_raises_container_errors_edge_case():
+    # Arrange
+    chain_signature = await create_chain()
+
+    # Act & Assert
+    with patch.object(
+        ChainTaskSignature, "change_status", side_effect=ConnectionError("lost")
+    ):
+        with pytest.raises(ConnectionError):
+            await bulk_change_status([chain_signature.key], SignatureStatus.SUSPENDED)
+
+
+@pytest.mark.asyncio
+async def test_pause_and_resume_return_sub_tasks_counts_sanity():
+    # Arrange
+    tasks = [await mageflow.sign(f"chain_task_{i}") for i in range(3)]
+    chain_signature = await mageflow.chain(tasks)
+
+    # Act
+    pause_counts = await mageflow.pause(chain_signature.key)
+    resume_counts = await mageflow.resume(chain_signature.key)
+
+    # Assert
+    assert pause_counts == StatusChangeCounts(changed=3)
+    assert resume_counts == StatusChangeCounts(changed=3)
@@ -0,0 +1,54 @@
+from unittest.mock import patch
+
+import pytest
+
+import mageflow
+from mageflow.startup import mageflow_config
+from mageflow.task.model import HatchetTaskModel
+from tests.integration.hatchet.models import ContextMessage
+
+
+@pytest.mark.asyncio
+async def test_callbacks_of_same_task_share_definition_and_workflow_sanity():
+    # Arrange
+    callbacks = [
+        await mageflow.sign("callback_task", model_validators=ContextMessage)
+        for _ in range(100)
+    ]
+    signature = await mageflow.sign("parent_task")
+    await signature.add_callbacks(success=callbacks, errors=[])
+    hatchet_client = mageflow_config.hatchet_client
+
+    # Act
+    with (
+        patch.object(
+            HatchetTaskModel, "safe_get", wraps=HatchetTaskModel.safe_get
+        ) as safe_get_spy,
+        patch.object(
+            hatchet_client, "workflow", wraps=hatchet_client.workflow
+        ) as workflow_spy,
+    ):
+        workflows = await signature.callback_workflows(use_return_field=False)
+
+    # Assert
+    assert len(workflows) == 100
+    safe_get_spy.assert_called_once_with("callback_task")
+    workflow_spy.assert_called_once_with(
+        name="callback_task", input_validator=ContextMessage
+    )
+    workflow_ids = {workflow._task_ctx["task_id"] for workflow in workflows}
+    assert workflow_ids == {callback.key for callback in callbacks}
+
+
+@pytest.mark.asyncio
+async def test_duplicate_callbacks_build_one_workflow_edge_case():
+    # Arrange
+    callback = await mageflow.sign("callback_task", model_validators=ContextMessage)
+    signature = await mageflow.sign("parent_task")
+    await signature.add_callbacks(success=[callback, callback], errors=[callback])
+
+    # Act
+    workflows = await signature.callback_workflows(use_return_field=False)
+
+    # Assert
+    assert len(workflows) == 1
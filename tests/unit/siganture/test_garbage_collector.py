@@ -0,0 +1,124 @@
+from datetime import timedelta
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from hatchet_sdk.runnables.types import EmptyModel
+from redis.crc import key_slot
+
+import mageflow
+from mageflow.signature.garbage_collector import (
+    collect_garbage,
+    GarbageCollectionReport,
+    SIGNATURE_CREATION_INDEX_PREFIX,
+    creation_index_key,
+)
+from mageflow.signature.hash_tag import key_shard_tag
+from mageflow.signature.model import TaskSignature
+
+
+@pytest.mark.asyncio
+async def test_callbacks_of_deleted_parent_are_collected_sanity(redis_client):
+    # Arrange
+    success_callback = await mageflow.sign("gc_success_callback")
+    error_callback = await mageflow.sign("gc_error_callback")
+    parent = await mageflow.sign(
+        "gc_parent",
+        success_callbacks=[success_callback],
+        error_callbacks=[error_callback],
+    )
+    await redis_client.delete(parent.key)
+
+    # Act
+    report = await collect_garbage(grace_period=timedelta(0))
+
+    # Assert
+    assert report == GarbageCollectionReport(scanned=3, expired=1, deleted=2)
+    assert await TaskSignature.get_safe(success_callback.key) is None
+    assert await TaskSignature.get_safe(error_callback.key) is None
+    creation_index_keys = redis_client.scan_iter(f"{SIGNATURE_CREATION_INDEX_PREFIX}:*")
+    assert not [key async for key in creation_index_keys]
+
+
+@pytest.mark.asyncio
+async def test_triggered_callbacks_are_not_collected_sanity(redis_client):
+    # Arrange
+    success_callback = await mageflow.sign("gc_success_callback")
+    parent = await mageflow.sign("gc_parent", success_callbacks=[success_callback])
+    with patch.object(TaskSignature, "callback_workflows", AsyncMock(return_value=[])):
+        await parent.activate_success(EmptyModel())
+    await parent.remove(with_success=False)
+
+    # Act
+    report = await collect_garbage(grace_period=timedelta(0))
+
+    # Assert
+    assert report == GarbageCollectionReport(scanned=1)
+    assert await TaskSignature.get_safe(success_callback.key) is not None
+
+
+@pytest.mark.asyncio
+async def test_items_of_deleted_swarm_are_collected_sanity(redis_client):
+    # Arrange
+    tasks = [await mageflow.sign(f"gc_swarm_task_{i}") for i in range(3)]
+    swarm_signature = await mageflow.swarm(tasks=tasks)
+    item_keys = list(swarm_signature.tasks)
+    await redis_client.delete(swarm_signature.key)
+
+    # Act
+    report = await collect_garbage(grace_period=timedelta(0), batch_size=2)
+
+    # Assert
+    assert report.deleted >= len(item_keys)
+    assert report.failed == 0
+    for task_key in item_keys + [task.key for task in tasks]:
+        assert await TaskSignature.get_safe(task_key) is None
+
+
+@pytest.mark.asyncio
+async def test_signatures_in_grace_period_are_not_collected_edge_case(redis_client):
+    # Arrange
+    callback = await mageflow.sign("gc_young_callback")
+    parent = await mageflow.sign("gc_young_parent", success_callbacks=[callback])
+    await redis_client.delete(parent.key)
+
+    # Act
+    report = await collect_garbage(grace_period=timedelta(minutes=10))
+
+    # Assert
+    assert report == GarbageCollectionReport()
+    assert await TaskSignature.get_safe(callback.key) is not None
+
+
+@pytest.mark.asyncio
+async def test_creation_index_shares_signature_slot_sanity(redis_client):
+    # Act
+    signature = await mageflow.sign("gc_slot_task")
+
+    # Assert
+    index_key = creation_index_key(key_shard_tag(signature.key))
+    assert await redis_client.zscore(index_key, signature.key) is not None
+    assert key_slot(index_key.encode()) == key_slot(signature.key.encode())
+
+
+@pytest.mark.asyncio
+async def test_collection_continues_from_previous_run_sanity(redis_client):
+    # Arrange
+    with mageflow.workflow_scope():
+        callbacks = [await mageflow.sign(f"gc_next_callback_{i}") for i in range(3)]
+        parent = await mageflow.sign("gc_next_parent", success_callbacks=callbacks)
+    await redis_client.delete(parent.key)
+
+    # Act
+    reports = [
+        await collect_garbage(
+            grace_period=timedelta(0), batch_size=1, max_shard_batches=1
+        )
+        for _ in range(5)
+    ]
+
+    # Assert
+    assert [report.scanned for report in reports] == [1, 1, 1, 1, 0]
+    assert sum(report.deleted for report in reports) == len(callbacks)
+    assert reports[3].expired == 1
+    for callback in callbacks:
+        assert await TaskSignature.get_safe(callback.key) is None
@@ -0,0 +1,149 @@
+import pytest
+from redis.crc import key_slot
+
+import mageflow
+from mageflow.signature.hash_tag import (
+    key_hash_tag,
+    WORKFLOW_HASH_TAG,
+    SHARD_HASH_TAGS,
+)
+from mageflow.signature.model import TaskSignature
+from mageflow.signature.garbage_collector import (
+    SIGNATURE_CREATION_INDEX_PREFIX,
+    CALLBACK_PARENTS_PREFIX,
+)
+from mageflow.signature.status_index import STATUS_INDEX_PREFIX, TASK_NAMES_KEY_PREFIX
+
+INDEX_KEYS = (
+    STATUS_INDEX_PREFIX,
+    TASK_NAMES_KEY_PREFIX,
+    SIGNATURE_CREATION_INDEX_PREFIX,
+    CALLBACK_PARENTS_PREFIX,
+)
+
+
+async def stored_signature_keys(redis_client) -> list[str]:
+    keys = [key.decode() async for key in redis_client.scan_iter()]
+    return [key for key in keys if "/" not in key and not key.startswith(INDEX_KEYS)]
+
+
+@pytest.mark.parametrize(
+    ["key", "expected_tag"],
+    [
+        ["TaskSignature:{abc}123", "abc"],
+        ["TaskSignature:{abc}{def}", "abc"],
+        ["TaskSignature:{}abc", None],
+        ["TaskSignature:123", None],
+    ],
+)
+def test_key_hash_tag_matches_cluster_hash_tag_sanity(key, expected_tag):
+    # Act
+    hash_tag = key_hash_tag(key)
+
+    # Assert
+    assert hash_tag == expected_tag
+
+
+@pytest.mark.asyncio
+async def test_chain_signatures_share_cluster_slot_sanity(redis_client):
+    # Arrange
+    with mageflow.workflow_scope():
+        tasks = [await mageflow.sign(f"slot_task_{i}") for i in range(3)]
+    standalone_task = await mageflow.sign("standalone_task")
+
+    # Act
+    chain_signature = await mageflow.chain(tasks)
+
+    # Assert
+    keys = set(await stored_signature_keys(redis_client)) - {standalone_task.key}
+    assert chain_signature.key in keys
+    assert {key_slot(key.encode()) for key in keys} == {
+        key_slot(chain_signature.key.encode())
+    }
+    assert key_hash_tag(standalone_task.key) in SHARD_HASH_TAGS
+    assert WORKFLOW_HASH_TAG.get() is None
+
+
+@pytest.mark.asyncio
+async def test_swarm_items_share_swarm_slot_and_swarms_spread_sanity(hatchet_mock):
+    # Arrange
+    @hatchet_mock.task(name="swarm_item_task")
+    def swarm_item_task(msg):
+        return msg
+
+    first_swarm = await mageflow.swarm(task_name="first_swarm")
+    other_swarms = [await mageflow.swarm(task_name=f"swarm_{i}") for i in range(10)]
+
+    # Act
+    batch_item = await first_swarm.add_task(swarm_item_task)
+
+    # Assert
+    original_task = await TaskSignature.get_safe(batch_item.original_task_id)
+    item_keys = [
+        batch_item.key,
+        original_task.key,
+        *original_task.success_callbacks,
+        *original_task.error_callbacks,
+    ]
+    swarm_tag = key_hash_tag(first_swarm.key)
+    assert all(key_hash_tag(key) == swarm_tag for key in item_keys)
+    other_tags = {key_hash_tag(swarm.key) for swarm in other_swarms}
+    assert len(other_tags | {swarm_tag}) > 1
+    assert other_tags <= set(SHARD_HASH_TAGS)
+
+
+@pytest.mark.asyncio
+async def test_chain_moves_tasks_signed_before_to_chain_slot_sanity(redis_client):
+    # Arrange
+    tasks = []
+    for i in range(3):
+        # Each task in another slot, so the tasks after the first are moved
+        with mageflow.workflow_scope(SHARD_HASH_TAGS[i]):
+            tasks.append(await mageflow.sign(f"moved_task_{i}", index=i))
+    previous_keys = [task.key for task in tasks]
+
+    # Act
+    chain_signature = await mageflow.chain(tasks)
+
+    # Assert
+    keys = await stored_signature_keys(redis_client)
+    assert {key_slot(key.encode()) for key in keys} == {
+        key_slot(chain_signature.key.encode())
+    }
+    assert chain_signature.tasks == [task.key for task in tasks]
+    for i, task in enumerate(tasks):
+        loaded_task = await TaskSignature.get_safe(task.key)
+        assert loaded_task.kwargs == {"index": i}
+    # The chain is stored in the slot of its first task, the others are moved to it
+    assert tasks[0].key == previous_keys[0]
+    assert not set(previous_keys[1:]) & set(keys)
+
+
+@pytest.mark.asyncio
+async def test_swarm_moves_tasks_signed_before_to_swarm_slot_sanity(redis_client):
+    # Arrange
+    tasks = [await mageflow.sign(f"moved_swarm_task_{i}") for i in range(3)]
+
+    # Act
+    swarm_signature = await mageflow.swarm(tasks=tasks, task_name="moved_swarm")
+
+    # Assert
+    keys = await stored_signature_keys(redis_client)
+    assert {key_hash_tag(key) for key in keys} == {key_hash_tag(swarm_signature.key)}
+
+
+@pytest.mark.asyncio
+async def test_callback_signature_keeps_key_in_chain_edge_case():
+    # Arrange
+    callback = await mageflow.sign("kept_callback_task")
+    await mageflow.sign("callback_parent_task", success_callbacks=[callback])
+    callback_key = callback.key
+    other_task = await mageflow.sign("other_chained_task")
+
+    # Act
+    chain_signature = await mageflow.chain([other_task, callback])
+
+    # Assert
+    assert callback.key == callback_key
+    assert chain_signature.tasks[1] == callback_key
+    assert await TaskSignature.get_safe(callback_key) is not None
@@ -0,0 +1,99 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+import rapyer
+
+import mageflow
+from mageflow.invokers.hatchet import HatchetInvoker
+from mageflow.signature.consts import TASK_ID_PARAM_NAME
+from mageflow.signature.identity_map import signatures_identity_map
+from mageflow.signature.model import TaskSignature
+from mageflow.signature.status import SignatureStatus
+from mageflow.workflows import TASK_DATA_PARAM_NAME
+from tests.integration.hatchet.models import ContextMessage
+
+
+def loaded_keys(aget_spy) -> list[str]:
+    return [call.args[0] for call in aget_spy.call_args_list]
+
+
+@pytest.mark.asyncio
+async def test_signature_is_read_once_in_scope_sanity():
+    # Arrange
+    signature = await mageflow.sign("mapped_task")
+
+    # Act
+    with patch.object(rapyer, "aget", wraps=rapyer.aget) as aget_spy:
+        with signatures_identity_map():
+            first = await TaskSignature.get_safe(signature.key)
+            second = await TaskSignature.get_safe(signature.key)
+
+    # Assert
+    assert first is second
+    assert loaded_keys(aget_spy) == [signature.key]
+
+
+@pytest.mark.asyncio
+async def test_lock_reloads_mapped_signature_sanity():
+    # Arrange
+    signature = await mageflow.sign("mapped_task")
+
+    with signatures_identity_map():
+        loaded = await TaskSignature.get_safe(signature.key)
+        await TaskSignature.update_from_key(
+            signature.key, lambda task: task.kwargs.aupdate(param="value")
+        )
+
+        # Act
+        reloaded = await TaskSignature.get_safe(signature.key)
+
+    # Assert
+    assert reloaded is not loaded
+    assert reloaded.kwargs == {"param": "value"}
+
+
+@pytest.mark.asyncio
+async def test_removed_signature_is_not_returned_from_scope_edge_case():
+    # Arrange
+    signature = await mageflow.sign("mapped_task")
+
+    with signatures_identity_map():
+        loaded = await TaskSignature.get_safe(signature.key)
+
+        # Act
+        await loaded.remove()
+
+        # Assert
+        assert await TaskSignature.get_safe(signature.key) is None
+
+
+@pytest.mark.asyncio
+async def test_invoker_reads_task_signature_once_per_step_sanity():
+    # Arrange
+    callback = await mageflow.sign("callback_task")
+    signature = await mageflow.sign("invoked_task", model_validators=ContextMessage)
+    await signature.add_callbacks(success=[callback], errors=[])
+    ctx = MagicMock(
+        additional_metadata={TASK_DATA_PARAM_NAME: {TASK_ID_PARAM_NAME: signature.key}},
+        workflow_id="workflow_run_id",
+    )
+    invoker = HatchetInvoker(ContextMessage(), ctx)
+
+    # Act
+    with (
+        patch.object(rapyer, "aget", wraps=rapyer.aget) as aget_spy,
+        patch.object(TaskSignature, "workflow") as workflow_mock,
+    ):
+        workflow_mock.return_value.aio_run_no_wait = AsyncMock()
+        assert await invoker.should_run_task()
+        started = await invoker.start_task()
+        await invoker.run_success({"result": 1})
+        await invoker.remove_task(with_success=False)
+
+    # Assert
+    assert started.task_status.status == SignatureStatus.ACTIVE
+    # Loaded to check it should run and reloaded under the lock to start it
+    assert loaded_keys(aget_spy).count(signature.key) == 2
+    assert loaded_keys(aget_spy).count(callback.key) == 1
+    workflow_mock.return_value.aio_run_no_wait.assert_awaited_once()
+    assert await TaskSignature.get_safe(signature.key) is None
@@ -0,0 +1,99 @@
+from unittest.mock import patch
+
+import pytest
+import rapyer
+
+import mageflow
+from mageflow.errors import SignatureVersionConflictError
+from mageflow.signature.model import TaskSignature
+from mageflow.signature.status import SignatureStatus
+from mageflow.startup import mageflow_config
+
+
+@pytest.fixture
+def optimistic_concurrency():
+    mageflow_config.optimistic_concurrency = True
+    try:
+        yield
+    finally:
+        mageflow_config.optimistic_concurrency = False
+
+
+@pytest.mark.asyncio
+async def test_suspend_from_key_without_lock_bumps_version_sanity(
+    optimistic_concurrency,
+):
+    # Arrange
+    signature = await mageflow.sign("optimistic_task")
+
+    # Act
+    with patch("mageflow.signature.locks.acquire_lock") as lock_mock:
+        await TaskSignature.suspend_from_key(signature.key)
+
+    # Assert
+    lock_mock.assert_not_called()
+    reloaded_signature = await TaskSignature.get_safe(signature.key)
+    assert reloaded_signature.task_status.status == SignatureStatus.SUSPENDED
+    assert reloaded_signature.task_status.last_status == SignatureStatus.PENDING
+    assert reloaded_signature.version == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_signature_status_change_conflicts_sanity(
+    optimistic_concurrency,
+):
+    # Arrange
+    signature = await mageflow.sign("optimistic_task")
+    stale_signature = await TaskSignature.get_safe(signature.key)
+    await signature.change_status(SignatureStatus.ACTIVE)
+
+    # Act
+    with pytest.raises(SignatureVersionConflictError):
+        await stale_signature.change_status(SignatureStatus.CANCELED)
+
+    # Assert
+    reloaded_signature = await TaskSignature.get_safe(signature.key)
+    assert reloaded_signature.task_status.status == SignatureStatus.ACTIVE
+
+
+@pytest.mark.asyncio
+async def test_update_from_key_retries_after_concurrent_change_sanity(
+    optimistic_concurrency,
+):
+    # Arrange
+    signature = await mageflow.sign("optimistic_task")
+    loaded_versions = []
+
+    async def suspend_after_concurrent_change(task: TaskSignature):
+        loaded_versions.append(int(task.version))
+        if len(loaded_versions) == 1:
+            concurrent_signature = await rapyer.aget(signature.key)
+            await concurrent_signature.change_status(SignatureStatus.ACTIVE)
+        await task.change_status(SignatureStatus.SUSPENDED)
+
+    # Act
+    await TaskSignature.update_from_key(signature.key, suspend_after_concurrent_change)
+
+    # Assert
+    assert loaded_versions == [0, 1]
+    reloaded_signature = await TaskSignature.get_safe(signature.key)
+    assert reloaded_signature.task_status.status == SignatureStatus.SUSPENDED
+    assert reloaded_signature.task_status.last_status == SignatureStatus.ACTIVE
+    assert reloaded_signature.version == 2
+
+
+@pytest.mark.asyncio
+async def test_signature_stored_without_version_is_updated_edge_case(
+    redis_client, optimistic_concurrency
+):
+    # Arrange
+    signature = await mageflow.sign("optimistic_task")
+    await redis_client.json().delete(signature.key, "$.version")
+
+    # Act
+    await TaskSignature.suspend_from_key(signature.key)
+
+    # Assert
+    reloaded_signature = await TaskSignature.get_safe(signature.key)
+    assert reloaded_signature.task_status.status == SignatureStatus.SUSPENDED
+    assert reloaded_signature.version == 1
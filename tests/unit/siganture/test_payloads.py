@@ -0,0 +1,201 @@
+from datetime import timedelta, datetime
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from pydantic import BaseModel
+
+import mageflow
+from mageflow.errors import MissingPayloadError
+from mageflow.signature.bulk import bulk_change_status
+from mageflow.signature.consts import PAYLOAD_OFFLOAD_THRESHOLD
+from mageflow.signature.model import TaskSignature
+from mageflow.signature.payloads import (
+    PAYLOAD_KEY_PREFIX,
+    payload_ref,
+    clear_payloads_cache,
+)
+from mageflow.signature.status import SignatureStatus
+from mageflow.signature.ttl import TTLPolicy
+from mageflow.startup import mageflow_config
+from tests.integration.hatchet.models import ContextMessage
+
+LARGE_VALUE = [
+    f"{i}" + "x" * 1024 for i in range(PAYLOAD_OFFLOAD_THRESHOLD // 1024 + 1)
+]
+
+
+class LargeModel(BaseModel):
+    items: list[str]
+    created_at: datetime
+
+
+async def stored_payload_keys(redis_client) -> list[str]:
+    return [
+        key.decode() async for key in redis_client.scan_iter(f"{PAYLOAD_KEY_PREFIX}:*")
+    ]
+
+
+@pytest.fixture(autouse=True)
+def payloads_cache():
+    clear_payloads_cache()
+    yield
+    clear_payloads_cache()
+
+
+@pytest.fixture
+def suspended_ttl_policy():
+    mageflow_config.ttl_policies = {
+        TaskSignature: TTLPolicy(
+            ttl=timedelta(hours=1),
+            status_ttls={SignatureStatus.SUSPENDED: timedelta(days=7)},
+        )
+    }
+    try:
+        yield
+    finally:
+        mageflow_config.ttl_policies = {}
+
+
+@pytest.mark.asyncio
+async def test_large_kwargs_are_stored_once_for_all_signatures_sanity(redis_client):
+    # Arrange
+    signatures = [
+        await mageflow.sign("payload_task", data=LARGE_VALUE, index=i) for i in range(3)
+    ]
+
+    # Act
+    loaded = [await TaskSignature.get_safe(sig.key) for sig in signatures]
+
+    # Assert
+    payload_keys = await stored_payload_keys(redis_client)
+    assert len(payload_keys) == 1
+    for i, signature in enumerate(loaded):
+        assert payload_ref(signature.kwargs["data"]) == payload_keys[0]
+        assert signature.kwargs["index"] == i
+
+
+@pytest.mark.asyncio
+async def test_trigger_params_resolve_offloaded_kwargs_sanity(redis_client):
+    # Arrange
+    signature = await mageflow.sign("payload_task", data=LARGE_VALUE, small="value")
+    loaded = await TaskSignature.get_safe(signature.key)
+
+    # Act
+    params = await loaded.trigger_params(use_return_field=False, extra=1)
+
+    # Assert
+    assert params.workflow_params == {"data": LARGE_VALUE, "small": "value", "extra": 1}
+
+
+@pytest.mark.asyncio
+async def test_large_model_kwarg_round_trips_sanity(redis_client):
+    # Arrange
+    large_model = LargeModel(items=LARGE_VALUE, created_at=datetime(2024, 1, 1))
+    signature = await mageflow.sign("payload_task", data=large_model)
+    loaded = await TaskSignature.get_safe(signature.key)
+
+    # Act
+    params = await loaded.trigger_params(use_return_field=False)
+
+    # Assert
+    assert payload_ref(loaded.kwargs["data"]) is not None
+    assert params.workflow_params["data"] == large_model
+
+
+@pytest.mark.asyncio
+async def test_worker_cache_serves_payload_after_first_fetch_sanity(redis_client):
+    # Arrange
+    signature = await mageflow.sign("payload_task", data=LARGE_VALUE)
+    await signature.trigger_params(use_return_field=False)
+    await redis_client.delete(*await stored_payload_keys(redis_client))
+
+    # Act
+    params = await signature.trigger_params(use_return_field=False)
+
+    # Assert
+    assert params.workflow_params["data"] == LARGE_VALUE
+
+
+@pytest.mark.asyncio
+async def test_payload_ttl_is_extended_to_longest_signature_ttl_sanity(redis_client):
+    # Arrange
+    await mageflow.sign("payload_task", data=LARGE_VALUE, ttl=timedelta(hours=2))
+
+    # Act
+    await mageflow.sign("payload_task", data=LARGE_VALUE, ttl=timedelta(minutes=5))
+
+    # Assert
+    payload_key = (await stored_payload_keys(redis_client))[0]
+    assert await redis_client.ttl(payload_key) > 60 * 60
+
+
+@pytest.mark.asyncio
+async def test_expired_payload_raises_edge_case(redis_client):
+    # Arrange
+    signature = await mageflow.sign("payload_task", data=LARGE_VALUE)
+    await redis_client.delete(*await stored_payload_keys(redis_client))
+
+    # Act & Assert
+    with pytest.raises(MissingPayloadError):
+        await signature.trigger_params(use_return_field=False)
+
+
+@pytest.mark.asyncio
+async def test_suspended_signature_keeps_payload_for_status_ttl_sanity(
+    redis_client, suspended_ttl_policy
+):
+    # Arrange
+    signature = await mageflow.sign("payload_task", data=LARGE_VALUE)
+
+    # Act
+    await signature.change_status(SignatureStatus.SUSPENDED)
+
+    # Assert
+    payload_key = (await stored_payload_keys(redis_client))[0]
+    signature_ttl = await redis_client.ttl(signature.key)
+    assert await redis_client.ttl(payload_key) >= signature_ttl > 60 * 60
+
+
+@pytest.mark.asyncio
+async def test_bulk_suspend_keeps_payload_for_status_ttl_sanity(
+    redis_client, suspended_ttl_policy
+):
+    # Arrange
+    signature = await mageflow.sign("payload_task", data=LARGE_VALUE)
+
+    # Act
+    await bulk_change_status([signature.key], SignatureStatus.SUSPENDED)
+
+    # Assert
+    payload_key = (await stored_payload_keys(redis_client))[0]
+    signature_ttl = await redis_client.ttl(signature.key)
+    assert await redis_client.ttl(payload_key) >= signature_ttl > 60 * 60
+
+
+@pytest.mark.asyncio
+async def test_swarm_item_merges_offloaded_value_with_swarm_dict_edge_case(
+    redis_client,
+):
+    # Arrange
+    large_config = {
+        f"key_{i}": "x" * 1024 for i in range(PAYLOAD_OFFLOAD_THRESHOLD // 1024 + 1)
+    }
+    task = await mageflow.sign(
+        "payload_task", model_validators=ContextMessage, config=large_config
+    )
+    swarm_signature = await mageflow.swarm(
+        task_name="payload_swarm",
+        kwargs={"config": {"swarm_key": "swarm_value"}},
+        model_validators=ContextMessage,
+    )
+    batch_item = await swarm_signature.add_task(task)
+
+    # Act
+    with patch.object(
+        TaskSignature, "aio_run_no_wait", new_callable=AsyncMock
+    ) as run_mock:
+        await batch_item.aio_run_no_wait(ContextMessage())
+
+    # Assert
+    task_kwargs = run_mock.await_args.kwargs["task_kwargs"]
+    assert task_kwargs["config"] == large_config | {"swarm_key": "swarm_value"}
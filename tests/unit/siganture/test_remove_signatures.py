@@ -0,0 +1,81 @@
+from unittest.mock import patch
+
+import pytest
+
+import mageflow
+from mageflow.signature.deletion import remove_signatures
+from mageflow.signature.garbage_collector import SIGNATURE_CREATION_INDEX_PREFIX
+from mageflow.signature.model import TaskSignature
+from mageflow.signature.status_index import STATUS_INDEX_PREFIX
+from mageflow.swarm.model import SwarmConfig
+
+
+async def stored_keys(redis_client) -> set[str]:
+    return {key.decode() async for key in redis_client.scan_iter("*Signature:*")}
+
+
+async def stored_shard_keys(redis_client) -> set[str]:
+    return {key.decode() async for key in redis_client.scan_iter("SwarmShard:*")}
+
+
+@pytest.mark.asyncio
+async def test_remove_sharded_swarm_removes_whole_tree_without_loading_sanity(
+    redis_client,
+):
+    # Arrange
+    tasks = [await mageflow.sign(f"removed_task_{i}") for i in range(5)]
+    swarm_signature = await mageflow.swarm(
+        tasks=tasks, task_name="removed_swarm", config=SwarmConfig(shard_size=2)
+    )
+    assert await stored_shard_keys(redis_client)
+
+    # Act
+    with patch("mageflow.signature.deletion.REMOVE_BATCH_SIZE", 3):
+        with patch("rapyer.aget") as aget_mock:
+            await swarm_signature.remove()
+
+    # Assert
+    aget_mock.assert_not_called()
+    assert await stored_keys(redis_client) == set()
+    assert await stored_shard_keys(redis_client) == set()
+    creation_index_keys = redis_client.scan_iter(f"{SIGNATURE_CREATION_INDEX_PREFIX}:*")
+    assert not [key async for key in creation_index_keys]
+    assert not [key async for key in redis_client.scan_iter(f"{STATUS_INDEX_PREFIX}:*")]
+
+
+@pytest.mark.asyncio
+async def test_remove_without_success_keeps_success_callbacks_sanity(redis_client):
+    # Arrange
+    success_callback = await mageflow.sign("kept_success_callback")
+    error_callback = await mageflow.sign("removed_error_callback")
+    nested_callback = await mageflow.sign("removed_nested_callback")
+    await error_callback.add_callbacks(success=[nested_callback], errors=[])
+    signature = await mageflow.sign(
+        "removed_task",
+        success_callbacks=[success_callback],
+        error_callbacks=[error_callback],
+    )
+
+    # Act
+    await signature.remove(with_success=False)
+
+    # Assert
+    assert await stored_keys(redis_client) == {success_callback.key}
+
+
+@pytest.mark.asyncio
+async def test_remove_signatures_counts_only_stored_keys_edge_case(redis_client):
+    # Arrange
+    tasks = [await mageflow.sign(f"chain_removed_task_{i}") for i in range(3)]
+    chain_signature = await mageflow.chain(tasks)
+    missing_key = TaskSignature(task_name="never_saved").key
+
+    # Act
+    removed_count = await remove_signatures(
+        [chain_signature.key, tasks[0].key, missing_key]
+    )
+
+    # Assert
+    # The chain, its tasks linked by callbacks, the error callbacks and the chain end callback
+    assert removed_count == 1 + 3 + 3 + 1
+    assert await stored_keys(redis_client) == set()
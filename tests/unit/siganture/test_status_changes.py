@@ -2,6 +2,11 @@ import pytest
 
 from mageflow.signature.model import TaskSignature
 from mageflow.signature.status import SignatureStatus
+from mageflow.signature.garbage_collector import (
+    SIGNATURE_CREATION_INDEX_PREFIX,
+    CALLBACK_PARENTS_PREFIX,
+)
+from mageflow.signature.status_index import STATUS_INDEX_PREFIX, TASK_NAMES_KEY_PREFIX
 from tests.unit.assertions import assert_tasks_changed_status
 
 
@@ -23,7 +28,14 @@ async def test__safe_change_status__signature_deleted_from_redis__raises_error__
     # Act & Assert
     await TaskSignature.safe_change_status(task_id, SignatureStatus.ACTIVE)
     keys = await redis_client.keys()
-    assert len(keys) == 0
+    index_keys = (
+        STATUS_INDEX_PREFIX,
+        TASK_NAMES_KEY_PREFIX,
+        SIGNATURE_CREATION_INDEX_PREFIX,
+        CALLBACK_PARENTS_PREFIX,
+    )
+    signature_keys = [key for key in keys if not key.decode().startswith(index_keys)]
+    assert len(signature_keys) == 0
 
 
 @pytest.mark.asyncio
@@ -0,0 +1,177 @@
+from datetime import timedelta
+
+import pytest
+from redis.crc import key_slot
+
+import mageflow
+from mageflow.errors import MissingSignatureError
+from mageflow.signature.bulk import bulk_change_status
+from mageflow.signature.garbage_collector import collect_garbage
+from mageflow.signature.hash_tag import key_shard_tag
+from mageflow.signature.model import TaskSignature
+from mageflow.signature.status import SignatureStatus
+from mageflow.signature.status_index import (
+    signatures_by_status,
+    status_index_key,
+    signature_index_keys,
+)
+
+
+@pytest.mark.asyncio
+async def test_created_signatures_are_indexed_as_pending_sanity():
+    # Arrange
+    tasks = [await mageflow.sign("indexed_task") for _ in range(3)]
+    other_task = await mageflow.sign("other_indexed_task")
+
+    # Act
+    task_keys, next_cursor = await signatures_by_status(
+        SignatureStatus.PENDING, task_name="indexed_task"
+    )
+
+    # Assert
+    assert set(task_keys) == {task.key for task in tasks}
+    assert other_task.key not in task_keys
+    assert next_cursor is None
+
+
+@pytest.mark.asyncio
+async def test_suspended_swarm_items_move_to_suspended_index_sanity():
+    # Arrange
+    tasks = [await mageflow.sign("suspended_indexed_task") for _ in range(3)]
+    swarm_signature = await mageflow.swarm(tasks=tasks)
+
+    # Act
+    await swarm_signature.suspend()
+
+    # Assert
+    suspended_keys, _ = await signatures_by_status(
+        SignatureStatus.SUSPENDED, task_name="suspended_indexed_task"
+    )
+    pending_keys, _ = await signatures_by_status(
+        SignatureStatus.PENDING, task_name="suspended_indexed_task"
+    )
+    assert set(suspended_keys) == {task.key for task in tasks}
+    assert pending_keys == []
+    all_suspended_keys, _ = await signatures_by_status(SignatureStatus.SUSPENDED)
+    assert swarm_signature.key in all_suspended_keys
+
+
+@pytest.mark.asyncio
+async def test_signatures_by_status_pages_with_cursor_sanity():
+    # Arrange
+    tasks = [await mageflow.sign("paged_task") for _ in range(5)]
+
+    # Act
+    first_page, cursor = await signatures_by_status(
+        SignatureStatus.PENDING, task_name="paged_task", count=3
+    )
+    second_page, last_cursor = await signatures_by_status(
+        SignatureStatus.PENDING, task_name="paged_task", cursor=cursor, count=3
+    )
+
+    # Assert
+    assert len(first_page) == 3
+    assert cursor is not None
+    assert len(second_page) == 2
+    assert last_cursor is None
+    assert set(first_page + second_page) == {task.key for task in tasks}
+
+
+@pytest.mark.asyncio
+async def test_expired_signatures_are_dropped_from_index_edge_case(redis_client):
+    # Arrange
+    tasks = [await mageflow.sign("expired_indexed_task") for _ in range(3)]
+    await redis_client.delete(tasks[0].key)
+    shard_tag = key_shard_tag(tasks[0].key)
+    index_key = status_index_key(
+        shard_tag, SignatureStatus.PENDING, "expired_indexed_task"
+    )
+
+    # Act
+    task_keys, _ = await signatures_by_status(
+        SignatureStatus.PENDING, task_name="expired_indexed_task"
+    )
+
+    # Assert
+    assert set(task_keys) == {task.key for task in tasks[1:]}
+    assert await redis_client.zscore(index_key, tasks[0].key) is None
+    assert (
+        await redis_client.zscore(
+            status_index_key(shard_tag, SignatureStatus.PENDING), tasks[0].key
+        )
+        is None
+    )
+
+
+@pytest.mark.asyncio
+async def test_removed_signature_is_unindexed_sanity(redis_client):
+    # Arrange
+    signature = await mageflow.sign("removed_indexed_task")
+    await signature.change_status(SignatureStatus.ACTIVE)
+
+    # Act
+    await signature.remove()
+
+    # Assert
+    for index_key in signature_index_keys(signature.key, "removed_indexed_task"):
+        assert await redis_client.zscore(index_key, signature.key) is None
+    reloaded_signature = await TaskSignature.get_safe(signature.key)
+    assert reloaded_signature is None
+
+
+@pytest.mark.asyncio
+async def test_status_indexes_share_signature_slot_sanity(redis_client):
+    # Arrange
+    signature = await mageflow.sign("slot_indexed_task")
+
+    # Act
+    await bulk_change_status([signature.key], SignatureStatus.SUSPENDED)
+
+    # Assert
+    shard_tag = key_shard_tag(signature.key)
+    suspended_index_key = status_index_key(
+        shard_tag, SignatureStatus.SUSPENDED, "slot_indexed_task"
+    )
+    assert await redis_client.zscore(suspended_index_key, signature.key) is not None
+    index_slots = {
+        key_slot(index_key.encode())
+        for index_key in signature_index_keys(signature.key, "slot_indexed_task")
+    }
+    assert index_slots == {key_slot(signature.key.encode())}
+
+
+@pytest.mark.asyncio
+async def test_failed_status_change_keeps_index_edge_case(redis_client):
+    # Arrange
+    signature = await mageflow.sign("conflicted_indexed_task")
+    await redis_client.delete(signature.key)
+
+    # Act
+    with pytest.raises(MissingSignatureError):
+        await signature.change_status(SignatureStatus.ACTIVE)
+
+    # Assert
+    active_keys, _ = await signatures_by_status(
+        SignatureStatus.ACTIVE, task_name="conflicted_indexed_task"
+    )
+    assert active_keys == []
+    shard_tag = key_shard_tag(signature.key)
+    active_index_key = status_index_key(shard_tag, SignatureStatus.ACTIVE)
+    assert await redis_client.zscore(active_index_key, signature.key) is None
+
+
+@pytest.mark.asyncio
+async def test_garbage_collector_drops_task_name_entries_of_expired_signatures_sanity(
+    redis_client,
+):
+    # Arrange
+    signature = await mageflow.sign("gc_indexed_task")
+    await signature.change_status(SignatureStatus.ACTIVE)
+    await redis_client.delete(signature.key)
+
+    # Act
+    await collect_garbage(grace_period=timedelta(0))
+
+    # Assert
+    for index_key in signature_index_keys(signature.key, "gc_indexed_task"):
+        assert await redis_client.zscore(index_key, signature.key) is None
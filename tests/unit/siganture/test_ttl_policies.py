@@ -0,0 +1,96 @@
+from datetime import timedelta
+
+import pytest
+
+import mageflow
+from mageflow.signature.model import TaskSignature
+from mageflow.signature.status import SignatureStatus
+from mageflow.signature.ttl import TTLPolicy
+from mageflow.startup import mageflow_config
+from mageflow.swarm.model import SwarmTaskSignature
+
+HOUR = 60 * 60
+WEEK = 7 * 24 * HOUR
+
+
+@pytest.fixture
+def ttl_policies():
+    mageflow_config.ttl_policies = {
+        TaskSignature: TTLPolicy(
+            ttl=timedelta(hours=1),
+            status_ttls={SignatureStatus.SUSPENDED: timedelta(days=7)},
+        ),
+        SwarmTaskSignature: TTLPolicy(ttl=timedelta(days=7)),
+    }
+    try:
+        yield mageflow_config.ttl_policies
+    finally:
+        mageflow_config.ttl_policies = {}
+
+
+@pytest.mark.asyncio
+async def test_call_site_ttl_is_kept_on_updates_sanity(redis_client):
+    # Arrange
+    signature = await mageflow.sign("ttl_task", ttl=timedelta(minutes=5))
+
+    # Act
+    await signature.kwargs.aupdate(param="value")
+    await TaskSignature.get_safe(signature.key)
+
+    # Assert
+    assert 0 < await redis_client.ttl(signature.key) <= 5 * 60
+
+
+@pytest.mark.asyncio
+async def test_type_policy_ttl_follows_status_sanity(redis_client, ttl_policies):
+    # Arrange
+    signature = await mageflow.sign("ttl_task")
+    swarm_signature = await mageflow.swarm(task_name="ttl_swarm")
+    assert 0 < await redis_client.ttl(signature.key) <= HOUR
+    assert HOUR < await redis_client.ttl(swarm_signature.key) <= WEEK
+
+    # Act
+    await signature.change_status(SignatureStatus.SUSPENDED)
+
+    # Assert
+    assert HOUR < await redis_client.ttl(signature.key) <= WEEK
+
+
+@pytest.mark.asyncio
+async def test_bulk_status_change_refreshes_policy_ttl_sanity(
+    redis_client, ttl_policies
+):
+    # Arrange
+    tasks = [await mageflow.sign(f"ttl_chain_task_{i}") for i in range(3)]
+    chain_signature = await mageflow.chain(tasks)
+
+    # Act
+    await chain_signature.suspend()
+
+    # Assert
+    for task in tasks:
+        assert HOUR < await redis_client.ttl(task.key) <= WEEK
+
+
+@pytest.mark.asyncio
+async def test_swarm_call_site_ttl_applies_to_its_items_sanity(redis_client):
+    # Arrange
+    task = await mageflow.sign("ttl_swarm_task")
+
+    # Act
+    swarm_signature = await mageflow.swarm(
+        tasks=[task], task_name="ttl_swarm", ttl=timedelta(days=3)
+    )
+
+    # Assert
+    item = await TaskSignature.get_safe(swarm_signature.tasks[0])
+    original_task = await TaskSignature.get_safe(task.key)
+    signatures = [swarm_signature, item, original_task]
+    signatures += [
+        await TaskSignature.get_safe(callback_key)
+        for callback_key in original_task.success_callbacks
+        + original_task.error_callbacks
+    ]
+    for signature in signatures:
+        assert signature.ttl == 3 * 24 * HOUR
+        assert 24 * HOUR < await redis_client.ttl(signature.key) <= 3 * 24 * HOUR
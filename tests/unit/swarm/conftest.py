@@ -7,7 +7,7 @@ import pytest_asyncio
 import mageflow
 from mageflow.chain.model import ChainTaskSignature
 from mageflow.signature.model import TaskSignature
-from mageflow.swarm.model import SwarmTaskSignature
+from mageflow.swarm.model import SwarmTaskSignature, SwarmConfig
 from tests.integration.hatchet.worker import ContextMessage
 
 
@@ -52,6 +52,24 @@ async def swarm_with_tasks():
     )
 
 
+@pytest.fixture
+def create_swarm():
+    async def create(num_items: int, **config) -> tuple[SwarmTaskSignature, list]:
+        swarm_signature = await mageflow.swarm(
+            task_name="test_swarm",
+            model_validators=ContextMessage,
+            config=SwarmConfig(**config),
+        )
+        items = []
+        for i in range(num_items):
+            task = TaskSignature(task_name=f"swarm_item_{i}")
+            await task.save()
+            items.append(await swarm_signature.add_task(task))
+        return swarm_signature, items
+
+    return create
+
+
 @pytest.fixture
 def mock_close_swarm():
     with patch.object(
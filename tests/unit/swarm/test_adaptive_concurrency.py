@@ -0,0 +1,104 @@
+from datetime import timedelta, datetime
+
+import pytest
+
+import mageflow
+from mageflow.swarm.concurrency import SwarmConcurrency, ItemOutcome
+from mageflow.swarm.model import SwarmTaskSignature, SwarmConfig
+
+AIMD_BOUNDS = dict(
+    min_concurrency=2,
+    max_concurrency=10,
+    target_latency=timedelta(seconds=5),
+    max_failure_rate=0.5,
+    decrease_factor=0.5,
+)
+
+
+def test_concurrency_grows_in_slow_start_until_max_sanity():
+    # Arrange
+    concurrency = SwarmConcurrency()
+
+    # Act
+    limits = []
+    for _ in range(12):
+        concurrency.apply_outcome(ItemOutcome(True, latency=1), **AIMD_BOUNDS)
+        limits.append(concurrency.effective_limit(AIMD_BOUNDS["min_concurrency"]))
+
+    # Assert
+    assert limits[:3] == [3, 4, 5]
+    assert limits[-1] == AIMD_BOUNDS["max_concurrency"]
+    assert concurrency.slow_start
+
+
+def test_slow_items_decrease_limit_once_per_window_sanity():
+    # Arrange
+    concurrency = SwarmConcurrency(limit=8, completions_since_decrease=8)
+    slow_outcome = ItemOutcome(True, latency=10)
+
+    # Act
+    concurrency.apply_outcome(slow_outcome, **AIMD_BOUNDS)
+    limit_after_first = concurrency.limit
+    for _ in range(3):
+        concurrency.apply_outcome(slow_outcome, **AIMD_BOUNDS)
+    limit_in_window = concurrency.limit
+    concurrency.apply_outcome(ItemOutcome(True, latency=1), **AIMD_BOUNDS)
+
+    # Assert
+    assert limit_after_first == limit_in_window == 4
+    assert not concurrency.slow_start
+    # After slow start is over, the limit grows by one per window
+    assert concurrency.limit == pytest.approx(4.25)
+
+
+def test_limit_is_never_below_min_concurrency_edge_case():
+    # Arrange
+    concurrency = SwarmConcurrency(limit=2, completions_since_decrease=2)
+
+    # Act
+    for _ in range(10):
+        concurrency.apply_outcome(ItemOutcome(False), **AIMD_BOUNDS)
+
+    # Assert
+    assert concurrency.failure_rate > AIMD_BOUNDS["max_failure_rate"]
+    assert concurrency.limit == AIMD_BOUNDS["min_concurrency"]
+
+
+@pytest.mark.asyncio
+async def test_record_items_outcome_persists_limit_and_history_sanity(create_swarm):
+    # Arrange
+    swarm_signature, items = await create_swarm(
+        3,
+        adaptive_concurrency=True,
+        min_concurrency=2,
+        max_concurrency=4,
+        target_latency=timedelta(seconds=5),
+    )
+    for item in items:
+        await item.aupdate(run_started_at=datetime.now() - timedelta(seconds=1))
+    initial_limit = swarm_signature.concurrency_limit
+
+    # Act
+    await swarm_signature.record_items_outcome([(item.key, True) for item in items])
+
+    # Assert
+    reloaded_swarm = await SwarmTaskSignature.get_safe(swarm_signature.key)
+    assert initial_limit == 2
+    assert reloaded_swarm.concurrency_limit == swarm_signature.concurrency_limit == 4
+    assert [sample.limit for sample in reloaded_swarm.concurrency.history] == [4]
+
+
+@pytest.mark.asyncio
+async def test_record_items_outcome_ignored_without_adaptive_concurrency_edge_case():
+    # Arrange
+    swarm_signature = await mageflow.swarm(
+        task_name="static_swarm", config=SwarmConfig(max_concurrency=7)
+    )
+
+    # Act
+    await swarm_signature.record_items_outcome([("missing_item", False)])
+
+    # Assert
+    reloaded_swarm = await SwarmTaskSignature.get_safe(swarm_signature.key)
+    assert reloaded_swarm.concurrency_limit == 7
+    assert reloaded_swarm.concurrency.history == []
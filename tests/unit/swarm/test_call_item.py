@@ -1,5 +1,6 @@
 import pytest
 import pytest_asyncio
+from hatchet_sdk.runnables.workflow import Workflow
 from unittest.mock import AsyncMock, patch
 
 import mageflow
@@ -42,6 +43,14 @@ async def run_batch_item_with_mock(batch_item, message):
         await batch_item.aio_run_no_wait(message)
 
 
+async def run_batch_item_with_workflow_mock(batch_item, message) -> dict:
+    """Run batch item and return the input sent to hatchet"""
+    with patch.object(Workflow, "aio_run_no_wait", autospec=True) as run_mock:
+        await batch_item.aio_run_no_wait(message)
+    workflow, workflow_input, _ = run_mock.await_args.args
+    return workflow._serialize_input(workflow_input)
+
+
 def assert_kwargs_merged(actual_kwargs, expected_parts, message):
     """Assert that kwargs are properly merged from expected parts and message"""
     message_data = message.model_dump(mode="json")
@@ -53,7 +62,7 @@ def assert_kwargs_merged(actual_kwargs, expected_parts, message):
 
 
 @pytest.mark.asyncio
-async def test_simple_task_kwargs_saved_sanity(test_message, test_swarm):
+async def test_queued_simple_task_saves_only_message_sanity(test_message, test_swarm):
     # Arrange
     # Create original task
     task_kwargs = {"task_param": "task_value"}
@@ -70,17 +79,40 @@ async def test_simple_task_kwargs_saved_sanity(test_message, test_swarm):
     # Act
     await run_batch_item_with_mock(batch_item, test_message)
 
-    # Assert
+    # Assert - the swarm kwargs are not copied into the task
     reloaded_original_task = await TaskSignature.get_safe(original_task.key)
+    assert_kwargs_merged(reloaded_original_task.kwargs, [task_kwargs], test_message)
+
+
+@pytest.mark.asyncio
+async def test_simple_task_runs_with_swarm_kwargs_without_saving_sanity(
+    test_message, test_swarm
+):
+    # Arrange
+    task_kwargs = {"task_param": "task_value"}
+    original_task = TaskSignature(
+        task_name="simple_task",
+        kwargs=task_kwargs,
+        model_validators=ContextMessage,
+    )
+    await original_task.save()
+
+    swarm_signature, swarm_kwargs = test_swarm
+    batch_item = await swarm_signature.add_task(original_task)
+
+    # Act
+    workflow_input = await run_batch_item_with_workflow_mock(batch_item, test_message)
+
+    # Assert
     assert_kwargs_merged(
-        reloaded_original_task.kwargs,
-        [task_kwargs, batch_item.kwargs, swarm_kwargs],
-        test_message,
+        workflow_input, [task_kwargs, batch_item.kwargs, swarm_kwargs], test_message
     )
+    reloaded_original_task = await TaskSignature.get_safe(original_task.key)
+    assert reloaded_original_task.kwargs == task_kwargs
 
 
 @pytest.mark.asyncio
-async def test_swarm_item_kwargs_saved_in_swarm_object_sanity(test_message):
+async def test_running_swarm_item_kwargs_saved_in_swarm_object_sanity(test_message):
     # Arrange
     inner_swarm_kwargs = {"inner_swarm_param": "inner_swarm_value"}
     inner_swarm = await create_swarm_with_kwargs("inner_swarm", inner_swarm_kwargs)
@@ -91,9 +123,9 @@ async def test_swarm_item_kwargs_saved_in_swarm_object_sanity(test_message):
     batch_item = await outer_swarm.add_task(inner_swarm)
 
     # Act
-    await run_batch_item_with_mock(batch_item, test_message)
+    await run_batch_item_with_workflow_mock(batch_item, test_message)
 
-    # Assert - kwargs should be saved in the swarm object
+    # Assert - kwargs should be saved in the swarm object, its items are run from them
     reloaded_inner_swarm = await SwarmTaskSignature.get_safe(inner_swarm.key)
     assert_kwargs_merged(
         reloaded_inner_swarm.kwargs,
@@ -103,7 +135,7 @@ async def test_swarm_item_kwargs_saved_in_swarm_object_sanity(test_message):
 
 
 @pytest.mark.asyncio
-async def test_nested_chain_kwargs_saved_in_first_task_of_first_chain_sanity(
+async def test_nested_chain_runs_first_task_of_first_chain_with_kwargs_sanity(
     test_message, test_swarm
 ):
     # Arrange
@@ -154,17 +186,19 @@ async def test_nested_chain_kwargs_saved_in_first_task_of_first_chain_sanity(
     batch_item = await swarm_signature.add_task(nested_chain)
 
     # Act
-    await run_batch_item_with_mock(batch_item, test_message)
+    workflow_input = await run_batch_item_with_workflow_mock(batch_item, test_message)
 
-    # Assert - kwargs should be saved in the first task of the first chain
-    reloaded_first_chain_task1 = await TaskSignature.get_safe(first_chain_task1.key)
+    # Assert - the first task of the first chain is run with the merged kwargs
     assert_kwargs_merged(
-        reloaded_first_chain_task1.kwargs,
+        workflow_input,
         [first_chain_task1_kwargs, batch_item.kwargs, swarm_kwargs],
         test_message,
     )
 
-    # Verify other tasks don't get the message kwargs
+    # Verify no task kwargs were saved
+    reloaded_first_chain_task1 = await TaskSignature.get_safe(first_chain_task1.key)
+    assert reloaded_first_chain_task1.kwargs == first_chain_task1_kwargs
+
     reloaded_first_chain_task2 = await TaskSignature.get_safe(first_chain_task2.key)
     assert reloaded_first_chain_task2.kwargs == first_chain_task2_kwargs
 
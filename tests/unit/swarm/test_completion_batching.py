@@ -0,0 +1,149 @@
+import asyncio
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from mageflow.signature.model import TaskSignature
+from mageflow.swarm.batching import SwarmCompletionBatcher, SwarmItemCompletion
+from mageflow.swarm.model import SwarmTaskSignature, BatchItemTaskSignature
+from mageflow.swarm.workflows import apply_swarm_items_completions
+
+
+@pytest.mark.asyncio
+async def test_batcher_applies_concurrent_completions_together_sanity():
+    # Arrange
+    apply_mock = AsyncMock()
+    batcher = SwarmCompletionBatcher(apply_mock)
+    window = timedelta(milliseconds=20)
+    first_swarm = [SwarmItemCompletion(f"item_{i}", True, i) for i in range(3)]
+    second_swarm = [SwarmItemCompletion("other_item", False)]
+
+    # Act
+    await asyncio.gather(
+        *[batcher.submit("swarm_1", completion, window) for completion in first_swarm],
+        batcher.submit("swarm_2", second_swarm[0], window),
+    )
+
+    # Assert
+    assert apply_mock.await_count == 2
+    applied = {call.args[0]: call.args[1] for call in apply_mock.await_args_list}
+    assert applied == {"swarm_1": first_swarm, "swarm_2": second_swarm}
+    assert batcher.pending == {}
+
+
+@pytest.mark.asyncio
+async def test_batcher_failed_update_fails_all_reporters_edge_case():
+    # Arrange
+    batcher = SwarmCompletionBatcher(AsyncMock(side_effect=RuntimeError("redis")))
+    window = timedelta(milliseconds=5)
+
+    # Act
+    results = await asyncio.gather(
+        *[
+            batcher.submit("swarm", SwarmItemCompletion(f"item_{i}", True), window)
+            for i in range(2)
+        ],
+        return_exceptions=True,
+    )
+
+    # Assert
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(["shard_size"], [[None], [2]])
+async def test_apply_completions_updates_swarm_once_sanity(shard_size, create_swarm):
+    # Arrange
+    swarm_signature, items = await create_swarm(3, shard_size=shard_size)
+    await swarm_signature.current_running_tasks.increase(len(items))
+    completions = [
+        SwarmItemCompletion(items[0].key, True, "result_0", items[0].shard_id),
+        SwarmItemCompletion(items[1].key, True, "result_1", items[1].shard_id),
+        SwarmItemCompletion(items[2].key, False, None, items[2].shard_id),
+    ]
+    completions[0].ctx = MagicMock()
+
+    # Act
+    with patch.object(
+        SwarmTaskSignature, "fill_running_tasks", new_callable=AsyncMock
+    ) as fill_mock:
+        fill_mock.return_value = 0
+        await apply_swarm_items_completions(swarm_signature.key, completions)
+
+    # Assert
+    fill_mock.assert_awaited_once()
+    reloaded_swarm = await SwarmTaskSignature.get_safe(swarm_signature.key)
+    assert reloaded_swarm.current_running_tasks == 0
+    if shard_size:
+        shards = await reloaded_swarm.load_shards()
+        finished = [key for shard in shards for key in shard.finished_tasks]
+        failed = [key for shard in shards for key in shard.failed_tasks]
+        results = [res for shard in shards for res in shard.tasks_results]
+    else:
+        finished = reloaded_swarm.finished_tasks
+        failed = reloaded_swarm.failed_tasks
+        results = reloaded_swarm.tasks_results
+    assert sorted(finished) == sorted([items[0].key, items[1].key])
+    assert failed == [items[2].key]
+    assert sorted(results) == ["result_0", "result_1"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(["shard_size"], [[None], [2]])
+async def test_finished_items_not_kept_are_removed_and_counted_sanity(
+    shard_size, create_swarm
+):
+    # Arrange
+    swarm_signature, items = await create_swarm(
+        3, shard_size=shard_size, keep_finished_items=False
+    )
+    await swarm_signature.current_running_tasks.increase(len(items))
+    completions = [
+        SwarmItemCompletion(items[0].key, True, "result_0", items[0].shard_id),
+        SwarmItemCompletion(items[1].key, False, None, items[1].shard_id),
+    ]
+    completions[0].ctx = MagicMock()
+
+    # Act
+    with patch.object(
+        SwarmTaskSignature, "fill_running_tasks", new_callable=AsyncMock
+    ) as fill_mock:
+        fill_mock.return_value = 0
+        await apply_swarm_items_completions(swarm_signature.key, completions)
+
+    # Assert
+    reloaded_swarm = await SwarmTaskSignature.get_safe(swarm_signature.key)
+    assert reloaded_swarm.finished_count == reloaded_swarm.failed_count == 1
+    assert reloaded_swarm.total_tasks == 3
+    assert reloaded_swarm.pending_items_count == 1
+    assert await reloaded_swarm.item_keys() == [items[2].key]
+    assert reloaded_swarm.finished_tasks == reloaded_swarm.failed_tasks == []
+    assert reloaded_swarm.tasks_results == []
+    for item in items[:2]:
+        assert await BatchItemTaskSignature.get_safe(item.key) is None
+        assert await TaskSignature.get_safe(item.original_task_id) is None
+    assert await BatchItemTaskSignature.get_safe(items[2].key) is not None
+
+
+@pytest.mark.asyncio
+async def test_swarm_not_keeping_items_finishes_without_results_sanity(create_swarm):
+    # Arrange
+    swarm_signature, items = await create_swarm(2, keep_finished_items=False)
+    await swarm_signature.current_running_tasks.increase(len(items))
+    await swarm_signature.aupdate(is_swarm_closed=True)
+    completions = [
+        SwarmItemCompletion(item.key, True, f"result_{i}", None, MagicMock())
+        for i, item in enumerate(items)
+    ]
+
+    # Act
+    with patch.object(
+        TaskSignature, "activate_success", new_callable=AsyncMock
+    ) as success_mock:
+        await apply_swarm_items_completions(swarm_signature.key, completions)
+
+    # Assert
+    success_mock.assert_awaited_once()
+    assert success_mock.call_args.args[0] == []
+    assert await SwarmTaskSignature.get_safe(swarm_signature.key) is None
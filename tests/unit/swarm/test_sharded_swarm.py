@@ -0,0 +1,163 @@
+from datetime import timedelta
+from unittest.mock import patch, AsyncMock
+
+import pytest
+import pytest_asyncio
+
+import mageflow
+from mageflow.errors import MissingSwarmShardError
+from mageflow.signature.model import TaskSignature
+from mageflow.swarm.model import (
+    SwarmTaskSignature,
+    SwarmConfig,
+    SwarmShard,
+    BatchItemTaskSignature,
+)
+from tests.integration.hatchet.models import ContextMessage
+
+
+@pytest_asyncio.fixture
+async def sharded_swarm():
+    swarm_signature = await mageflow.swarm(
+        task_name="sharded_swarm",
+        model_validators=ContextMessage,
+        config=SwarmConfig(shard_size=2, max_concurrency=2),
+    )
+    original_tasks = [
+        TaskSignature(task_name=f"sharded_task_{i}", model_validators=ContextMessage)
+        for i in range(5)
+    ]
+    for task in original_tasks:
+        await task.save()
+    batch_items = [await swarm_signature.add_task(task) for task in original_tasks]
+    return swarm_signature, batch_items
+
+
+@pytest.mark.asyncio
+async def test_add_task_splits_items_to_bounded_shards_sanity(sharded_swarm):
+    # Arrange
+    swarm_signature, batch_items = sharded_swarm
+
+    # Act
+    reloaded_swarm = await SwarmTaskSignature.get_safe(swarm_signature.key)
+    shards = await reloaded_swarm.load_shards()
+
+    # Assert
+    assert reloaded_swarm.tasks == []
+    assert reloaded_swarm.tasks_count == reloaded_swarm.total_tasks == 5
+    assert [len(shard.tasks) for shard in shards] == [2, 2, 1]
+    assert await reloaded_swarm.item_keys() == [item.key for item in batch_items]
+    assert all(item.shard_id in {shard.key for shard in shards} for item in batch_items)
+
+
+@pytest.mark.asyncio
+async def test_sharded_running_tasks_are_queued_in_item_shard_sanity(sharded_swarm):
+    # Arrange
+    swarm_signature, batch_items = sharded_swarm
+    swarm_signature = await SwarmTaskSignature.get_safe(swarm_signature.key)
+
+    # Act
+    can_run = [await swarm_signature.add_to_running_tasks(item) for item in batch_items]
+
+    # Assert
+    assert can_run == [True, True, False, False, False]
+    assert await swarm_signature.current_running_tasks.aload() == 2
+    for item in batch_items[2:]:
+        shard = await SwarmShard.from_key(item.shard_id, swarm_signature.key).aload()
+        assert item.key in shard.tasks_left_to_run
+
+
+@pytest.mark.asyncio
+async def test_fill_running_tasks_pops_items_from_shards_sanity(sharded_swarm):
+    # Arrange
+    swarm_signature, batch_items = sharded_swarm
+    swarm_signature = await SwarmTaskSignature.get_safe(swarm_signature.key)
+    await swarm_signature.queue_shards_tasks()
+    called_items = []
+
+    async def track_calls(self, *args, **kwargs):
+        called_items.append(self.key)
+
+    # Act
+    with patch.object(BatchItemTaskSignature, "aio_run_no_wait", new=track_calls):
+        started = await swarm_signature.fill_running_tasks()
+
+    # Assert
+    assert started == 2
+    assert len(set(called_items)) == 2
+    shards = await swarm_signature.load_shards()
+    queued_items = [key for shard in shards for key in shard.tasks_left_to_run]
+    assert sorted(queued_items + called_items) == sorted(
+        item.key for item in batch_items
+    )
+
+
+@pytest.mark.asyncio
+async def test_sharded_swarm_finishes_once_with_all_shard_results_sanity(
+    sharded_swarm,
+):
+    # Arrange
+    swarm_signature, batch_items = sharded_swarm
+    swarm_signature = await SwarmTaskSignature.get_safe(swarm_signature.key)
+    await swarm_signature.aupdate(is_swarm_closed=True)
+    for i, item in enumerate(batch_items[:-1]):
+        await swarm_signature.add_to_shard_finished_tasks(item.shard_id, item.key, i)
+    last_item = batch_items[-1]
+
+    # Act
+    done_before_last = await swarm_signature.is_swarm_done()
+    await swarm_signature.add_to_shard_failed_tasks(last_item.shard_id, last_item.key)
+    with patch.object(
+        TaskSignature, "activate_success", new_callable=AsyncMock
+    ) as success_mock:
+        first_finish = await swarm_signature.activate_success_once(None)
+        second_finish = await swarm_signature.activate_success_once(None)
+
+    # Assert
+    assert not done_before_last
+    assert first_finish and not second_finish
+    success_mock.assert_awaited_once()
+    assert success_mock.call_args.args[0] == [0, 1, 2, 3]
+    assert await SwarmTaskSignature.get_safe(swarm_signature.key) is None
+    for shard in swarm_signature.shards():
+        assert not await shard.Meta.redis.exists(shard.key)
+
+
+@pytest.mark.asyncio
+async def test_shards_are_kept_as_long_as_swarm_sanity(redis_client):
+    # Arrange
+    swarm_signature = await mageflow.swarm(
+        task_name="long_sharded_swarm",
+        model_validators=ContextMessage,
+        config=SwarmConfig(shard_size=2),
+        ttl=timedelta(days=3),
+    )
+    tasks = [
+        await mageflow.sign(f"sharded_task_{i}", model_validators=ContextMessage)
+        for i in range(3)
+    ]
+    for task in tasks:
+        await swarm_signature.add_task(task)
+    first_shard = swarm_signature.shards()[0]
+    await redis_client.expire(first_shard.key, 60)
+    # The refresh period passed
+    await redis_client.delete(swarm_signature.shards_ttl_key)
+
+    # Act
+    await swarm_signature.current_running_tasks.increase()
+
+    # Assert
+    for shard in swarm_signature.shards():
+        assert await redis_client.ttl(shard.key) >= 3 * 24 * 60 * 60
+
+
+@pytest.mark.asyncio
+async def test_missing_shard_raises_edge_case(sharded_swarm, redis_client):
+    # Arrange
+    swarm_signature, batch_items = sharded_swarm
+    swarm_signature = await SwarmTaskSignature.get_safe(swarm_signature.key)
+    await redis_client.delete(swarm_signature.shards()[0].key)
+
+    # Act & Assert
+    with pytest.raises(MissingSwarmShardError):
+        await swarm_signature.load_shards()
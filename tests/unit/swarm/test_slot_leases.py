@@ -0,0 +1,220 @@
+import asyncio
+from datetime import timedelta
+from unittest.mock import patch, AsyncMock, MagicMock
+
+import pytest
+from hatchet_sdk.runnables.types import EmptyModel
+
+from mageflow.signature.model import TaskSignature
+from mageflow.swarm.batching import SwarmItemCompletion
+from mageflow.swarm.consts import (
+    SWARM_ITEM_LEASES_KEY,
+    SWARM_ITEM_TASK_ID_PARAM_NAME,
+    SWARM_ITEM_LEASE_TTL_PARAM_NAME,
+)
+from mageflow.swarm.model import SwarmTaskSignature, BatchItemTaskSignature
+from mageflow.swarm.workflows import swarm_slots_reaper, apply_swarm_items_completions
+from tests.integration.hatchet.models import ContextMessage
+
+LEASE_TTL = timedelta(minutes=1)
+
+
+async def expire_lease(redis_client, item_key: str):
+    await redis_client.zadd(SWARM_ITEM_LEASES_KEY, {item_key: 0})
+
+
+@pytest.mark.asyncio
+async def test_started_item_holds_lease_renewed_by_worker_sanity(
+    redis_client, create_swarm
+):
+    # Arrange
+    swarm_signature, items = await create_swarm(1, item_lease_ttl=LEASE_TTL)
+
+    # Act
+    with patch.object(
+        TaskSignature, "aio_run_no_wait", new_callable=AsyncMock
+    ) as run_mock:
+        await items[0].aio_run_no_wait(ContextMessage())
+
+    # Assert
+    assert await redis_client.zscore(SWARM_ITEM_LEASES_KEY, items[0].key)
+    original_task = await TaskSignature.get_safe(items[0].original_task_id)
+    assert original_task.task_identifiers[SWARM_ITEM_TASK_ID_PARAM_NAME] == items[0].key
+    assert original_task.task_identifiers[SWARM_ITEM_LEASE_TTL_PARAM_NAME] == 60
+    run_mock.assert_awaited_once()
+    assert await BatchItemTaskSignature.renew_slot_lease(
+        items[0].key, timedelta(minutes=1)
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(["shard_size"], [[None], [2]])
+async def test_reaper_starts_expired_item_again_sanity(
+    redis_client, shard_size, create_swarm
+):
+    # Arrange
+    swarm_signature, items = await create_swarm(
+        1, item_lease_ttl=LEASE_TTL, shard_size=shard_size
+    )
+    await swarm_signature.current_running_tasks.increase()
+    await items[0].lease_slot(timedelta(minutes=1))
+    await expire_lease(redis_client, items[0].key)
+
+    # Act
+    with patch.object(
+        BatchItemTaskSignature, "aio_run_no_wait", new_callable=AsyncMock
+    ) as run_mock:
+        await swarm_slots_reaper(EmptyModel(), MagicMock())
+
+    # Assert
+    run_mock.assert_awaited_once()
+    reloaded_item = await BatchItemTaskSignature.get_safe(items[0].key)
+    assert reloaded_item.lease_reclaims == 1
+    reloaded_swarm = await SwarmTaskSignature.get_safe(swarm_signature.key)
+    assert reloaded_swarm.current_running_tasks == 0
+    assert await redis_client.zcard(SWARM_ITEM_LEASES_KEY) == 0
+
+
+@pytest.mark.asyncio
+async def test_reaper_fails_item_after_max_reclaims_edge_case(
+    redis_client, create_swarm
+):
+    # Arrange
+    swarm_signature, items = await create_swarm(
+        2, item_lease_ttl=LEASE_TTL, max_item_reclaims=1
+    )
+    await swarm_signature.current_running_tasks.increase()
+    await items[0].aupdate(lease_reclaims=1)
+    await items[0].lease_slot(timedelta(minutes=1))
+    await expire_lease(redis_client, items[0].key)
+
+    # Act
+    with patch.object(
+        SwarmTaskSignature, "fill_running_tasks", new_callable=AsyncMock
+    ) as fill_mock:
+        fill_mock.return_value = 0
+        await swarm_slots_reaper(EmptyModel(), MagicMock())
+
+    # Assert
+    reloaded_swarm = await SwarmTaskSignature.get_safe(swarm_signature.key)
+    assert reloaded_swarm.failed_tasks == [items[0].key]
+    assert reloaded_swarm.current_running_tasks == 0
+
+
+@pytest.mark.asyncio
+async def test_completion_of_reclaimed_item_is_ignored_edge_case(create_swarm):
+    # Arrange
+    swarm_signature, items = await create_swarm(1, item_lease_ttl=LEASE_TTL)
+    await items[0].lease_slot(timedelta(minutes=1))
+    await BatchItemTaskSignature.release_slot_lease(items[0].key)
+
+    # Act
+    owned_by_worker = await swarm_signature.claim_item_lease(items[0].key)
+
+    # Assert
+    assert not owned_by_worker
+    assert not await BatchItemTaskSignature.renew_slot_lease(
+        items[0].key, timedelta(minutes=1)
+    )
+
+
+@pytest.mark.asyncio
+async def test_reaper_leaves_completing_item_slot_edge_case(redis_client, create_swarm):
+    # Arrange
+    swarm_signature, items = await create_swarm(1, item_lease_ttl=LEASE_TTL)
+    await items[0].lease_slot(timedelta(minutes=1))
+    await swarm_signature.claim_item_lease(items[0].key)
+
+    # Act
+    with patch.object(
+        BatchItemTaskSignature, "aio_run_no_wait", new_callable=AsyncMock
+    ) as run_mock:
+        await swarm_slots_reaper(EmptyModel(), MagicMock())
+    renewed = await BatchItemTaskSignature.renew_slot_lease(
+        items[0].key, timedelta(minutes=1)
+    )
+
+    # Assert
+    run_mock.assert_not_awaited()
+    assert not renewed
+    assert await redis_client.zscore(SWARM_ITEM_LEASES_KEY, items[0].key) == float(
+        "inf"
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(["shard_size"], [[None], [2]])
+async def test_completion_retried_after_failure_is_applied_once_edge_case(
+    redis_client, shard_size, create_swarm
+):
+    # Arrange
+    swarm_signature, items = await create_swarm(
+        2, item_lease_ttl=LEASE_TTL, shard_size=shard_size
+    )
+    await swarm_signature.current_running_tasks.increase(2)
+    await items[0].lease_slot(timedelta(minutes=1))
+    completion = SwarmItemCompletion(
+        items[0].key, True, "result", items[0].shard_id, MagicMock()
+    )
+    with patch(
+        "mageflow.swarm.workflows.handle_finish_tasks",
+        new_callable=AsyncMock,
+        side_effect=RuntimeError("worker lost"),
+    ):
+        with pytest.raises(RuntimeError):
+            await apply_swarm_items_completions(swarm_signature.key, [completion])
+
+    # Act
+    with patch.object(
+        SwarmTaskSignature, "fill_running_tasks", new_callable=AsyncMock
+    ) as fill_mock:
+        fill_mock.return_value = 0
+        await apply_swarm_items_completions(swarm_signature.key, [completion])
+
+    # Assert
+    fill_mock.assert_awaited_once()
+    reloaded_swarm = await SwarmTaskSignature.get_safe(swarm_signature.key)
+    assert reloaded_swarm.current_running_tasks == 1
+    if shard_size:
+        shards = await reloaded_swarm.load_shards()
+        finished = [key for shard in shards for key in shard.finished_tasks]
+        assert reloaded_swarm.finished_count == 1
+    else:
+        finished = reloaded_swarm.finished_tasks
+    assert finished == [items[0].key]
+    assert await redis_client.zcard(SWARM_ITEM_LEASES_KEY) == 0
+
+
+@pytest.mark.asyncio
+async def test_reclaim_and_completion_keep_concurrency_limit_edge_case(
+    redis_client, create_swarm
+):
+    # Arrange
+    swarm_signature, items = await create_swarm(
+        3, item_lease_ttl=LEASE_TTL, max_concurrency=2
+    )
+    with patch.object(TaskSignature, "workflow") as workflow_mock:
+        workflow_mock.return_value.aio_run_no_wait = AsyncMock()
+        for item in items:
+            await item.aio_run_no_wait(ContextMessage())
+        await expire_lease(redis_client, items[0].key)
+        completion = SwarmItemCompletion(
+            items[1].key, True, "result", None, MagicMock()
+        )
+
+        # Act
+        await asyncio.wait_for(
+            asyncio.gather(
+                swarm_slots_reaper(EmptyModel(), MagicMock()),
+                apply_swarm_items_completions(swarm_signature.key, [completion]),
+            ),
+            timeout=10,
+        )
+
+    # Assert
+    reloaded_swarm = await SwarmTaskSignature.get_safe(swarm_signature.key)
+    assert reloaded_swarm.current_running_tasks == 2
+    assert reloaded_swarm.tasks_left_to_run == []
+    assert reloaded_swarm.finished_tasks == [items[1].key]
+    # Two items started, then the reclaimed item and the queued item
+    assert workflow_mock.return_value.aio_run_no_wait.await_count == 4
@@ -0,0 +1,191 @@
+import asyncio
+from datetime import timedelta
+from unittest.mock import patch, AsyncMock, MagicMock
+
+import pytest
+from hatchet_sdk.runnables.types import EmptyModel
+
+from mageflow.signature.consts import TASK_ID_PARAM_NAME
+from mageflow.signature.model import TaskSignature
+from mageflow.swarm.consts import (
+    SWARM_TASK_ID_PARAM_NAME,
+    SWARM_ITEM_TASK_ID_PARAM_NAME,
+)
+from mageflow.swarm.events import SwarmEventType
+from mageflow.swarm.messages import SwarmResultsMessage
+from mageflow.swarm.model import SwarmTaskSignature, BatchItemTaskSignature
+from mageflow.swarm.workflows import swarm_item_done, swarm_item_failed
+from mageflow.workflows import TASK_DATA_PARAM_NAME
+from tests.integration.hatchet.models import ContextMessage
+
+
+def item_ctx(swarm_key: str, item_key: str) -> MagicMock:
+    ctx = MagicMock()
+    ctx.additional_metadata = {
+        TASK_DATA_PARAM_NAME: {
+            TASK_ID_PARAM_NAME: f"callback-{item_key}",
+            SWARM_TASK_ID_PARAM_NAME: swarm_key,
+            SWARM_ITEM_TASK_ID_PARAM_NAME: item_key,
+        }
+    }
+    return ctx
+
+
+@pytest.mark.asyncio
+async def test_watch_yields_items_events_until_swarm_done_sanity(create_swarm):
+    # Arrange
+    swarm_signature, items = await create_swarm(2)
+    with patch.object(TaskSignature, "aio_run_no_wait", new_callable=AsyncMock):
+        for item in items:
+            await item.aio_run_no_wait(ContextMessage())
+    await swarm_signature.close_swarm()
+
+    # Act
+    with patch.object(TaskSignature, "activate_success", new_callable=AsyncMock):
+        await swarm_item_done(
+            SwarmResultsMessage(results=1), item_ctx(swarm_signature.key, items[0].key)
+        )
+        await swarm_item_failed(
+            EmptyModel(), item_ctx(swarm_signature.key, items[1].key)
+        )
+    events = [event async for event in swarm_signature.watch()]
+
+    # Assert
+    assert [(event.type, event.item_key) for event in events] == [
+        (SwarmEventType.ITEM_STARTED, items[0].key),
+        (SwarmEventType.ITEM_STARTED, items[1].key),
+        (SwarmEventType.ITEM_FINISHED, items[0].key),
+        (SwarmEventType.ITEM_FAILED, items[1].key),
+        (SwarmEventType.SWARM_DONE, None),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_watch_ends_with_swarm_failed_event_sanity(create_swarm):
+    # Arrange
+    swarm_signature, items = await create_swarm(2, stop_after_n_failures=1)
+
+    # Act
+    await swarm_item_failed(EmptyModel(), item_ctx(swarm_signature.key, items[0].key))
+    events = [event async for event in swarm_signature.watch()]
+
+    # Assert
+    assert [event.type for event in events] == [
+        SwarmEventType.ITEM_FAILED,
+        SwarmEventType.SWARM_FAILED,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_watch_stops_when_swarm_removed_without_end_event_edge_case(create_swarm):
+    # Arrange
+    swarm_signature, items = await create_swarm(1)
+    await swarm_signature.publish_events([(SwarmEventType.ITEM_STARTED, items[0].key)])
+    await swarm_signature.remove()
+
+    # Act
+    events = [
+        event async for event in swarm_signature.watch(block=timedelta(milliseconds=10))
+    ]
+
+    # Assert
+    assert [event.type for event in events] == [SwarmEventType.ITEM_STARTED]
+
+
+@pytest.mark.asyncio
+async def test_watch_from_now_skips_past_events_edge_case(create_swarm):
+    # Arrange
+    swarm_signature, items = await create_swarm(1)
+    await swarm_signature.publish_events([(SwarmEventType.ITEM_STARTED, items[0].key)])
+    await swarm_signature.remove()
+
+    # Act
+    events = [
+        event
+        async for event in swarm_signature.watch(
+            from_start=False, block=timedelta(milliseconds=10)
+        )
+    ]
+
+    # Assert
+    assert events == []
+
+
+async def wait_for_items(swarm_signature, num_items: int):
+    for _ in range(100):
+        reloaded_swarm = await SwarmTaskSignature.get_safe(swarm_signature.key)
+        if len(reloaded_swarm.tasks) >= num_items:
+            return reloaded_swarm
+        await asyncio.sleep(0.01)
+    raise TimeoutError(f"Swarm did not reach {num_items} items")
+
+
+@pytest.mark.asyncio
+async def test_feed_adds_items_only_when_pending_items_finish_sanity(create_swarm):
+    # Arrange
+    swarm_signature, _ = await create_swarm(0, max_concurrency=2)
+    tasks = [TaskSignature(task_name=f"fed_item_{i}") for i in range(3)]
+    for task in tasks:
+        await task.save()
+
+    async def source():
+        for task in tasks:
+            yield task
+
+    # Act
+    with patch.object(TaskSignature, "aio_run_no_wait", new_callable=AsyncMock):
+        feeding = asyncio.create_task(swarm_signature.feed(source(), max_pending=2))
+        fed_swarm = await wait_for_items(swarm_signature, 2)
+        await asyncio.sleep(0.05)
+        items_before_done = len(fed_swarm.tasks)
+        await swarm_item_done(
+            SwarmResultsMessage(results=1),
+            item_ctx(swarm_signature.key, fed_swarm.tasks[0]),
+        )
+        num_fed = await asyncio.wait_for(feeding, timeout=5)
+
+    # Assert
+    assert items_before_done == 2
+    assert num_fed == 3
+    reloaded_swarm = await SwarmTaskSignature.get_safe(swarm_signature.key)
+    assert len(reloaded_swarm.tasks) == 3
+    assert reloaded_swarm.is_swarm_closed
+
+
+@pytest.mark.asyncio
+async def test_feed_from_cursor_resumes_from_stored_cursor_sanity(create_swarm):
+    # Arrange
+    swarm_signature, _ = await create_swarm(0)
+    task_names = [f"paged_item_{i}" for i in range(4)]
+    read_cursors = []
+
+    async def read_page(cursor):
+        read_cursors.append(cursor)
+        offset = int(cursor or 0)
+        page = []
+        for task_name in task_names[offset : offset + 1]:
+            task = TaskSignature(task_name=task_name)
+            await task.save()
+            page.append(task)
+        next_offset = offset + 1
+        return page, str(next_offset) if next_offset < len(task_names) else None
+
+    await swarm_signature.aupdate(source_cursor="2")
+
+    # Act
+    with patch.object(TaskSignature, "aio_run_no_wait", new_callable=AsyncMock):
+        num_fed = await swarm_signature.feed_from_cursor(read_page)
+
+    # Assert
+    assert num_fed == 2
+    assert read_cursors == ["2", "3"]
+    reloaded_swarm = await SwarmTaskSignature.get_safe(swarm_signature.key)
+    item_tasks = await asyncio.gather(
+        *[BatchItemTaskSignature.get_safe(key) for key in reloaded_swarm.tasks]
+    )
+    assert [item.task_name for item in item_tasks] == [
+        "batch-task-paged_item_2",
+        "batch-task-paged_item_3",
+    ]
+    assert reloaded_swarm.source_cursor == "3"
+    assert reloaded_swarm.is_swarm_closed
@@ -1,13 +1,23 @@
 import asyncio
 from hatchet_sdk import Context
-from datetime import timedelta
-from unittest.mock import MagicMock, AsyncMock
+from datetime import timedelta, datetime
+from unittest.mock import MagicMock, AsyncMock, patch
 
 import pytest
+
+import mageflow
 from hatchet_sdk import Hatchet
 from redis import Redis
 
+from hatchet_sdk.clients.admin import TriggerWorkflowOptions
+from hatchet_sdk.runnables.workflow import Workflow
+
 from mageflow.client import HatchetMageflow
+from mageflow.signature.consts import TASK_ID_PARAM_NAME
+from mageflow.signature.model import TaskSignature
+from mageflow.startup import register_workflows
+from mageflow.task.model import HatchetTaskModel
+from mageflow.workflows import TASK_DATA_PARAM_NAME
 from tests.integration.hatchet.models import ContextMessage
 
 
@@ -107,3 +117,187 @@ async def test_stagger_execution_calls_func_without_ctx_when_func_does_not_want_
 
     # Assert
     assert received_args == [mock_message]
+
+
+@pytest.mark.asyncio
+async def test_with_concurrency_pool_runs_func_with_lease_sanity(
+    mageflow_hatchet,
+    mock_message,
+    mock_ctx,
+):
+    # Arrange
+    pool = await mageflow.concurrency_pool("client_api", limit=1)
+    leases_while_running = []
+
+    @mageflow_hatchet.with_concurrency_pool("client_api")
+    async def test_func(message):
+        leases_while_running.append(await pool.active_leases())
+        return "result"
+
+    # Act
+    result = await test_func(mock_message, mock_ctx)
+
+    # Assert
+    assert result == "result"
+    assert leases_while_running == [1]
+    assert await pool.active_leases() == 0
+
+
+@pytest.mark.asyncio
+async def test_deferred_stagger_schedules_run_instead_of_sleeping_sanity(
+    monkeypatch, orch, mock_message
+):
+    # Arrange
+    sleep_mock = AsyncMock()
+    monkeypatch.setattr(asyncio, "sleep", sleep_mock)
+    stagger_range = timedelta(seconds=30)
+
+    @orch.task(name="deferred_stagger_task")
+    @orch.stagger_execution(stagger_range, deferred=True)
+    async def deferred_task(message):
+        return "result"
+
+    await register_workflows()
+    signature = await mageflow.sign("deferred_stagger_task")
+    triggered_at = datetime.now()
+
+    # Act
+    with (
+        patch.object(Workflow, "aio_schedule", new_callable=AsyncMock) as schedule_mock,
+        patch.object(Workflow, "aio_run_no_wait", new_callable=AsyncMock) as run_mock,
+    ):
+        await signature.aio_run_no_wait(mock_message)
+
+    # Assert
+    task_def = await HatchetTaskModel.safe_get("deferred_stagger_task")
+    assert task_def.stagger_delta == stagger_range
+    run_mock.assert_not_awaited()
+    sleep_mock.assert_not_awaited()
+    run_at, _, options = schedule_mock.await_args.args
+    assert triggered_at <= run_at <= datetime.now() + stagger_range
+    task_data = options.additional_metadata[TASK_DATA_PARAM_NAME]
+    assert task_data[TASK_ID_PARAM_NAME] == signature.key
+
+
+@pytest.mark.asyncio
+async def test_deferred_stagger_waiting_run_delays_in_caller_sanity(
+    monkeypatch, orch, mock_message
+):
+    # Arrange
+    sleep_mock = AsyncMock()
+    monkeypatch.setattr(asyncio, "sleep", sleep_mock)
+    stagger_range = timedelta(seconds=30)
+
+    @orch.task(name="deferred_waiting_task")
+    @orch.stagger_execution(stagger_range, deferred=True)
+    async def deferred_task(message):
+        return "result"
+
+    await register_workflows()
+    signature = await mageflow.sign("deferred_waiting_task")
+    workflow = await signature.workflow(use_return_field=False)
+
+    # Act
+    with (
+        patch.object(Workflow, "aio_schedule", new_callable=AsyncMock) as schedule_mock,
+        patch.object(Workflow, "aio_run", new_callable=AsyncMock) as run_mock,
+    ):
+        run_mock.return_value = {"deferred_waiting_task": "result"}
+        result = await workflow.aio_run(mock_message)
+
+    # Assert
+    assert result == {"deferred_waiting_task": "result"}
+    schedule_mock.assert_not_awaited()
+    run_mock.assert_awaited_once()
+    sleep_mock.assert_awaited_once()
+    stagger = sleep_mock.await_args.args[0]
+    assert 0 <= stagger <= stagger_range.total_seconds()
+    _, options = run_mock.await_args.args
+    task_data = options.additional_metadata[TASK_DATA_PARAM_NAME]
+    assert task_data[TASK_ID_PARAM_NAME] == signature.key
+
+
+@pytest.mark.asyncio
+async def test_deferred_stagger_sync_run_schedules_with_trigger_options_sanity(
+    orch, mock_message
+):
+    # Arrange
+    stagger_range = timedelta(seconds=30)
+
+    @orch.task(name="deferred_sync_task")
+    @orch.stagger_execution(stagger_range, deferred=True)
+    async def deferred_task(message):
+        return "result"
+
+    await register_workflows()
+    signature = await mageflow.sign("deferred_sync_task")
+    workflow = await signature.workflow(use_return_field=False)
+    options = TriggerWorkflowOptions(
+        parent_id="parent_run",
+        parent_step_run_id="parent_step_run",
+        child_index=2,
+        child_key="child",
+        priority=3,
+    )
+    triggered_at = datetime.now()
+
+    # Act
+    with (
+        patch.object(Workflow, "schedule") as schedule_mock,
+        patch.object(Workflow, "run") as run_mock,
+    ):
+        scheduled = workflow.run(mock_message, options)
+
+    # Assert
+    run_mock.assert_not_called()
+    assert scheduled is schedule_mock.return_value
+    run_at, _, scheduled_options = schedule_mock.call_args.args
+    assert triggered_at <= run_at <= datetime.now() + stagger_range
+    assert scheduled_options.parent_id == "parent_run"
+    assert scheduled_options.parent_step_run_id == "parent_step_run"
+    assert scheduled_options.child_index == 2
+    assert scheduled_options.child_key == "child"
+    assert scheduled_options.priority == 3
+    task_data = scheduled_options.additional_metadata[TASK_DATA_PARAM_NAME]
+    assert task_data[TASK_ID_PARAM_NAME] == signature.key
+
+
+@pytest.mark.asyncio
+async def test_full_concurrency_pool_reschedules_task_run_edge_case(orch, mock_message):
+    # Arrange
+    pool = await mageflow.concurrency_pool("full_api", limit=1)
+    await pool.acquire("other_task", "other_lease")
+    func_mock = AsyncMock()
+    poll_interval = timedelta(seconds=5)
+
+    @orch.task(name="pooled_task")
+    @orch.with_concurrency_pool("full_api", poll_interval=poll_interval)
+    async def pooled_task(message):
+        await func_mock(message)
+
+    await register_workflows()
+    signature = await mageflow.sign("pooled_task")
+    task_data = {TASK_ID_PARAM_NAME: signature.key}
+    ctx = MagicMock(
+        additional_metadata={TASK_DATA_PARAM_NAME: task_data},
+        workflow_id="workflow_run_id",
+        workflow_input=mock_message.model_dump(mode="json"),
+    )
+    ctx.action.job_name = "pooled_task"
+    triggered_at = datetime.now()
+
+    # Act
+    with patch.object(
+        Workflow, "aio_schedule", new_callable=AsyncMock
+    ) as schedule_mock:
+        await pooled_task._task.fn(mock_message, ctx)
+
+    # Assert
+    func_mock.assert_not_awaited()
+    ctx.refresh_timeout.assert_not_called()
+    run_at, workflow_input, options = schedule_mock.await_args.args
+    assert triggered_at + poll_interval <= run_at <= datetime.now() + poll_interval
+    assert workflow_input == mock_message.model_dump(mode="json")
+    assert options.additional_metadata[TASK_DATA_PARAM_NAME] == task_data
+    # The signature is kept for the rescheduled run
+    assert await TaskSignature.get_safe(signature.key) is not None
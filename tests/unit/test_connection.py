@@ -0,0 +1,102 @@
+from unittest.mock import MagicMock
+
+import pytest
+from redis.asyncio import BlockingConnectionPool
+
+from mageflow.connection import (
+    RedisConnectionConfig,
+    create_redis_client,
+    resolve_redis_client,
+    redis_pool_stats,
+)
+
+
+def test_create_redis_client_applies_pool_configuration_sanity():
+    # Arrange
+    config = RedisConnectionConfig(
+        url="redis://localhost:6379",
+        max_connections=16,
+        pool_timeout=3,
+        socket_timeout=2,
+        health_check_interval=15,
+        retries=5,
+    )
+
+    # Act
+    client = create_redis_client(config)
+
+    # Assert
+    pool = client.connection_pool
+    assert isinstance(pool, BlockingConnectionPool)
+    assert pool.max_connections == 16
+    assert pool.timeout == 3
+    assert pool.connection_kwargs["decode_responses"] is True
+    assert pool.connection_kwargs["socket_timeout"] == 2
+    assert pool.connection_kwargs["health_check_interval"] == 15
+    assert pool.connection_kwargs["retry"].get_retries() == 5
+
+
+def test_default_socket_timeout_does_not_limit_blocking_reads_sanity():
+    # Act
+    client = create_redis_client(RedisConnectionConfig(url="redis://localhost:6379"))
+
+    # Assert
+    assert client.connection_pool.connection_kwargs["socket_timeout"] is None
+
+
+def test_resolve_redis_client_url_overrides_config_url_sanity():
+    # Arrange
+    config = RedisConnectionConfig(url="redis://config-host:6379", max_connections=8)
+
+    # Act
+    client = resolve_redis_client("redis://given-host:6380", config)
+
+    # Assert
+    pool = client.connection_pool
+    assert pool.connection_kwargs["host"] == "given-host"
+    assert pool.connection_kwargs["port"] == 6380
+    assert pool.max_connections == 8
+
+
+def test_create_redis_client_sentinel_without_master_edge_case():
+    # Arrange
+    config = RedisConnectionConfig(sentinels=[("localhost", 26379)])
+
+    # Act & Assert
+    with pytest.raises(ValueError):
+        create_redis_client(config)
+
+
+@pytest.mark.asyncio
+async def test_redis_pool_stats_counts_in_use_connections_sanity(redis_client):
+    # Arrange
+    await redis_client.ping()
+    connection = await redis_client.connection_pool.get_connection()
+
+    # Act
+    stats = redis_pool_stats(redis_client)
+    await redis_client.connection_pool.release(connection)
+    released_stats = redis_pool_stats(redis_client)
+
+    # Assert
+    assert stats.in_use == 1
+    assert stats.created == 1
+    assert stats.utilization == 1 / stats.max_connections
+    assert released_stats.in_use == 0
+    assert released_stats.available == 1
+
+
+def test_redis_pool_stats_without_pool_internals_edge_case():
+    # Arrange
+    redis_client = MagicMock()
+    redis_client.connection_pool = MagicMock(spec=["max_connections"])
+    redis_client.connection_pool.max_connections = 8
+
+    # Act
+    stats = redis_pool_stats(redis_client)
+
+    # Assert
+    assert stats.max_connections == 8
+    assert stats.in_use is None
+    assert stats.created is None
+    assert stats.utilization is None
@@ -0,0 +1,76 @@
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).parents[2]
+WORKER_ONLY_MODULES = ["hatchet_sdk", "grpc"]
+# Loose bound including the interpreter startup, catches eager imports of heavy dependencies, not small regressions
+IMPORT_TIME_LIMIT_SECONDS = 3
+
+
+def run_python(code: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        cwd=PROJECT_ROOT,
+        check=True,
+    )
+
+
+def loaded_worker_modules(code: str) -> list[str]:
+    result = run_python(
+        f"{code}; import sys; "
+        f"print(','.join(m for m in {WORKER_ONLY_MODULES!r} if m in sys.modules))"
+    )
+    return [module for module in result.stdout.strip().split(",") if module]
+
+
+@pytest.mark.parametrize(
+    ["code"],
+    [
+        ["import mageflow"],
+        ["import mageflow; mageflow.sign; mageflow.chain; mageflow.swarm"],
+        ["import mageflow; mageflow.load_signature; mageflow.pause; mageflow.resume"],
+    ],
+)
+def test_import_mageflow_does_not_load_worker_dependencies_sanity(code):
+    # Act
+    worker_modules = loaded_worker_modules(code)
+
+    # Assert
+    assert worker_modules == []
+
+
+def test_import_mageflow_client_loads_worker_dependencies_sanity():
+    # Act
+    worker_modules = loaded_worker_modules("import mageflow.client")
+
+    # Assert
+    assert "hatchet_sdk" in worker_modules
+
+
+def test_import_mageflow_startup_time_sanity():
+    # Act
+    started_at = time.perf_counter()
+    run_python("import mageflow")
+    import_time = time.perf_counter() - started_at
+
+    # Assert
+    assert import_time < IMPORT_TIME_LIMIT_SECONDS
+
+
+def test_lazy_attribute_access_returns_public_api_sanity():
+    # Arrange
+    import mageflow
+    from mageflow.client import Mageflow
+    from mageflow.signature.creator import sign
+
+    # Act & Assert
+    assert mageflow.sign is sign
+    assert mageflow.Mageflow is Mageflow
+    with pytest.raises(AttributeError):
+        mageflow.not_a_real_attribute
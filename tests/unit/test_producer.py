@@ -0,0 +1,183 @@
+import asyncio
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from hatchet_sdk.clients.admin import AdminClient
+
+import mageflow
+from mageflow.signature.consts import TASK_ID_PARAM_NAME
+from mageflow.startup import mageflow_config
+from mageflow.models.trigger import WorkflowTriggerParams
+from mageflow.swarm.consts import ON_SWARM_FILL, SWARM_TASK_ID_PARAM_NAME
+from mageflow.workflows import TASK_DATA_PARAM_NAME, MageflowWorkflow
+from tests.integration.hatchet.models import ContextMessage
+
+
+@pytest.fixture
+def producer(hatchet_mock, redis_client):
+    producer = mageflow.MageflowProducer(
+        hatchet_mock._client.config, redis_client=redis_client
+    )
+    try:
+        yield producer
+    finally:
+        mageflow_config.producer = None
+
+
+@pytest.fixture
+def mock_admin_run():
+    with patch.object(
+        AdminClient, "aio_run_workflow", new_callable=AsyncMock
+    ) as mock_run:
+        yield mock_run
+
+
+@pytest.mark.asyncio
+async def test_producer_triggers_signature_without_workflow_objects_sanity(
+    producer, mock_admin_run
+):
+    # Arrange
+    signature = await producer.sign(
+        "producer_task", model_validators=ContextMessage, param="value"
+    )
+    message = ContextMessage(base_data={"data": 1})
+
+    # Act
+    with patch.object(MageflowWorkflow, "__init__") as workflow_init:
+        await signature.aio_run_no_wait(message)
+
+    # Assert
+    workflow_init.assert_not_called()
+    mock_admin_run.assert_awaited_once()
+    workflow_name, workflow_input, options = mock_admin_run.await_args.args
+    assert workflow_name == "producer_task"
+    assert workflow_input == message.model_dump(mode="json") | {"param": "value"}
+    task_data = options.additional_metadata[TASK_DATA_PARAM_NAME]
+    assert task_data[TASK_ID_PARAM_NAME] == signature.key
+
+
+@pytest.mark.asyncio
+async def test_producer_triggers_chain_first_task_sanity(
+    producer, mock_admin_run, chain_with_tasks
+):
+    # Arrange
+    chain_signature = chain_with_tasks.chain_signature
+    first_task = chain_with_tasks.task_signatures[0]
+
+    # Act
+    await chain_signature.aio_run_no_wait(ContextMessage())
+
+    # Assert
+    workflow_name, _, options = mock_admin_run.await_args.args
+    assert workflow_name == first_task.task_name
+    task_data = options.additional_metadata[TASK_DATA_PARAM_NAME]
+    assert task_data[TASK_ID_PARAM_NAME] == first_task.key
+
+
+def test_producer_does_not_copy_namespace_sanity(hatchet_mock, redis_client):
+    # Arrange
+    config = hatchet_mock._client.config.model_copy(update={"namespace": "prod_"})
+
+    # Act
+    producer = mageflow.MageflowProducer(config, redis_client=redis_client)
+    mageflow_config.producer = None
+
+    # Assert
+    assert producer.hatchet_config.namespace == ""
+    assert config.namespace == "prod_"
+
+
+@pytest.mark.asyncio
+async def test_producer_schedules_swarm_fill_sanity(producer):
+    # Arrange
+    swarm_signature = await producer.swarm(task_name="producer_swarm")
+    mageflow_config.hatchet_client = None
+
+    # Act
+    with patch.object(
+        AdminClient, "aio_schedule_workflow", new_callable=AsyncMock
+    ) as mock_schedule:
+        await swarm_signature.schedule_fill(timedelta(seconds=5))
+
+    # Assert
+    mock_schedule.assert_awaited_once()
+    workflow_name, run_at, _, options = mock_schedule.await_args.args
+    assert workflow_name == ON_SWARM_FILL
+    assert len(run_at) == 1
+    task_data = options.additional_metadata[TASK_DATA_PARAM_NAME]
+    assert task_data == {SWARM_TASK_ID_PARAM_NAME: swarm_signature.key}
+
+
+@pytest.mark.asyncio
+async def test_producer_staggered_run_no_wait_schedules_run_sanity(
+    producer, mock_admin_run
+):
+    # Arrange
+    stagger_range = timedelta(seconds=30)
+    params = WorkflowTriggerParams(
+        workflow_name="staggered_task", stagger_delta=stagger_range
+    )
+    triggered_at = datetime.now()
+
+    # Act
+    with patch.object(
+        AdminClient, "aio_schedule_workflow", new_callable=AsyncMock
+    ) as mock_schedule:
+        scheduled = await producer.workflow(params).aio_run_no_wait(ContextMessage())
+
+    # Assert
+    mock_admin_run.assert_not_awaited()
+    assert scheduled is mock_schedule.return_value
+    workflow_name, run_at, _, _ = mock_schedule.await_args.args
+    assert workflow_name == "staggered_task"
+    assert triggered_at <= run_at[0] <= datetime.now() + stagger_range
+
+
+@pytest.mark.asyncio
+async def test_producer_staggered_run_waits_for_run_result_sanity(
+    producer, mock_admin_run, monkeypatch
+):
+    # Arrange
+    sleep_mock = AsyncMock()
+    monkeypatch.setattr(asyncio, "sleep", sleep_mock)
+    stagger_range = timedelta(seconds=30)
+    params = WorkflowTriggerParams(
+        workflow_name="staggered_task", stagger_delta=stagger_range
+    )
+    mock_admin_run.return_value.aio_result = AsyncMock(return_value={"key": "value"})
+
+    # Act
+    with patch.object(
+        AdminClient, "aio_schedule_workflow", new_callable=AsyncMock
+    ) as mock_schedule:
+        result = await producer.workflow(params).aio_run(ContextMessage())
+
+    # Assert
+    assert result == {"key": "value"}
+    mock_schedule.assert_not_awaited()
+    mock_admin_run.assert_awaited_once()
+    stagger = sleep_mock.await_args.args[0]
+    assert 0 <= stagger <= stagger_range.total_seconds()
+
+
+@pytest.mark.asyncio
+async def test_producer_lifespan_initializes_mageflow_for_app_sanity(producer):
+    # Arrange
+    app = MagicMock()
+
+    # Act
+    with (
+        patch("mageflow.producer.init_mageflow", new_callable=AsyncMock) as init_mock,
+        patch(
+            "mageflow.producer.teardown_mageflow", new_callable=AsyncMock
+        ) as teardown_mock,
+    ):
+        async with producer.lifespan(app):
+            initialized_on_startup = init_mock.await_count
+            torn_down_on_startup = teardown_mock.await_count
+
+    # Assert
+    assert initialized_on_startup == 1
+    assert torn_down_on_startup == 0
+    teardown_mock.assert_awaited_once()
@@ -0,0 +1,79 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from mageflow import startup
+from mageflow.startup import register_workflows
+from mageflow.task.model import HatchetTaskModel
+from tests.integration.hatchet.models import ContextMessage
+
+
+@pytest.fixture
+def registered_tasks(hatchet_mock, monkeypatch):
+    tasks = [
+        hatchet_mock.task(name=f"register_test_{i}", input_validator=ContextMessage)(
+            lambda msg: msg
+        )
+        for i in range(3)
+    ]
+    registered = [(task, f"register-test-{i}") for i, task in enumerate(tasks)]
+    monkeypatch.setattr(startup, "REGISTERED_TASKS", registered)
+    yield registered
+
+
+@pytest.mark.asyncio
+async def test_register_workflows_stores_all_definitions_sanity(registered_tasks):
+    # Act
+    written = await register_workflows()
+
+    # Assert
+    assert len(written) == len(registered_tasks)
+    for workflow, mageflow_task_name in registered_tasks:
+        stored_task = await HatchetTaskModel.safe_get(mageflow_task_name)
+        assert stored_task.task_name == workflow.name
+        assert stored_task.input_validator == ContextMessage
+        assert stored_task.content_hash == stored_task.calculate_content_hash()
+
+
+@pytest.mark.asyncio
+async def test_register_workflows_skips_unchanged_definitions_sanity(
+    registered_tasks,
+):
+    # Arrange
+    await register_workflows()
+    changed_workflow, changed_name = registered_tasks[1]
+    changed_workflow.tasks[0].retries = 7
+
+    # Act
+    with patch.object(
+        HatchetTaskModel, "ainsert", wraps=HatchetTaskModel.ainsert
+    ) as insert_mock:
+        written = await register_workflows()
+
+    # Assert
+    assert [task.mageflow_task_name for task in written] == [changed_name]
+    insert_mock.assert_awaited_once()
+    stored_task = await HatchetTaskModel.safe_get(changed_name)
+    assert stored_task.retries == 7
+
+
+@pytest.mark.asyncio
+async def test_lifespan_initialize_accepts_app_sanity():
+    # Arrange
+    app = MagicMock()
+
+    # Act
+    with (
+        patch.object(startup, "init_mageflow", new_callable=AsyncMock) as init_mock,
+        patch.object(
+            startup, "teardown_mageflow", new_callable=AsyncMock
+        ) as teardown_mock,
+    ):
+        lifespan = startup.lifespan_initialize(app)
+        await anext(lifespan)
+        init_mock.assert_awaited_once()
+        with pytest.raises(StopAsyncIteration):
+            await anext(lifespan)
+
+    # Assert
+    teardown_mock.assert_awaited_once()
@@ -0,0 +1,137 @@
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+import mageflow
+from mageflow.signature.model import TaskSignature
+from mageflow.signature.status import SignatureStatus
+from mageflow.swarm.model import SwarmTaskSignature, SwarmConfig
+from mageflow.visualizer.stats import collect_workflow_stats, SignatureKeysCache
+from tests.integration.hatchet.models import ContextMessage
+
+
+@pytest.mark.asyncio
+async def test_collect_workflow_stats_swarm_counters_sanity(redis_client):
+    # Arrange
+    swarm_signature = SwarmTaskSignature(
+        task_name="test_swarm",
+        model_validators=ContextMessage,
+        tasks=["item_1", "item_2", "item_3", "item_4", "item_5"],
+        finished_tasks=["item_1", "item_2", "item_3"],
+        failed_tasks=["item_4"],
+        current_running_tasks=1,
+    )
+    pending_item = TaskSignature(task_name="pending_item")
+    await pending_item.save()
+    swarm_signature.tasks_left_to_run.append(pending_item.key)
+    await swarm_signature.save()
+    async with swarm_signature.lock():
+        pass
+
+    # Act
+    stats = await collect_workflow_stats(SwarmTaskSignature.Meta.redis)
+
+    # Assert
+    assert len(stats.swarms) == 1
+    swarm_stats = stats.swarms[0]
+    assert swarm_stats.key == swarm_signature.key
+    assert swarm_stats.status == SignatureStatus.PENDING
+    assert swarm_stats.total_tasks == 5
+    assert swarm_stats.queue_depth == 1
+    assert swarm_stats.running == 1
+    assert swarm_stats.concurrency_limit == 30
+    assert swarm_stats.finished == 3
+    assert swarm_stats.failed == 1
+    assert swarm_stats.failure_ratio == 0.25
+    assert swarm_stats.oldest_pending_age_seconds >= 0
+
+
+@pytest.mark.asyncio
+async def test_collect_workflow_stats_chain_and_empty_swarm_sanity(chain_with_tasks):
+    # Arrange
+    swarm_signature = await mageflow.swarm(task_name="empty_swarm")
+
+    # Act
+    stats = await collect_workflow_stats(SwarmTaskSignature.Meta.redis)
+
+    # Assert
+    chain_stats = {chain.key: chain for chain in stats.chains}
+    chain_key = chain_with_tasks.chain_signature.key
+    assert chain_stats[chain_key].total_tasks == 3
+    assert stats.swarms[0].key == swarm_signature.key
+    assert stats.swarms[0].failure_ratio == 0.0
+    assert stats.swarms[0].oldest_pending_age_seconds is None
+
+
+@pytest.mark.asyncio
+async def test_collect_workflow_stats_sharded_swarm_counters_sanity():
+    # Arrange
+    swarm_signature = await mageflow.swarm(
+        task_name="sharded_stats_swarm", config=SwarmConfig(shard_size=2)
+    )
+    items = []
+    for i in range(3):
+        task = TaskSignature(task_name=f"sharded_stats_item_{i}")
+        await task.save()
+        items.append(await swarm_signature.add_task(task))
+    await swarm_signature.add_to_shard_finished_tasks(
+        items[0].shard_id, items[0].key, 1
+    )
+    await swarm_signature.add_to_shard_failed_tasks(items[1].shard_id, items[1].key)
+    await swarm_signature.queue_shards_tasks()
+
+    # Act
+    stats = await collect_workflow_stats(SwarmTaskSignature.Meta.redis)
+
+    # Assert
+    swarm_stats = stats.swarms[0]
+    assert swarm_stats.total_tasks == 3
+    assert swarm_stats.finished == 1
+    assert swarm_stats.failed == 1
+    assert swarm_stats.queue_depth == 3
+    assert swarm_stats.failure_ratio == 0.5
+
+
+@pytest.mark.asyncio
+async def test_collect_workflow_stats_sharded_swarm_oldest_pending_sanity():
+    # Arrange
+    swarm_signature = await mageflow.swarm(
+        task_name="sharded_stats_swarm", config=SwarmConfig(shard_size=1)
+    )
+    items = []
+    for i in range(2):
+        task = TaskSignature(task_name=f"sharded_stats_item_{i}")
+        await task.save()
+        items.append(await swarm_signature.add_task(task))
+    await swarm_signature.queue_shards_tasks()
+    redis = SwarmTaskSignature.Meta.redis
+    oldest_creation = datetime.now() - timedelta(hours=1)
+    await redis.json().set(items[1].key, "$.creation_time", oldest_creation.isoformat())
+
+    # Act
+    stats = await collect_workflow_stats(redis)
+
+    # Assert
+    swarm_stats = stats.swarms[0]
+    assert swarm_stats.queue_depth == 2
+    assert swarm_stats.oldest_pending_age_seconds >= 3600
+
+
+@pytest.mark.asyncio
+async def test_stats_keys_cache_scans_keyspace_once_per_ttl_sanity(redis_client):
+    # Arrange
+    swarm_signature = await mageflow.swarm(
+        task_name="test_swarm", model_validators=ContextMessage
+    )
+    redis = SwarmTaskSignature.Meta.redis
+    keys_cache = SignatureKeysCache()
+    await collect_workflow_stats(redis, keys_cache)
+
+    # Act
+    with patch.object(redis, "scan_iter", wraps=redis.scan_iter) as scan_spy:
+        stats = await collect_workflow_stats(redis, keys_cache)
+
+    # Assert
+    scan_spy.assert_not_called()
+    assert [swarm.key for swarm in stats.swarms] == [swarm_signature.key]